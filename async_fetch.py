@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Async Fetch - asyncio upstream fetch engine for ConfirmTktAPI.
+
+aiohttp (listed in requirements.txt) does the fetching on one long-lived
+event loop of its own, so it can keep thousands of lookups in flight for
+callers on any loop (each asyncio.run makes a new one) through a single
+ClientSession, which close() shuts down once. Proxy schemes aiohttp
+cannot speak (https:// and socks5h:// proxies) fall back to the pooled
+requests sessions on a worker thread. So does everything if aiohttp is not
+installed: concurrency is then capped by the loop's default executor (a
+handful of threads), and a warning is logged at startup. Errors are raised
+as requests exceptions so the retry logic is shared with the blocking path.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+import requests
+
+from structured_log import get_logger
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+
+class AsyncResponse:
+    """The parts of requests.Response the API reads, filled in from an async fetch"""
+    def __init__(self, status_code, text, url=None, elapsed=0.0):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+        self.elapsed = elapsed
+
+    @property
+    def content(self):
+        return self.text.encode('utf-8')
+
+
+class AiohttpBackend:
+    def __init__(self, limit=1000, limit_per_host=100):
+        self.limit = limit  # Total open connections across all proxies
+        self.limit_per_host = limit_per_host  # Open connections per proxy
+        self.session = None  # Only touched from self.loop
+        self.loop = None  # Event loop the session lives on, run by self.thread
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def supports(self, proxy_url):
+        """aiohttp only tunnels through plain HTTP proxies"""
+        return proxy_url.startswith('http://')
+
+    def _get_loop(self):
+        """The backend's own event loop, started on first use"""
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='aiohttp-loop', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def _get_session(self):
+        """The ClientSession, created lazily on the backend loop"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ssl=False
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def fetch(self, method, url, proxy_url, headers=None, timeout=30, **kwargs):
+        """Fetch on the backend loop; cancelling the caller cancels the fetch"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._fetch(method, url, proxy_url, headers, timeout, kwargs), self._get_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _fetch(self, method, url, proxy_url, headers, timeout, kwargs):
+        session = self._get_session()
+        start_time = time.time()
+        try:
+            async with session.request(
+                method.upper(),
+                url,
+                proxy=proxy_url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                **kwargs
+            ) as response:
+                text = await response.text(errors='replace')
+                return AsyncResponse(response.status, text, str(response.url), time.time() - start_time)
+        except (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError) as e:
+            raise requests.exceptions.ProxyError(str(e))
+        except asyncio.TimeoutError as e:
+            connect_timeout = getattr(aiohttp, 'ConnectionTimeoutError', ())
+            if connect_timeout and isinstance(e, connect_timeout):
+                raise requests.exceptions.ConnectTimeout(str(e))
+            raise requests.exceptions.Timeout(str(e) or 'Read timed out')
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+    async def _close_session(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def close(self):
+        """Close the session and stop the backend loop; the next fetch starts a new one"""
+        with self.lock:
+            loop, thread = self.loop, self.thread
+            self.loop = self.thread = None
+        if loop is None:
+            return
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._close_session(), loop))
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+class ThreadedBackend:
+    def __init__(self, session_pool, executor=None):
+        self.session_pool = session_pool
+        self.executor = executor  # None uses the event loop's default executor
+
+    def supports(self, proxy_url):
+        return True
+
+    async def fetch(self, method, url, proxy_url, headers=None, timeout=30, **kwargs):
+        session = self.session_pool.get_session(proxy_url)
+        call = functools.partial(session.request, method, url, headers=headers, timeout=timeout, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def close(self):
+        pass
+
+
+class LocalBackend:
+    """In-process stand-in for the upstream, serving canned pages for tests"""
+    def __init__(self, pages=None, latency=0.0, failing_proxies=()):
+        self.pages = dict(pages or {})  # url -> (status_code, text)
+        self.latency = latency  # Seconds to wait before answering
+        self.failing_proxies = set(failing_proxies)  # host:port or full proxy URLs that refuse connections
+        self.requests = []  # (url, proxy_url) for every fetch, in order
+
+    def supports(self, proxy_url):
+        return True
+
+    async def fetch(self, method, url, proxy_url, headers=None, timeout=30, **kwargs):
+        self.requests.append((url, proxy_url))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        proxy = proxy_url.split('://', 1)[-1]
+        if proxy in self.failing_proxies or proxy_url in self.failing_proxies:
+            raise requests.exceptions.ProxyError(f"Cannot connect to proxy {proxy}")
+
+        status_code, text = self.pages.get(url, (404, ''))
+        return AsyncResponse(status_code, text, url, self.latency)
+
+    async def close(self):
+        pass
+
+
+class AsyncFetcher:
+    def __init__(self, session_pool, backend=None):
+        if backend is None and AIOHTTP_AVAILABLE:
+            backend = AiohttpBackend()
+        elif backend is None:
+            logger.warning("aiohttp is not installed; async fetches will run on a small thread pool")
+        self.backend = backend
+        self.fallback = ThreadedBackend(session_pool)
+
+    async def fetch(self, method, url, proxy_url, headers=None, timeout=30, **kwargs):
+        """Fetch a URL through one proxy URL on the running event loop"""
+        if self.backend is not None and self.backend.supports(proxy_url):
+            return await self.backend.fetch(method, url, proxy_url, headers=headers, timeout=timeout, **kwargs)
+        return await self.fallback.fetch(method, url, proxy_url, headers=headers, timeout=timeout, **kwargs)
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    def shutdown(self):
+        """Close the backend from outside any event loop, e.g. at exit"""
+        asyncio.run(self.close())
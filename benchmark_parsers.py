@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark - Feeds the saved upstream pages through the ConfirmTktAPI
+parsing paths with no network, reporting per-page parse time, peak
+allocations and throughput for each available HTML parser backend.
+
+Usage:
+    python benchmark_parsers.py                       # report
+    python benchmark_parsers.py --save baseline.json  # record a baseline
+    python benchmark_parsers.py --baseline baseline.json  # fail on regressions
+"""
+
+import os
+os.environ.setdefault('PROXY_TEST_ON_START', '0')
+os.environ.setdefault('PROXY_STORE_PATH', '')
+
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import page_parser
+from confirmtkt_clone import ConfirmTktAPI
+from fixtures import load_fixture, schedule_page
+
+BACKENDS = ['html.parser', 'lxml', 'html5lib']
+
+
+class ParseCase:
+    """One parsing path run against one saved page"""
+    def __init__(self, name, fixture, key, method, transform=None, fast_path=True):
+        self.name = name
+        self.fixture = fixture
+        self.key = key  # Train number or PNR passed to the parser
+        self.method = method  # ConfirmTktAPI parse_*_response method
+        self.transform = transform  # Optional page rewrite before parsing
+        self.fast_path = fast_path  # Live status embedded-state fast path on/off
+
+    def page(self):
+        page = load_fixture(self.fixture)
+        return self.transform(page) if self.transform else page
+
+
+CASES = [
+    ParseCase('live_status', 'train_status.html', '22482', 'parse_live_status_response'),
+    ParseCase('live_status_dom', 'train_status.html', '22482', 'parse_live_status_response', fast_path=False),
+    ParseCase('live_status_dom', 'response.html', '15032', 'parse_live_status_response', fast_path=False),
+    ParseCase('schedule_table', 'train_status.html', '22482', 'parse_schedule_response', transform=schedule_page),
+    ParseCase('schedule_fallbacks', 'response.html', '15032', 'parse_schedule_response'),
+    ParseCase('pnr', 'pnr_test_response.html', '1234567890', 'parse_pnr_response'),
+]
+
+
+class FixtureResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+
+def available_backends():
+    """Parser backends BeautifulSoup can use here"""
+    backends = []
+    for backend in BACKENDS:
+        try:
+            BeautifulSoup('<p></p>', backend)
+            backends.append(backend)
+        except Exception:
+            continue
+    return backends
+
+
+@contextlib.contextmanager
+def parser_backend(backend):
+    previous = page_parser.HTML_PARSER
+    page_parser.HTML_PARSER = backend
+    try:
+        yield
+    finally:
+        page_parser.HTML_PARSER = previous
+
+
+def run_case(api, case, backend, iterations=20):
+    """Time one case on one backend; returns a result dict"""
+    page = case.page()
+    response = FixtureResponse(page)
+    parse = getattr(api, case.method)
+    if not case.fast_path:
+        api.extract_live_status_fast = lambda *args: None
+
+    try:
+        with parser_backend(backend):
+            result = parse(case.key, response)  # Warm-up, also checks the path works
+            if result.get('status') != 'success':
+                raise RuntimeError(f"{case.name} on {case.fixture} failed: {result.get('message')}")
+
+            timings = []
+            for _ in range(iterations):
+                start_time = time.perf_counter()
+                parse(case.key, response)
+                timings.append(time.perf_counter() - start_time)
+
+            tracemalloc.start()
+            try:
+                parse(case.key, response)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    finally:
+        if not case.fast_path:
+            del api.extract_live_status_fast
+
+    median = statistics.median(timings)
+    return {
+        'case': case.name,
+        'fixture': case.fixture,
+        'backend': backend,
+        'page_kb': round(len(page) / 1024, 1),
+        'median_ms': round(median * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'pages_per_sec': round(1 / median, 1) if median else 0,
+        'mb_per_sec': round(len(page) / median / 1e6, 2) if median else 0
+    }
+
+
+def run_benchmarks(cases=CASES, backends=None, iterations=20):
+    api = ConfirmTktAPI(test_proxies_on_start=False)
+    results = []
+    for backend in backends or available_backends():
+        for case in cases:
+            results.append(run_case(api, case, backend, iterations))
+    return results
+
+
+def result_key(result):
+    return f"{result['case']}:{result['fixture']}:{result['backend']}"
+
+
+def find_regressions(results, baseline, tolerance=0.25):
+    """Cases whose median time or peak allocation grew more than tolerance over the baseline"""
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if not before:
+            continue
+        for metric in ('median_ms', 'peak_kb'):
+            if before[metric] and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{result_key(result)} {metric} {before[metric]} -> {result[metric]}")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'case':<20} {'fixture':<24} {'backend':<12} {'KB':>6} {'median ms':>10} {'min ms':>8} "
+          f"{'peak KB':>8} {'pages/s':>8} {'MB/s':>6}")
+    for r in results:
+        print(f"{r['case']:<20} {r['fixture']:<24} {r['backend']:<12} {r['page_kb']:>6} {r['median_ms']:>10} "
+              f"{r['min_ms']:>8} {r['peak_kb']:>8} {r['pages_per_sec']:>8} {r['mb_per_sec']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the page parsers on the saved pages')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--backend', action='append', help='Parser backend (default: all available)')
+    parser.add_argument('--save', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown/growth over the baseline')
+    args = parser.parse_args()
+
+    results = run_benchmarks(backends=args.backend, iterations=args.iterations)
+    print_report(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions over baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions over baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Row Parsing Benchmark - Per-row cost of the regex-based field parsers on the
+saved upstream pages, before and after they moved to the compiled pattern
+registry (patterns.py, text_parsers.py).
+
+LegacyRowParsers keeps the earlier ConfirmTktAPI methods verbatim, with
+their inline re.* calls, as the baseline. Rows are collected once from the
+fixtures; only the parser calls are timed, and each row's output is checked
+to be the same under both.
+Usage: python benchmark_row_parsing.py [iterations]
+"""
+
+import os
+os.environ.setdefault('PROXY_TEST_ON_START', '0')
+os.environ.setdefault('PROXY_STORE_PATH', '')
+os.environ.setdefault('PROXY_RELOAD_SECONDS', '0')
+
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from confirmtkt_clone import ConfirmTktAPI
+from fixtures import load_fixture
+
+FIXTURES = ['train_status.html', 'response.html']
+
+ROUTE_TEXT_PATTERNS = [
+    re.compile(r'([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)'),
+    re.compile(r'From\s+([A-Za-z\s]+)\s+To\s+([A-Za-z\s]+)'),
+    re.compile(r'([A-Z]{3,4})\s+to\s+([A-Z]{3,4})')
+]
+
+
+class LegacyRowParsers:
+    """The row parsers as ConfirmTktAPI methods, before the pattern registry"""
+
+    def clean_text(self, text):
+        """Clean text by removing extra whitespace and newlines"""
+        if not text:
+            return ''
+        text = re.sub(r'\s+', ' ', text)
+        text = text.strip()
+        return text
+
+    def clean_station_name(self, text):
+        """Clean station name by removing codes and standardizing format"""
+        if not text:
+            return ''
+
+        # Remove station code at end (e.g. " - HWH" or " - NDLS")
+        text = re.sub(r'\s*-\s*[A-Z]{2,5}$', '', text)
+
+        # Remove common suffixes
+        text = re.sub(r'\s*(?:Jn|Junction|Junc|Stn|Station|Halt|H|Terminal|Term)\s*$', '', text, flags=re.IGNORECASE)
+
+        # Clean up remaining text
+        return self.clean_text(text)
+
+    def parse_station_info(self, text):
+        """Parse station info from text containing date/time/status"""
+        if not text:
+            return None
+
+        # Try to extract station name
+        station_pattern = r'^([A-Za-z\s\(\)-]+?)(?:\s*-\s*[A-Z]{2,5})?(?:Day\s+\d|[\d:]+|Right Time|Late by|Delay by|Running|Departed|Arrived)'
+        station_match = re.search(station_pattern, text)
+        if station_match:
+            return self.clean_station_name(station_match.group(1))
+
+        # If no match, clean the original text
+        return self.clean_station_name(text)
+
+    def parse_station_row(self, text):
+        """Parse a live status row into station data"""
+        if not text:
+            return None
+
+        # Initialize station data
+        station_data = {
+            'station': '',
+            'date': '',
+            'arrives': '',
+            'departs': '',
+            'delay': '',
+            'status': 'upcoming'
+        }
+
+        # Extract station name
+        station_name = self.parse_station_info(text)
+        if not station_name:
+            return None
+
+        # Skip if this looks like a delay message
+        if any(d in station_name.lower() for d in ['delay', 'late']):
+            return None
+
+        station_data['station'] = station_name
+
+        # Extract date (Day X-Mon)
+        date_match = re.search(r'Day\s+(\d+)[-\s]*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]*\d+)?', text)
+        if date_match:
+            day = date_match.group(1)
+            month = date_match.group(2) if date_match.group(2) else ''
+            station_data['date'] = f"Day {day} {month}".strip()
+
+        # Extract times (HH:MM)
+        time_matches = re.findall(r'\d{2}:\d{2}', text)
+        if len(time_matches) >= 2:
+            station_data['arrives'] = time_matches[0]
+            station_data['departs'] = time_matches[1]
+        elif len(time_matches) == 1:
+            if 'arrives' in text.lower():
+                station_data['arrives'] = time_matches[0]
+            else:
+                station_data['departs'] = time_matches[0]
+
+        # Extract delay info
+        delay_match = re.search(r'(?:Late by|Delay(?:ed)? by)\s+(\d+)\s*(?:min(?:ute)?s?|hrs?|hours?)', text, re.IGNORECASE)
+        if delay_match:
+            delay_mins = delay_match.group(1)
+            station_data['delay'] = f"Delayed by {delay_mins} minutes"
+        elif 'Right Time' in text:
+            station_data['delay'] = 'On Time'
+
+        return station_data
+
+    def parse_route(self, text):
+        """Extract clean route information from text"""
+        if not text:
+            return ''
+
+        # Remove unwanted text
+        text = re.sub(r'\s*Change\s*', '', text)
+        text = re.sub(r'\s*Running Days\s*', '', text)
+        # Collapse whitespace; the patterns below backtrack badly over indentation runs
+        text = ' '.join(text.split())
+
+        # Try to extract route with station names
+        for pattern in ROUTE_TEXT_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                from_station = self.clean_station_name(match.group(1))
+                to_station = self.clean_station_name(match.group(2))
+                if from_station and to_station:
+                    return f"{from_station} to {to_station}"
+
+        return self.clean_text(text)
+
+    def parse_schedule_row(self, cols):
+        """Parse a schedule table row into station data"""
+        if not cols or len(cols) < 3:
+            return None
+
+        try:
+            # Initialize with empty values
+            station_data = {
+                'sr_no': '',
+                'station': '',
+                'code': '',
+                'arrives': '',
+                'departs': '',
+                'halt': '',
+                'distance': '',
+                'avg_delay': '',
+                'day': '1'
+            }
+
+            # Get station name from first column
+            station_text = cols[0].text.strip()
+            if not station_text or station_text.lower() in ['s.no', 'sr.no', 'station', 'stations']:
+                return None
+
+            # Fast path for common table format
+            if station_text.isdigit():
+                station_data['sr_no'] = station_text
+
+                # Station name and code
+                station_name = cols[1].text.strip()
+                station_code_match = re.search(r'(.*?)\s*-\s*([A-Z]{2,5})$', station_name)
+                if station_code_match:
+                    station_data.update({
+                        'station': self.clean_station_name(station_code_match.group(1)),
+                        'code': station_code_match.group(2)
+                    })
+                else:
+                    station_data['station'] = self.clean_station_name(station_name)
+
+                # Direct column mapping for speed
+                if len(cols) > 2: station_data['arrives'] = self.parse_time(cols[2].text.strip())
+                if len(cols) > 3: station_data['departs'] = self.parse_time(cols[3].text.strip())
+                if len(cols) > 4: station_data['halt'] = cols[4].text.strip()
+                if len(cols) > 5: station_data['distance'] = re.sub(r'[^\d.]', '', cols[5].text.strip())
+                if len(cols) > 6: station_data['avg_delay'] = self.parse_delay(cols[6].text.strip())
+                if len(cols) > 7: station_data['day'] = cols[7].text.strip()
+            else:
+                # Alternative format handling
+                station_code_match = re.search(r'(.*?)\s*-\s*([A-Z]{2,5})$', station_text)
+                if station_code_match:
+                    station_data.update({
+                        'station': self.clean_station_name(station_code_match.group(1)),
+                        'code': station_code_match.group(2)
+                    })
+                else:
+                    station_data['station'] = self.clean_station_name(station_text)
+
+                # Direct column mapping
+                if len(cols) > 1: station_data['arrives'] = self.parse_time(cols[1].text.strip())
+                if len(cols) > 2: station_data['departs'] = self.parse_time(cols[2].text.strip())
+                if len(cols) > 3: station_data['distance'] = re.sub(r'[^\d.]', '', cols[3].text.strip())
+
+            # Quick validation
+            if not station_data['station']:
+                return None
+
+            # Clean arrival/departure
+            if station_data['arrives'].lower() in ['source', 'start', '']:
+                station_data['arrives'] = 'Start'
+            if station_data['departs'].lower() in ['destination', 'end', '']:
+                station_data['departs'] = 'End'
+
+            # Clean halt time
+            if station_data['halt']:
+                halt_match = re.search(r'(\d+)\s*(?:min|m)', station_data['halt'], re.IGNORECASE)
+                if halt_match:
+                    station_data['halt'] = f"{halt_match.group(1)}m"
+
+            return station_data
+
+        except Exception as e:
+            print(f"Error parsing schedule row: {str(e)}")
+            return None
+
+    def parse_time(self, text):
+        """Extract time from text in HH:MM format"""
+        time_match = re.search(r'(\d{1,2}:\d{2})', text)
+        return time_match.group(1) if time_match else ''
+
+    def parse_delay(self, text):
+        """Extract delay information from text"""
+        if not text:
+            return ''
+
+        delay_pattern = r'(?:Late by|Delay(?:ed)? by|Running late by)\s+(\d+)\s*(?:min|minutes|hrs|hours)'
+        delay_match = re.search(delay_pattern, text, re.IGNORECASE)
+        if delay_match:
+            return f"{delay_match.group(1)} Min"
+        elif 'Right Time' in text or 'On Time' in text:
+            return ''
+        return ''
+
+
+def load_rows(name):
+    """Row inputs for each parser from one saved page"""
+    soup = BeautifulSoup(load_fixture(name), 'html.parser')
+
+    rows = {'station_row': [], 'schedule_row': [], 'station_name': [], 'time': [], 'route': []}
+    for well in soup.find('div', class_='running-status').find_all('div', class_='well'):
+        station_row = well.find('div', class_='rs__station-row')
+        if not station_row:
+            continue
+        cols = station_row.find_all('div', class_=lambda x: x and x.startswith('col-xs-'))
+        rows['station_row'].append(well.get_text())
+        rows['schedule_row'].append(cols)
+        rows['station_name'].append(station_row.find('span', class_='rs__station-name').get_text())
+        rows['time'].extend(col.get_text() for col in cols[2:])
+    for element in soup.find_all(['div', 'p', 'span'], class_=lambda x: x and 'route' in x.lower()):
+        rows['route'].append(element.get_text())
+    return rows
+
+
+def row_parsers(parsers):
+    """Parser name -> function, for either the legacy or the current parsers"""
+    return {
+        'station_row': parsers.parse_station_row,
+        'schedule_row': parsers.parse_schedule_row,
+        'station_name': parsers.clean_station_name,
+        'time': parsers.parse_time,
+        'route': parsers.parse_route,
+    }
+
+
+def time_parser(parse, inputs, iterations, repeats=5):
+    """Microseconds per call of parse over inputs, best of repeats"""
+    best = None
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            for value in inputs:
+                parse(value)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (iterations * len(inputs)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    before = row_parsers(LegacyRowParsers())
+    after = row_parsers(ConfirmTktAPI(test_proxies_on_start=False))
+
+    print(f"{'fixture':<20} {'parser':<14} {'rows':>5} {'before':>9} {'after':>9} {'speedup':>8}  output")
+    for fixture in FIXTURES:
+        rows = load_rows(fixture)
+        for name, inputs in rows.items():
+            if not inputs:
+                continue
+            same = all(before[name](value) == after[name](value) for value in inputs)
+            old_cost = time_parser(before[name], inputs, iterations)
+            new_cost = time_parser(after[name], inputs, iterations)
+            print(f"{fixture:<20} {name:<14} {len(inputs):>5} {old_cost:>9.2f} {new_cost:>9.2f} "
+                  f"{old_cost / new_cost:>7.2f}x  {'same' if same else 'DIFFERS'}")
+    print("before/after: us per row, best of 5")
+
+
+if __name__ == '__main__':
+    main()
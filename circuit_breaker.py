@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker - Per-proxy closed / open / half-open state machine.
+
+closed     Traffic flows; max_failures consecutive failures trip the breaker.
+open       No traffic for open_for seconds. The first trip opens for
+           base_open seconds, every failed trial doubles it up to max_open.
+half-open  open_for has passed: exactly one trial (a request or a health
+           probe) is let through. Success closes the breaker and resets the
+           open duration; failure re-opens it for twice as long. A trial that
+           never reports back is re-offered after trial_timeout.
+
+Breakers hold no lock of their own: ProxyRotator keeps them under its lock
+next to the selection heaps.
+"""
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+class CircuitBreaker:
+    def __init__(self, max_failures=3, base_open=30, max_open=1800, trial_timeout=60):
+        self.max_failures = max_failures  # Consecutive failures that trip a closed breaker
+        self.base_open = base_open  # Seconds open after the first trip
+        self.max_open = max_open  # Cap on the doubled open duration
+        self.trial_timeout = trial_timeout  # Seconds before a silent trial is re-offered
+        self.state = CLOSED
+        self.failures = 0  # Consecutive failures while closed
+        self.open_for = 0  # Current open duration, 0 while closed
+        self.opened_at = None
+        self.trial_started = None
+        self.trips = 0
+
+    def retry_at(self):
+        """When the next trial may start (open), or when the running one is given up on (half-open)"""
+        if self.state == OPEN:
+            return self.opened_at + self.open_for
+        if self.state == HALF_OPEN:
+            return self.trial_started + self.trial_timeout
+        return None
+
+    def ready_for_trial(self, current_time):
+        return self.state != CLOSED and current_time >= self.retry_at()
+
+    def start_trial(self, current_time):
+        self.state = HALF_OPEN
+        self.trial_started = current_time
+
+    def trip(self, current_time):
+        """Open the breaker; a breaker that was already open or on trial stays open twice as long"""
+        if self.state == CLOSED:
+            self.open_for = self.base_open
+        else:
+            self.open_for = min(self.max_open, self.open_for * 2)
+        self.state = OPEN
+        self.opened_at = current_time
+        self.trial_started = None
+        self.failures = 0
+        self.trips += 1
+
+    def record_success(self):
+        """Returns True if this closed a tripped breaker"""
+        was_tripped = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        self.open_for = 0
+        self.opened_at = None
+        self.trial_started = None
+        return was_tripped
+
+    def record_failure(self, current_time):
+        """Returns True if this tripped the breaker.
+
+        Failures reported while open come from requests sent before the trip
+        (or last-resort picks) and say nothing new, so they are ignored.
+        """
+        if self.state == HALF_OPEN:
+            self.trip(current_time)
+            return True
+        if self.state == CLOSED:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.trip(current_time)
+                return True
+        return False
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'open_for': self.open_for,
+            'retry_at': self.retry_at(),
+            'trips': self.trips
+        }
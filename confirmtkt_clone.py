@@ -9,196 +9,50 @@ A comprehensive train information service that provides:
 """
 
 import os
-import sys
 import json
+import hmac
 import time
-import random
-import re
+import asyncio
+import atexit
+import threading
+import contextlib
+import contextvars
 import requests
-from datetime import datetime
-from flask import Flask, render_template, request, jsonify, make_response
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import Flask, render_template, request, jsonify, make_response, g
 import urllib3
+from session_pool import SessionPool
+from async_fetch import AsyncFetcher
+from proxy_tester import PROXY_SCHEMES, ProbeError, probe_proxy_schemes, run_concurrent
+from proxy_rotator import ProxyRotator
+from proxy_store import ProxyStore, atomic_write
+from health_check import HealthChecker
+from response_cache import ResponseCache
+from response_capture import ResponseCapture
+from single_flight import SingleFlight, AsyncSingleFlight
+from retry_policy import Deadline, Backoff, RetryState
+from page_parser import parse_html, LIVE_STATUS_STRAINER, SCHEDULE_STRAINER
+from live_status_extractor import extract_live_status
+from page_index import PageIndex, train_patterns
+from patterns import (
+    TRAIN_NAME_ASSIGNMENT, DATA_ASSIGNMENT, HEADING_SUFFIX, PARENTHESES, ROUTE_PATTERNS,
+    RUNNING_DAY_PATTERNS, DAY_SEPARATOR, LIVE_DESCRIPTION_NAME, LIVE_STATUS_STATION, LAST_UPDATED,
+    PNR_TRAIN, PNR_JOURNEY, PNR_DETAILS, PNR_BERTH, RATING
+)
+import text_parsers
+from metrics import Registry, Counter, Gauge, PARSE_BUCKETS, ATTEMPT_BUCKETS
+import structured_log
+from structured_log import get_logger
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-class ProxyRotator:
-    def __init__(self):
-        self.proxies = []
-        self.current_index = 0
-        self.last_shuffle = time.time()
-        self.shuffle_interval = 300  # 5 minutes
-        self.proxy_stats = {}  # Track proxy performance
-        self.failed_proxies = set()  # Track temporarily failed proxies
-        self.max_failures = 3  # Max failures before temporary blacklist
-        self.failure_timeout = 300  # 5 minutes timeout for failed proxies
-        self.fast_proxies = []  # List of proxies with good response times
-        self.load_proxies()
-
-    def load_proxies(self):
-        """Load proxies with performance data"""
-        try:
-            # Load detailed proxy information
-            with open('working_proxies_detailed.json', 'r') as f:
-                data = json.load(f)
-                if isinstance(data, dict) and 'working_proxies' in data:
-                    # Sort proxies by response time
-                    proxies = data['working_proxies']
-                    proxies.sort(key=lambda x: x['timings']['total'])
-                    
-                    # Keep track of fast proxies (response time < 2 seconds)
-                    for proxy_info in proxies:
-                        if isinstance(proxy_info, dict) and 'proxy' in proxy_info:
-                            proxy = proxy_info['proxy']
-                            self.proxies.append(proxy)
-                            response_time = proxy_info['timings']['total']
-                            
-                            if response_time < 2.0:  # Fast proxy threshold
-                                self.fast_proxies.append(proxy)
-                                
-                            self.proxy_stats[proxy] = {
-                                'success': 0,
-                                'failure': 0,
-                                'last_success': None,
-                                'last_failure': None,
-                                'avg_response': response_time,
-                                'last_used': 0
-                            }
-        except Exception as e:
-            print(f"Error loading working_proxies_detailed.json: {str(e)}")
-            
-        # Fallback to simple proxy list if detailed info not available
-        if not self.proxies:
-            try:
-                with open('working_proxies.txt', 'r') as f:
-                    self.proxies = [line.strip() for line in f if line.strip()]
-                    for proxy in self.proxies:
-                        self.proxy_stats[proxy] = {
-                            'success': 0,
-                            'failure': 0,
-                            'last_success': None,
-                            'last_failure': None,
-                            'avg_response': float('inf'),
-                            'last_used': 0
-                        }
-            except Exception as e:
-                print(f"Error loading working_proxies.txt: {str(e)}")
-            
-        # Add backup proxies if no proxies loaded
-        if not self.proxies:
-            backup_proxies = [
-                "188.166.230.109:31028",  # Fastest from last test
-                "161.35.70.249:8080",
-                "138.68.60.8:80",
-                "35.179.146.181:3128",
-                "51.81.245.3:17981"
-            ]
-            self.proxies = backup_proxies
-            self.fast_proxies = backup_proxies[:2]  # Consider first two as fast
-            for proxy in backup_proxies:
-                self.proxy_stats[proxy] = {
-                    'success': 0,
-                    'failure': 0,
-                    'last_success': None,
-                    'last_failure': None,
-                    'avg_response': float('inf'),
-                    'last_used': 0
-                }
-        
-        print(f"Loaded {len(self.proxies)} proxies ({len(self.fast_proxies)} fast) for rotation")
-        random.shuffle(self.proxies)  # Initial shuffle
+logger = get_logger(__name__)
 
-    def update_proxy_stats(self, proxy, success, response_time=None):
-        """Update proxy statistics"""
-        if proxy not in self.proxy_stats:
-            return
-            
-        stats = self.proxy_stats[proxy]
-        current_time = time.time()
-        
-        if success:
-            stats['success'] += 1
-            stats['last_success'] = current_time
-            if response_time:
-                # Update moving average of response time
-                if stats['avg_response'] == float('inf'):
-                    stats['avg_response'] = response_time
-                else:
-                    stats['avg_response'] = (stats['avg_response'] * 0.7) + (response_time * 0.3)
-                
-                # Update fast proxies list
-                if response_time < 2.0 and proxy not in self.fast_proxies:
-                    self.fast_proxies.append(proxy)
-                elif response_time >= 2.0 and proxy in self.fast_proxies:
-                    self.fast_proxies.remove(proxy)
-            
-            # Remove from failed proxies if present
-            self.failed_proxies.discard(proxy)
-        else:
-            stats['failure'] += 1
-            stats['last_failure'] = current_time
-            
-            # Add to failed proxies if max failures reached
-            if stats['failure'] >= self.max_failures:
-                self.failed_proxies.add(proxy)
-                if proxy in self.fast_proxies:
-                    self.fast_proxies.remove(proxy)
-        
-        stats['last_used'] = current_time
-
-    def clean_failed_proxies(self):
-        """Remove proxies from failed list after timeout"""
-        current_time = time.time()
-        for proxy in list(self.failed_proxies):
-            stats = self.proxy_stats[proxy]
-            if current_time - stats['last_failure'] > self.failure_timeout:
-                self.failed_proxies.discard(proxy)
-                stats['failure'] = 0  # Reset failure count
-
-    def get_proxy(self):
-        """Get next best proxy using smart rotation"""
-        if not self.proxies:
-            return None
-    
-        # Clean up failed proxies
-        self.clean_failed_proxies()
-        
-        current_time = time.time()
-        
-        # First try fast proxies that haven't been used recently
-        for proxy in self.fast_proxies:
-            if proxy not in self.failed_proxies:
-                stats = self.proxy_stats[proxy]
-                if current_time - stats['last_used'] > 1:  # 1 second cooldown
-                    return proxy
-        
-        # If no fast proxies available, try regular proxies
-        attempts = 0
-        max_attempts = len(self.proxies)
-        
-        while attempts < max_attempts:
-            proxy = self.proxies[self.current_index]
-            self.current_index = (self.current_index + 1) % len(self.proxies)
-            
-            if proxy not in self.failed_proxies:
-                stats = self.proxy_stats[proxy]
-                if current_time - stats['last_used'] > 1:  # 1 second cooldown
-                    return proxy
-            
-            attempts += 1
-            
-        # If all proxies failed, try the least recently failed one
-        if self.failed_proxies:
-            least_recent_failed = min(
-                self.failed_proxies,
-                key=lambda p: self.proxy_stats[p]['last_failure'] or 0
-            )
-            return least_recent_failed
-            
-        return self.proxies[0]  # Last resort
+UPSTREAM_BUSY_STATUSES = (429, 503)  # The upstream asked us to slow down; back off even on a healthy proxy
 
 class ConfirmTktAPI:
-    def __init__(self):
-        self.base_url = "https://www.confirmtkt.com"
+    def __init__(self, test_proxies_on_start=True):
+        # Upstream site; point at a local stand-in (fake_upstream.py) for load tests
+        self.base_url = os.environ.get('UPSTREAM_BASE_URL', 'https://www.confirmtkt.com').rstrip('/')
         self.base_headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -207,99 +61,196 @@ class ConfirmTktAPI:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
-        self.proxy_rotator = ProxyRotator()
-        self.max_retries = 3
-        self.retry_delay = 2
-        print("Starting ConfirmTkt Clone server...")
+        # Proxy stats survive restarts in a SQLite store (PROXY_STORE_PATH, empty disables)
+        self.proxy_store = ProxyStore.from_env()
+        self.proxy_rotator = ProxyRotator(self.proxy_store)
+        if self.proxy_store:
+            self.proxy_rotator.start_saving()
+            atexit.register(self.proxy_rotator.stop_saving)
+        # Retry policy: one time budget per upstream request, shared by all its attempts
+        self.request_budget = float(os.environ.get('REQUEST_BUDGET_SECONDS', 30))
+        self.max_retries = 5  # Attempts per request, while the budget lasts
+        self.retry_backoff_base = 0.1  # Jittered backoff (seconds) grows from here...
+        self.retry_backoff_cap = 2.0  # ...up to this
+        self.proxy_test_workers = 32  # Proxies validated at once by test_proxies
+        
+        # Warm sessions per proxy URL; dropped as soon as the rotator blacklists the proxy
+        self.session_pool = SessionPool(max_sessions=64, pool_maxsize=10, idle_timeout=120)
+        self.proxy_rotator.blacklist_callbacks.append(self.session_pool.evict)
+        self.proxy_rotator.removed_callbacks.append(self.session_pool.evict)
+        
+        # New proxy files (proxy_tester.py runs) are merged into the live rotation (PROXY_RELOAD_SECONDS, 0 disables)
+        self.proxy_rotator.reload_interval = float(os.environ.get('PROXY_RELOAD_SECONDS', 5))
+        if self.proxy_rotator.reload_interval > 0:
+            self.proxy_rotator.start_watching()
+        
+        # Parsed API results, bounded LRU with a TTL per endpoint
+        self.response_cache = ResponseCache(max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', 2048)))
+        
+        # Stale entries are served at once and refreshed here, one refresh per key
+        self.refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cache-refresh')
+        self.refreshing = set()  # (endpoint, key) with a background refresh in flight
+        self.refresh_lock = threading.Lock()
+        self.refresh_tasks = set()  # Keeps asyncio refresh tasks alive until they finish
+        
+        # Concurrent lookups of the same (endpoint, key) share one upstream fetch
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+        
+        # Asyncio fetch engine used by the *_async API variants
+        self.async_fetcher = AsyncFetcher(self.session_pool)
+        atexit.register(self.async_fetcher.shutdown)
+        
+        # Hedged requests: race the same URL through the best proxies, staggered
+        self.hedge_requests = os.environ.get('HEDGE_REQUESTS', '0') == '1'
+        self.hedge_fanout = 3  # Number of proxies raced per request
+        self.hedge_delay = 0.5  # Seconds before firing the next hedge
+        self.hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='hedge')
+        # Prometheus metrics for /metrics; component counters are read at scrape time
+        self.metrics = Registry()
+        self.upstream_seconds = self.metrics.histogram(
+            'confirmtkt_upstream_request_seconds', 'Upstream fetch time per lookup, retries included', ['endpoint', 'result'])
+        self.upstream_in_flight = self.metrics.gauge(
+            'confirmtkt_upstream_requests_in_flight', 'Upstream fetches in progress', ['endpoint'])
+        self.upstream_attempts = self.metrics.histogram(
+            'confirmtkt_upstream_attempts', 'Proxies tried per upstream request', buckets=ATTEMPT_BUCKETS)
+        self.parse_seconds = self.metrics.histogram(
+            'confirmtkt_parse_seconds', 'Time to parse an upstream page', ['endpoint'], PARSE_BUCKETS)
+        self.metrics.add_collector(self.collect_metrics)
+        
+        # Sampled copies of upstream pages for debugging, off by default (CAPTURE_SAMPLE_PERCENT)
+        self.response_capture = ResponseCapture.from_env()
+        logger.info("Starting ConfirmTkt Clone server")
+        
+        # Periodic re-probing of stale and recently failed proxies, on a small probe budget
+        self.health_checker = HealthChecker(
+            self.proxy_rotator,
+            self.test_proxy,
+            probes_per_minute=float(os.environ.get('HEALTH_CHECK_PROBES_PER_MINUTE', 12)),
+            max_concurrent=2,
+            stale_after=600
+        )
         
         # Start proxy testing in a separate thread
-        import threading
-        self.proxy_test_thread = threading.Thread(target=self.test_proxies)
-        self.proxy_test_thread.daemon = True
-        self.proxy_test_thread.start()
-        print("Proxy testing started in background...")
+        if test_proxies_on_start:
+            self.proxy_test_thread = threading.Thread(target=self.maintain_proxies)
+            self.proxy_test_thread.daemon = True
+            self.proxy_test_thread.start()
+            logger.info("Proxy testing started in background")
 
     def test_proxy(self, proxy):
-        """Test if a proxy is working by making a request to a test URL"""
+        """Test if a proxy is working, probing every scheme at once; returns (working, response_time, scheme)"""
         test_urls = [
-            "https://www.confirmtkt.com/",  # Primary test URL
+            f"{self.base_url}/",  # Primary test URL
             "https://www.google.com",       # Backup test URL
             "https://www.cloudflare.com"    # Second backup
         ]
         
-        for test_url in test_urls:
-            try:
-                proxy_url = f"http://{proxy}" if not proxy.startswith('http') else proxy
-                
-                with requests.Session() as session:
-                    session.verify = False
-                    session.headers.update(self.base_headers)
-                    session.proxies = {
-                        'http': proxy_url,
-                        'https': proxy_url
-                    }
-                    
-                    start_time = time.time()
-                    response = session.get(test_url, timeout=5)  # Reduced timeout for faster testing
-                    response_time = time.time() - start_time
-                    
-                    if response.status_code == 200:
-                        print(f"Proxy {proxy} working with {test_url}, response time: {response_time:.2f}s")
-                        return True, response_time
+        def probe(proxy_url, stop):
+            last_error = ProbeError("Stopped before the first attempt")
+            for test_url in test_urls:
+                if stop.is_set():
+                    break  # Another scheme already answered
+                try:
+                    with requests.Session() as session:
+                        session.verify = False
+                        session.headers.update(self.base_headers)
+                        session.proxies = {
+                            'http': proxy_url,
+                            'https': proxy_url
+                        }
                         
-            except Exception as e:
-                print(f"Proxy {proxy} failed with {test_url}: {str(e)}")
-                continue
-                
-        return False, float('inf')
+                        start_time = time.time()
+                        response = session.get(test_url, timeout=(3, 5))  # Short connect timeout so losing schemes give up fast
+                        response_time = time.time() - start_time
+                        
+                        if response.status_code == 200:
+                            logger.debug("Proxy working", extra={'proxy_url': proxy_url, 'test_url': test_url, 'response_time': round(response_time, 3)})
+                            return response_time
+                        last_error = ProbeError(f"HTTP {response.status_code}")
+                            
+                except Exception as e:
+                    logger.debug("Proxy failed", extra={'proxy_url': proxy_url, 'test_url': test_url, 'error': str(e)})
+                    last_error = e
+            raise last_error
+        
+        # A proxy listed with an explicit scheme is only probed with that scheme
+        schemes = PROXY_SCHEMES
+        if '://' in proxy:
+            scheme, proxy = proxy.split('://', 1)
+            schemes = [scheme]
+            
+        try:
+            scheme, response_time = probe_proxy_schemes(proxy, probe, schemes)
+            return True, response_time, scheme
+        except Exception:
+            return False, float('inf'), None
+
+    def maintain_proxies(self):
+        """Validate the whole pool once, then hand over to the periodic health checks"""
+        self.test_proxies()
+        if self.health_checker.probes_per_minute > 0:
+            self.health_checker.start()
 
     def test_proxies(self):
-        """Test all proxies and keep only working ones"""
-        working_proxies = []
-        fast_proxies = []
+        """Validate all proxies concurrently, streaming each verdict into the rotator"""
+        working_proxies = {}  # proxy -> (response_time, scheme)
+        verdicts = {}  # proxy -> (working, response_time, scheme), for the store
+        lock = threading.Lock()
         
-        print("Testing all proxies...")
-        for proxy in self.proxy_rotator.proxies[:]:  # Copy list to avoid modification during iteration
-            is_working, response_time = self.test_proxy(proxy)
-            if is_working:
-                working_proxies.append(proxy)
-                if response_time < 5.0:  # Increased threshold for fast proxies
-                    fast_proxies.append(proxy)
+        def on_result(proxy, result):
+            is_working, response_time, scheme = result
+            self.proxy_rotator.record_probe(proxy, is_working, response_time, scheme)
+            with lock:
+                verdicts[proxy] = result
+                if is_working:
+                    working_proxies[proxy] = (response_time, scheme)
+        
+        proxies = self.proxy_rotator.proxies
+        logger.info("Testing %d proxies with %d workers", len(proxies), self.proxy_test_workers)
+        run_concurrent(proxies, self.test_proxy, on_result, max_workers=self.proxy_test_workers)
+        
+        if self.proxy_store and verdicts:
+            try:
+                self.proxy_store.record_tests(verdicts)
+            except Exception as e:
+                logger.warning("Error saving proxy test results to %s: %s", self.proxy_store.path, e)
                     
         if working_proxies:
-            print(f"Found {len(working_proxies)} working proxies ({len(fast_proxies)} fast)")
-            self.proxy_rotator.proxies = working_proxies
-            self.proxy_rotator.fast_proxies = fast_proxies
+            fast_count = sum(1 for response_time, _ in working_proxies.values() if response_time < self.proxy_rotator.fast_threshold)
+            logger.info("Found %d working proxies (%d fast)", len(working_proxies), fast_count)
             
-            # Save working proxies for future use
-            with open('working_proxies.txt', 'w') as f:
-                f.write('\n'.join(working_proxies))
-            print("Saved working proxies to working_proxies.txt")
+            # Drop the proxies that failed validation; stats of the rest are kept
+            ranked = sorted(working_proxies, key=lambda p: working_proxies[p][0])
+            self.proxy_rotator.replace_proxies([p for p in self.proxy_rotator.proxies if p in working_proxies])
             
-            # Save detailed proxy info
+            # Save detailed proxy info with the measured response times; it goes first,
+            # since the file watcher prefers it and may reload between the two writes
             proxy_details = {
                 'working_proxies': [
                     {
                         'proxy': proxy,
+                        'scheme': working_proxies[proxy][1] or 'http',
                         'timings': {
-                            'total': response_time
+                            'total': round(working_proxies[proxy][0], 3)
                         }
                     }
-                    for proxy, response_time in zip(working_proxies, [5.0 if proxy in fast_proxies else 10.0 for proxy in working_proxies])
+                    for proxy in ranked
                 ]
             }
-            with open('working_proxies_detailed.json', 'w') as f:
-                json.dump(proxy_details, f, indent=2)
-            print("Saved detailed proxy info to working_proxies_detailed.json")
+            atomic_write('working_proxies_detailed.json', json.dumps(proxy_details, indent=2))
+            logger.info("Saved detailed proxy info to working_proxies_detailed.json")
+            
+            # Save working proxies for future use
+            atomic_write('working_proxies.txt', '\n'.join(ranked))
+            logger.info("Saved working proxies to working_proxies.txt")
         else:
-            print("No working proxies found!")
+            logger.warning("No working proxies found!")
             
         return bool(working_proxies)
 
-    def make_request_with_proxy(self, url, method='get', **kwargs):
-        """Make HTTP request with smart proxy rotation and retry logic"""
-        retries = 0
-        max_retries = 5  # Increased retries
+    def _prepare_request_kwargs(self, kwargs):
+        """Fill in default timeout and browser headers for an upstream request"""
         initial_timeout = 30  # Increased timeout
         
         # Set default timeout if not provided
@@ -330,334 +281,469 @@ class ConfirmTktAPI:
             'Upgrade-Insecure-Requests': '1'
         })
         
-        last_error = None
-        while retries < max_retries:
-            try:
-                # Always use proxy - never expose real IP
-                proxy = self.proxy_rotator.get_proxy()
-                if not proxy:
-                    print("No proxies available!")
-                    time.sleep(5)  # Wait for proxy testing to complete
-                    continue
+        # Everything else is passed straight through to the HTTP client
+        extra = {k:v for k,v in kwargs.items() if k not in ['headers', 'proxies', 'verify', 'timeout', 'budget']}
+        return kwargs['headers'], kwargs['timeout'], extra
+
+    def _proxy_formats(self, proxy):
+        """Proxy URL formats to try for a proxy, known-good scheme first"""
+        return self.proxy_rotator.get_proxy_formats(proxy)
+
+    def _accept_response(self, proxy, proxy_url, response, response_time):
+        """Record a proxied response in the rotator; return True if it should be returned to the caller"""
+        if response.status_code == 200:
+            # Check if response has actual content
+            if len(response.text.strip()) > 0:
+                # Update proxy stats with success
+                self.proxy_rotator.update_proxy_stats(proxy, True, response_time)
+                self.proxy_rotator.record_scheme(proxy, proxy_url.split('://', 1)[0])
+                return True
+            logger.warning("Empty response received", extra={'proxy_url': proxy_url})
+            self.proxy_rotator.update_proxy_stats(proxy, False)
+            return False
+        elif response.status_code == 404:
+            # Don't retry on 404, but mark proxy as working
+            self.proxy_rotator.update_proxy_stats(proxy, True, response_time)
+            self.proxy_rotator.record_scheme(proxy, proxy_url.split('://', 1)[0])
+            return True
         
-                print(f"Trying proxy: {proxy} (Attempt {retries + 1}/{max_retries})")
-                
-                # Try different proxy formats
-                proxy_formats = [
-                    f"http://{proxy}",  # Standard HTTP
-                    f"https://{proxy}",  # HTTPS
-                    f"socks5h://{proxy}"  # SOCKS5 with remote DNS
-                ]
-                
-                for proxy_url in proxy_formats:
-                    try:
-                        print(f"Trying proxy format: {proxy_url}")
-                        kwargs['proxies'] = {
-                            'http': proxy_url,
-                            'https': proxy_url
-                        }
-                        
-                        # Make request and measure time
-                        start_time = time.time()
-                        
-                        # Use session for connection pooling
-                        with requests.Session() as session:
-                            # Set session-level parameters
-                            session.verify = False
-                            session.headers.update(kwargs['headers'])
-                            session.proxies = kwargs['proxies']
-                            
-                            # Make the request
-                            response = session.request(
-                                method, 
-                                url, 
-                                timeout=kwargs['timeout'],
-                                **{k:v for k,v in kwargs.items() if k not in ['headers', 'proxies', 'verify', 'timeout']}
-                            )
-                            
-                        response_time = time.time() - start_time
-                        print(f"Response time: {response_time:.2f}s")
-                        
-                        if response.status_code == 200:
-                            # Check if response has actual content
-                            if len(response.text.strip()) > 0:
-                                # Update proxy stats with success
-                                self.proxy_rotator.update_proxy_stats(proxy, True, response_time)
-                                return response
-                            else:
-                                print("Empty response received")
-                                continue
-                        elif response.status_code == 404:
-                            # Don't retry on 404, but mark proxy as working
-                            self.proxy_rotator.update_proxy_stats(proxy, True, response_time)
-                            return response
-                        else:
-                            # Mark proxy as failed for non-200 responses
-                            print(f"Request failed with status {response.status_code}")
-                            self.proxy_rotator.update_proxy_stats(proxy, False)
-                            last_error = f"HTTP {response.status_code}"
-                            continue
-                            
-                    except (requests.exceptions.ProxyError, requests.exceptions.ConnectTimeout) as e:
-                        print(f"Proxy format {proxy_url} failed: {str(e)}")
-                        continue
-                        
-                # If we get here, all proxy formats failed
+        # Mark proxy as failed for non-200 responses
+        logger.warning("Request failed", extra={'proxy_url': proxy_url, 'status': response.status_code})
+        self.proxy_rotator.update_proxy_stats(proxy, False)
+        return False
+
+    def _retry_delay(self, retries, proxy, upstream_busy, backoff, deadline):
+        """Seconds to wait before trying proxy: none for a first attempt or a switch to a healthy proxy"""
+        if retries == 0 or (not upstream_busy and self.proxy_rotator.is_healthy(proxy)):
+            return 0
+        return backoff.next_delay(deadline)
+
+    def _begin_attempt(self, state):
+        """Pick the proxy for the next attempt; returns (proxy, seconds to wait first), proxy None if there is none"""
+        # Always use proxy - never expose real IP
+        proxy = self.proxy_rotator.get_proxy()
+        if not proxy:
+            logger.warning("No proxies available!")
+            state.last_error = state.last_error or "No proxies available"
+            return None, state.backoff.next_delay(state.deadline)  # Wait for proxy testing to complete
+        
+        delay = self._retry_delay(state.retries, proxy, state.upstream_busy, state.backoff, state.deadline)
+        state.upstream_busy = False
+        logger.debug("Trying proxy", extra={'proxy': proxy, 'attempt': state.retries + 1, 'max_attempts': state.max_retries})
+        return proxy, delay
+
+    def _record_response(self, state, proxy, proxy_url, response, response_time):
+        """Book a response a proxy returned; True if it goes back to the caller.
+
+        Either way the attempt is over: the proxy answered, and its other
+        schemes would only fetch the same answer.
+        """
+        logger.debug("Upstream response", extra={'proxy_url': proxy_url, 'status': response.status_code, 'response_time': round(response_time, 3)})
+        if self._accept_response(proxy, proxy_url, response, response_time):
+            return True
+        if response.status_code != 200:
+            state.last_error = f"HTTP {response.status_code}"
+            state.upstream_busy = response.status_code in UPSTREAM_BUSY_STATUSES
+        return False
+
+    def _record_error(self, state, proxy, proxy_url, error, cut_short):
+        """Book a failed fetch; True if the proxy's next scheme is worth trying.
+
+        cut_short: the attempt timeout was shrunk to fit the deadline budget.
+        """
+        if isinstance(error, (requests.exceptions.ProxyError, requests.exceptions.ConnectTimeout)):
+            logger.debug("Proxy format failed", extra={'proxy_url': proxy_url, 'error': str(error)})
+            state.last_error = str(error)
+            return True
+        
+        if isinstance(error, requests.exceptions.Timeout):
+            # A timeout cut short by the budget says nothing about the proxy
+            if not cut_short:
                 self.proxy_rotator.update_proxy_stats(proxy, False)
-                print(f"All proxy formats failed for {proxy}")
-                    
-            except requests.exceptions.Timeout:
-                # For timeout errors, mark proxy as failed but don't increase timeout
-                if proxy:
-                    self.proxy_rotator.update_proxy_stats(proxy, False)
-                print(f"Request timeout with proxy {proxy}")
-                last_error = "Timeout"
-                
-            except requests.exceptions.RequestException as e:
-                # Mark proxy as failed on connection errors
-                if proxy:
-                    self.proxy_rotator.update_proxy_stats(proxy, False)
-                print(f"Request error with proxy {proxy}: {str(e)}")
-                last_error = str(e)
-                
-            except Exception as e:
-                if proxy:
-                    self.proxy_rotator.update_proxy_stats(proxy, False)
-                print(f"Unexpected error with proxy {proxy}: {str(e)}")
-                last_error = str(e)
-            
-            retries += 1
-            if retries < max_retries:
-                time.sleep(5)  # Increased delay between retries
+            logger.warning("Request timeout", extra={'proxy': proxy})
+            state.last_error = "Timeout"
+        elif isinstance(error, requests.exceptions.RequestException):
+            # Mark proxy as failed on connection errors
+            self.proxy_rotator.update_proxy_stats(proxy, False)
+            logger.warning("Request error", extra={'proxy': proxy, 'error': str(error)})
+            state.last_error = str(error)
+        else:
+            self.proxy_rotator.update_proxy_stats(proxy, False)
+            logger.exception("Unexpected error", extra={'proxy': proxy})
+            state.last_error = str(error)
+        return False
+
+    def _all_formats_failed(self, proxy):
+        """Every scheme of a proxy failed to connect: one failure for the proxy"""
+        self.proxy_rotator.update_proxy_stats(proxy, False)
+        logger.warning("All proxy formats failed", extra={'proxy': proxy})
+
+    def _new_retry_state(self, kwargs):
+        deadline = Deadline(kwargs.pop('budget', self.request_budget))
+        return RetryState(deadline, Backoff(self.retry_backoff_base, self.retry_backoff_cap), self.max_retries)
+
+    def make_request_with_proxy(self, url, method='get', **kwargs):
+        """Make HTTP request with smart proxy rotation and retry logic, within one time budget"""
+        state = self._new_retry_state(kwargs)
+        if self.hedge_requests:
+            response = self.make_hedged_request(url, method, deadline=state.deadline, **kwargs)
+            if response is not None:
+                return response
+            logger.warning("Hedged request found no winner, falling back to sequential retries")
         
-        if last_error:
-            raise Exception(f"All proxy attempts failed. Last error: {last_error}")
-        return None
-    
-    def clean_text(self, text):
-        """Clean text by removing extra whitespace and newlines"""
-        if not text:
-            return ''
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
-        return text
-
-    def clean_station_name(self, text):
-        """Clean station name by removing codes and standardizing format"""
-        if not text:
-            return ''
+        headers, timeout, extra = self._prepare_request_kwargs(kwargs)
+        while state.attempts_left():
+            proxy, delay = self._begin_attempt(state)
+            if delay:
+                time.sleep(delay)
+            if not proxy:
+                continue
             
-        # Remove station code at end (e.g. " - HWH" or " - NDLS")
-        text = re.sub(r'\s*-\s*[A-Z]{2,5}$', '', text)
-        
-        # Remove common suffixes
-        text = re.sub(r'\s*(?:Jn|Junction|Junc|Stn|Station|Halt|H|Terminal|Term)\s*$', '', text, flags=re.IGNORECASE)
+            for proxy_url in self._proxy_formats(proxy):
+                if state.deadline.expired():
+                    break
+                attempt_timeout = state.deadline.timeout(timeout)
+                start_time = time.time()
+                try:
+                    # Reuse the pooled keep-alive session for this proxy URL
+                    session = self.session_pool.get_session(proxy_url)
+                    response = session.request(method, url, headers=headers, timeout=attempt_timeout, **extra)
+                except Exception as e:
+                    if self._record_error(state, proxy, proxy_url, e, attempt_timeout < timeout):
+                        continue
+                    break
+                if self._record_response(state, proxy, proxy_url, response, time.time() - start_time):
+                    self.upstream_attempts.observe(state.retries + 1)
+                    return response
+                break
+            else:
+                self._all_formats_failed(proxy)
+            state.retries += 1
         
-        # Clean up remaining text
-        return self.clean_text(text)
+        self.upstream_attempts.observe(state.retries)
+        return state.give_up()
 
-    def parse_station_info(self, text):
-        """Parse station info from text containing date/time/status"""
-        if not text:
+    def _hedge_attempt(self, proxy, url, method, headers, timeout, extra, cancelled, deadline):
+        """One leg of a hedged request: try the proxy's formats and book exactly one outcome for it"""
+        state = RetryState(deadline)
+        for proxy_url in self._proxy_formats(proxy):
+            if cancelled.is_set() or deadline.expired():
+                return None  # Another leg already won, or the budget is spent
+            attempt_timeout = deadline.timeout(timeout)
+            start_time = time.time()
+            try:
+                session = self.session_pool.get_session(proxy_url)
+                response = session.request(method, url, headers=headers, timeout=attempt_timeout, **extra)
+            except Exception as e:
+                if self._record_error(state, proxy, proxy_url, e, attempt_timeout < timeout):
+                    continue
+                return None
+            if self._record_response(state, proxy, proxy_url, response, time.time() - start_time):
+                return response
             return None
-    
-        # Try to extract station name
-        station_pattern = r'^([A-Za-z\s\(\)-]+?)(?:\s*-\s*[A-Z]{2,5})?(?:Day\s+\d|[\d:]+|Right Time|Late by|Delay by|Running|Departed|Arrived)'
-        station_match = re.search(station_pattern, text)
-        if station_match:
-            return self.clean_station_name(station_match.group(1))
-            
-        # If no match, clean the original text
-        return self.clean_station_name(text)
+        self._all_formats_failed(proxy)
+        return None
 
-    def parse_station_row(self, text):
-        """Parse a live status row into station data"""
-        if not text:
-            return None
-            
-        # Initialize station data
-        station_data = {
-            'station': '',
-            'date': '',
-            'arrives': '',
-            'departs': '',
-            'delay': '',
-            'status': 'upcoming'
-        }
+    def _wait_for_hedge_winner(self, pending, timeout):
+        """Wait for a leg to return a response.
+
+        With a timeout, also stop as soon as a leg fails so the next hedge fires
+        without waiting out the stagger; with None, wait until every leg finishes.
+        """
+        while pending:
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                response = future.result()
+                if response is not None:
+                    return response
+            if timeout is not None:
+                break
+        return None
+
+    def make_hedged_request(self, url, method='get', deadline=None, **kwargs):
+        """Race the request through the best proxies, staggered, and return the first good response"""
+        deadline = deadline or Deadline(kwargs.pop('budget', self.request_budget))
+        headers, timeout, extra = self._prepare_request_kwargs(kwargs)
+        proxies = self.proxy_rotator.get_best_proxies(self.hedge_fanout)
+        cancelled = threading.Event()
+        pending = set()
         
-        # Extract station name
-        station_name = self.parse_station_info(text)
-        if not station_name:
-            return None
-            
-        # Skip if this looks like a delay message
-        if any(d in station_name.lower() for d in ['delay', 'late']):
+        try:
+            for i, proxy in enumerate(proxies):
+                if deadline.expired():
+                    break
+                logger.debug("Hedged request", extra={'proxy': proxy, 'leg': i + 1, 'legs': len(proxies)})
+                pending.add(self.hedge_executor.submit(
+                    contextvars.copy_context().run, self._hedge_attempt, proxy, url, method, headers, timeout, extra, cancelled, deadline
+                ))
+                
+                # Give the legs in flight hedge_delay to win before firing the next one;
+                # after the last leg, wait for all of them
+                is_last = i == len(proxies) - 1
+                response = self._wait_for_hedge_winner(pending, None if is_last else self.hedge_delay)
+                if response is not None:
+                    self.upstream_attempts.observe(i + 1)
+                    return response
             return None
+        finally:
+            # Losing legs still record their own stats; stop any that haven't started
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+
+    async def make_request_with_proxy_async(self, url, method='get', **kwargs):
+        """Async variant of make_request_with_proxy; waits on the event loop instead of a thread"""
+        state = self._new_retry_state(kwargs)
+        headers, timeout, extra = self._prepare_request_kwargs(kwargs)
+        while state.attempts_left():
+            proxy, delay = self._begin_attempt(state)
+            if delay:
+                await asyncio.sleep(delay)
+            if not proxy:
+                continue
             
-        station_data['station'] = station_name
-        
-        # Extract date (Day X-Mon)
-        date_match = re.search(r'Day\s+(\d+)[-\s]*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]*\d+)?', text)
-        if date_match:
-            day = date_match.group(1)
-            month = date_match.group(2) if date_match.group(2) else ''
-            station_data['date'] = f"Day {day} {month}".strip()
-        
-        # Extract times (HH:MM)
-        time_matches = re.findall(r'\d{2}:\d{2}', text)
-        if len(time_matches) >= 2:
-            station_data['arrives'] = time_matches[0]
-            station_data['departs'] = time_matches[1]
-        elif len(time_matches) == 1:
-            if 'arrives' in text.lower():
-                station_data['arrives'] = time_matches[0]
+            for proxy_url in self._proxy_formats(proxy):
+                if state.deadline.expired():
+                    break
+                attempt_timeout = state.deadline.timeout(timeout)
+                start_time = time.time()
+                try:
+                    response = await self.async_fetcher.fetch(method, url, proxy_url, headers=headers, timeout=attempt_timeout, **extra)
+                except Exception as e:
+                    if self._record_error(state, proxy, proxy_url, e, attempt_timeout < timeout):
+                        continue
+                    break
+                if self._record_response(state, proxy, proxy_url, response, time.time() - start_time):
+                    self.upstream_attempts.observe(state.retries + 1)
+                    return response
+                break
             else:
-                station_data['departs'] = time_matches[0]
+                self._all_formats_failed(proxy)
+            state.retries += 1
         
-        # Extract delay info
-        delay_match = re.search(r'(?:Late by|Delay(?:ed)? by)\s+(\d+)\s*(?:min(?:ute)?s?|hrs?|hours?)', text, re.IGNORECASE)
-        if delay_match:
-            delay_mins = delay_match.group(1)
-            station_data['delay'] = f"Delayed by {delay_mins} minutes"
-        elif 'Right Time' in text:
-            station_data['delay'] = 'On Time'
-        
-        return station_data
+        self.upstream_attempts.observe(state.retries)
+        return state.give_up()
 
-    def parse_route(self, text):
-        """Extract clean route information from text"""
-        if not text:
-            return ''
-            
-        # Remove unwanted text
-        text = re.sub(r'\s*Change\s*', '', text)
-        text = re.sub(r'\s*Running Days\s*', '', text)
-        text = re.sub(r'\n+', ' ', text)
-        
-        # Try to extract route with station names
-        route_patterns = [
-            r'([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)',
-            r'From\s+([A-Za-z\s]+)\s+To\s+([A-Za-z\s]+)',
-            r'([A-Z]{3,4})\s+to\s+([A-Z]{3,4})'
-        ]
-        
-        for pattern in route_patterns:
-            match = re.search(pattern, text)
-            if match:
-                from_station = self.clean_station_name(match.group(1))
-                to_station = self.clean_station_name(match.group(2))
-                if from_station and to_station:
-                    return f"{from_station} to {to_station}"
-        
-        return self.clean_text(text)
+    def _with_cache_state(self, result, state, age, refreshing):
+        """Copy of an API result with the cache state exposed to the client"""
+        return dict(result, cache={
+            'state': state,  # fresh, stale or miss
+            'age': round(age, 1),
+            'refreshing': refreshing
+        })
 
-    def parse_schedule_row(self, cols):
-        """Parse a schedule table row into station data"""
-        if not cols or len(cols) < 3:
-            return None
-            
+    def _start_refresh(self, endpoint, key):
+        """Claim the background refresh of a stale entry; False if one is already running"""
+        with self.refresh_lock:
+            if (endpoint, key) in self.refreshing:
+                return False
+            self.refreshing.add((endpoint, key))
+            return True
+
+    def _finish_refresh(self, endpoint, key):
+        with self.refresh_lock:
+            self.refreshing.discard((endpoint, key))
+
+    def _refresh(self, endpoint, key, build_request, parse_response):
+        """Background refresh of a stale entry; on failure the stale entry keeps being served"""
         try:
-            # Initialize with empty values
-            station_data = {
-                'sr_no': '',
-                'station': '',
-                'code': '',
-                'arrives': '',
-                'departs': '',
-                'halt': '',
-                'distance': '',
-                'avg_delay': '',
-                'day': '1'
-            }
-            
-            # Get station name from first column
-            station_text = cols[0].text.strip()
-            if not station_text or station_text.lower() in ['s.no', 'sr.no', 'station', 'stations']:
-                return None
-                
-            # Fast path for common table format
-            if station_text.isdigit():
-                station_data['sr_no'] = station_text
-                
-                # Station name and code
-                station_name = cols[1].text.strip()
-                station_code_match = re.search(r'(.*?)\s*-\s*([A-Z]{2,5})$', station_name)
-                if station_code_match:
-                    station_data.update({
-                        'station': self.clean_station_name(station_code_match.group(1)),
-                        'code': station_code_match.group(2)
-                    })
-                else:
-                    station_data['station'] = self.clean_station_name(station_name)
-                
-                # Direct column mapping for speed
-                if len(cols) > 2: station_data['arrives'] = self.parse_time(cols[2].text.strip())
-                if len(cols) > 3: station_data['departs'] = self.parse_time(cols[3].text.strip())
-                if len(cols) > 4: station_data['halt'] = cols[4].text.strip()
-                if len(cols) > 5: station_data['distance'] = re.sub(r'[^\d.]', '', cols[5].text.strip())
-                if len(cols) > 6: station_data['avg_delay'] = self.parse_delay(cols[6].text.strip())
-                if len(cols) > 7: station_data['day'] = cols[7].text.strip()
-            else:
-                # Alternative format handling
-                station_code_match = re.search(r'(.*?)\s*-\s*([A-Z]{2,5})$', station_text)
-                if station_code_match:
-                    station_data.update({
-                        'station': self.clean_station_name(station_code_match.group(1)),
-                        'code': station_code_match.group(2)
-                    })
-                else:
-                    station_data['station'] = self.clean_station_name(station_text)
-                
-                # Direct column mapping
-                if len(cols) > 1: station_data['arrives'] = self.parse_time(cols[1].text.strip())
-                if len(cols) > 2: station_data['departs'] = self.parse_time(cols[2].text.strip())
-                if len(cols) > 3: station_data['distance'] = re.sub(r'[^\d.]', '', cols[3].text.strip())
-            
-            # Quick validation
-            if not station_data['station']:
-                return None
-                
-            # Clean arrival/departure
-            if station_data['arrives'].lower() in ['source', 'start', '']:
-                station_data['arrives'] = 'Start'
-            if station_data['departs'].lower() in ['destination', 'end', '']:
-                station_data['departs'] = 'End'
-                
-            # Clean halt time
-            if station_data['halt']:
-                halt_match = re.search(r'(\d+)\s*(?:min|m)', station_data['halt'], re.IGNORECASE)
-                if halt_match:
-                    station_data['halt'] = f"{halt_match.group(1)}m"
-            
-            return station_data
-            
+            self._fetch(endpoint, key, build_request, parse_response)
         except Exception as e:
-            print(f"Error parsing schedule row: {str(e)}")
-            return None
+            logger.warning("Background refresh failed", extra={'endpoint': endpoint, 'key': key, 'error': str(e)})
+        finally:
+            self._finish_refresh(endpoint, key)
+
+    async def _refresh_async(self, endpoint, key, build_request, parse_response):
+        """Async variant of _refresh"""
+        try:
+            await self._fetch_async(endpoint, key, build_request, parse_response)
+        except Exception as e:
+            logger.warning("Background refresh failed", extra={'endpoint': endpoint, 'key': key, 'error': str(e)})
+        finally:
+            self._finish_refresh(endpoint, key)
+
+    def _lookup(self, endpoint, key, build_request, parse_response):
+        """Serve from cache (stale-while-revalidate) or fetch on a miss"""
+        entry = self.response_cache.get_entry(endpoint, key)
+        if entry is None:
+            result = self._fetch(endpoint, key, build_request, parse_response)
+            return self._with_cache_state(result, 'miss', 0, False)
+
+        result, age, stale = entry
+        if stale and self._start_refresh(endpoint, key):
+            # Run in a copy of the request's context so the refresh logs under its request ID
+            self.refresh_executor.submit(contextvars.copy_context().run, self._refresh, endpoint, key, build_request, parse_response)
+        return self._with_cache_state(result, 'stale' if stale else 'fresh', age, stale)
+
+    async def _lookup_async(self, endpoint, key, build_request, parse_response):
+        """Async variant of _lookup"""
+        entry = self.response_cache.get_entry(endpoint, key)
+        if entry is None:
+            result = await self._fetch_async(endpoint, key, build_request, parse_response)
+            return self._with_cache_state(result, 'miss', 0, False)
+
+        result, age, stale = entry
+        if stale and self._start_refresh(endpoint, key):
+            task = asyncio.get_running_loop().create_task(
+                self._refresh_async(endpoint, key, build_request, parse_response))
+            self.refresh_tasks.add(task)
+            task.add_done_callback(self.refresh_tasks.discard)
+        return self._with_cache_state(result, 'stale' if stale else 'fresh', age, stale)
+
+    def _cache_success(self, endpoint, key, result):
+        """Cache a successful API result and pass it through"""
+        if result['status'] == 'success':
+            self.response_cache.set(endpoint, key, result)
+        return result
+
+    def _fetch(self, endpoint, key, build_request, parse_response):
+        """Fetch, parse and cache one lookup; identical concurrent lookups share a single call"""
+        def fetch():
+            url, kwargs = build_request(key)
+            with self._upstream_timer(endpoint):
+                response = self.make_request_with_proxy(url, **kwargs)
+            return self._cache_success(endpoint, key, self._parse(endpoint, key, response, parse_response))
+        return self.single_flight.do((endpoint, key), fetch)
+
+    async def _fetch_async(self, endpoint, key, build_request, parse_response):
+        """Async variant of _fetch"""
+        async def fetch():
+            url, kwargs = build_request(key)
+            with self._upstream_timer(endpoint):
+                response = await self.make_request_with_proxy_async(url, **kwargs)
+            return self._cache_success(endpoint, key, self._parse(endpoint, key, response, parse_response))
+        return await self.async_single_flight.do((endpoint, key), fetch)
+
+    @contextlib.contextmanager
+    def _upstream_timer(self, endpoint):
+        """Track an upstream fetch in the in-flight gauge and latency histogram"""
+        self.upstream_in_flight.inc((endpoint,))
+        start_time = time.time()
+        result = 'error'
+        try:
+            yield
+            result = 'ok'
+        finally:
+            self.upstream_in_flight.dec((endpoint,))
+            self.upstream_seconds.observe(time.time() - start_time, (endpoint, result))
+
+    def _parse(self, endpoint, key, response, parse_response):
+        """Parse an upstream response, timing it"""
+        if self.response_capture.enabled and response is not None:
+            self.response_capture.capture(endpoint, key, response.text)
+        start_time = time.time()
+        try:
+            return parse_response(key, response)
+        finally:
+            self.parse_seconds.observe(time.time() - start_time, (endpoint,))
+
+    def collect_metrics(self):
+        """Metrics built at scrape time from the counters the components keep"""
+        proxies, proxy_stats = self.proxy_rotator.snapshot()
+        rotator_stats = self.proxy_rotator.get_stats()
+        proxy_requests = Counter('confirmtkt_proxy_requests_total', 'Upstream requests per proxy by outcome', ['proxy', 'result'])
+        proxy_response = Gauge('confirmtkt_proxy_avg_response_seconds', 'Moving average response time per proxy', ['proxy'])
+        for proxy in proxies:
+            stats = proxy_stats[proxy]
+            proxy_requests.inc((proxy, 'success'), stats['success'])
+            proxy_requests.inc((proxy, 'failure'), stats['failure'])
+            if stats['avg_response'] != float('inf'):
+                proxy_response.set(stats['avg_response'], (proxy,))
+        proxy_latency = Gauge('confirmtkt_proxy_latency_seconds', 'Streaming latency percentile per proxy (prior until measured)', ['proxy', 'quantile'])
+        proxy_success = Gauge('confirmtkt_proxy_success_ratio', 'Success rate per proxy over its recent requests', ['proxy'])
+        proxy_scores = Gauge('confirmtkt_proxy_score', 'Selection score per proxy, lower is better', ['proxy'])
+        for proxy, scored in self.proxy_rotator.scores().items():
+            proxy_latency.set(scored['p50'], (proxy, '0.5'))
+            proxy_latency.set(scored['p95'], (proxy, '0.95'))
+            proxy_success.set(scored['success_rate'], (proxy,))
+            proxy_scores.set(scored['score'], (proxy,))
+        proxy_pool = Gauge('confirmtkt_proxy_pool', 'Proxies in rotation by tier', ['tier'])
+        for tier in ('proxies', 'fast', 'failed'):
+            proxy_pool.set(rotator_stats[tier], ('total' if tier == 'proxies' else tier,))
+        selections = Counter('confirmtkt_proxy_selections_total', 'Proxies handed out by selection path', ['tier'])
+        for tier, count in rotator_stats['selections'].items():
+            selections.inc((tier,), count)
+        store_writes = Counter('confirmtkt_proxy_store_writes_total', 'Transactions written to the proxy state store', ['result'])
+        if self.proxy_store:
+            store_stats = self.proxy_store.get_stats()
+            store_writes.inc(('ok',), store_stats['writes'])
+            store_writes.inc(('error',), store_stats['errors'])
+        reloads = Counter('confirmtkt_proxy_reloads_total', 'Times the proxy files were merged into the rotation')
+        reloads.inc(amount=rotator_stats['reloads'])
+        blacklisted = Counter('confirmtkt_proxy_blacklisted_total', 'Times a proxy\'s circuit breaker tripped')
+        blacklisted.inc(amount=rotator_stats['blacklisted'])
+        breakers = Gauge('confirmtkt_proxy_breakers', 'Proxies by circuit breaker state', ['state'])
+        for state, count in rotator_stats['breakers'].items():
+            breakers.set(count, (state,))
+        # Only tripped breakers get a series per proxy; closed is the default
+        tripped = Gauge('confirmtkt_proxy_breaker_open_seconds', 'Open duration of each tripped breaker', ['proxy', 'state'])
+        for proxy, breaker in self.proxy_rotator.breaker_states().items():
+            if breaker['state'] != 'closed':
+                tripped.set(breaker['open_for'], (proxy, breaker['state']))
+
+        cache_stats = self.response_cache.get_stats()
+        cache_lookups = Counter('confirmtkt_cache_lookups_total', 'Response cache lookups by result', ['result'])
+        for result, name in (('hit', 'hits'), ('stale', 'stale_hits'), ('miss', 'misses')):
+            cache_lookups.inc((result,), cache_stats[name])
+        lookups = cache_stats['hits'] + cache_stats['stale_hits'] + cache_stats['misses']
+        cache_hit_ratio = Gauge('confirmtkt_cache_hit_ratio', 'Share of cache lookups answered from the cache, stale included')
+        cache_hit_ratio.set((cache_stats['hits'] + cache_stats['stale_hits']) / lookups if lookups else 0.0)
+        cache_entries = Gauge('confirmtkt_cache_entries', 'Entries in the response cache')
+        cache_entries.set(cache_stats['entries'])
+        cache_removals = Counter('confirmtkt_cache_removals_total', 'Entries dropped from the response cache', ['reason'])
+        cache_removals.inc(('evicted',), cache_stats['evictions'])
+        cache_removals.inc(('expired',), cache_stats['expirations'])
+
+        coalesced = Counter('confirmtkt_coalesced_lookups_total', 'Lookups that shared another caller\'s upstream fetch')
+        for stats in (self.single_flight.get_stats(), self.async_single_flight.get_stats()):
+            coalesced.inc(amount=stats['shared'])
+
+        pool_stats = self.session_pool.get_stats()
+        sessions = Gauge('confirmtkt_proxy_sessions', 'Warm keep-alive sessions held in the pool')
+        sessions.set(pool_stats['sessions'])
+        session_uses = Counter('confirmtkt_proxy_session_uses_total', 'Session pool lookups by outcome', ['result'])
+        session_uses.inc(('created',), pool_stats['created'])
+        session_uses.inc(('reused',), pool_stats['reused'])
+
+        health_stats = self.health_checker.get_stats()
+        probes = Counter('confirmtkt_health_probes_total', 'Background proxy health probes by outcome', ['result'])
+        probes.inc(('success',), health_stats['probes_run'] - health_stats['probes_failed'])
+        probes.inc(('failure',), health_stats['probes_failed'])
+
+        log_dropped = Counter('confirmtkt_log_records_dropped_total', 'Log records dropped because the log queue was full')
+        log_dropped.inc(amount=structured_log.get_stats()['dropped'])
+
+        capture_stats = self.response_capture.get_stats()
+        captures = Counter('confirmtkt_response_captures_total', 'Sampled upstream pages by capture outcome', ['result'])
+        for result in ('captured', 'dropped', 'errors'):
+            captures.inc((result,), capture_stats[result])
+
+        return [proxy_requests, proxy_response, proxy_latency, proxy_success, proxy_scores, proxy_pool, selections, store_writes,
+                reloads, blacklisted, breakers, tripped, cache_lookups, cache_hit_ratio, cache_entries, cache_removals, coalesced, sessions, session_uses,
+                probes, log_dropped, captures]
     
-    def parse_time(self, text):
-        """Extract time from text in HH:MM format"""
-        time_match = re.search(r'(\d{1,2}:\d{2})', text)
-        return time_match.group(1) if time_match else ''
-
-    def parse_delay(self, text):
-        """Extract delay information from text"""
-        if not text:
-            return ''
-            
-        delay_pattern = r'(?:Late by|Delay(?:ed)? by|Running late by)\s+(\d+)\s*(?:min|minutes|hrs|hours)'
-        delay_match = re.search(delay_pattern, text, re.IGNORECASE)
-        if delay_match:
-            return f"{delay_match.group(1)} Min"
-        elif 'Right Time' in text or 'On Time' in text:
-            return ''
-        return ''
+    # Field parsers live in text_parsers; kept as methods for existing callers
+    clean_text = staticmethod(text_parsers.clean_text)
+    clean_station_name = staticmethod(text_parsers.clean_station_name)
+    parse_station_info = staticmethod(text_parsers.parse_station_info)
+    parse_station_row = staticmethod(text_parsers.parse_station_row)
+    parse_route = staticmethod(text_parsers.parse_route)
+    parse_schedule_row = staticmethod(text_parsers.parse_schedule_row)
+    parse_time = staticmethod(text_parsers.parse_time)
+    parse_delay = staticmethod(text_parsers.parse_delay)
 
-    def get_train_name(self, soup, train_number):
+    def _page_index(self, page):
+        """Accept a soup or an already built PageIndex"""
+        return page if isinstance(page, PageIndex) else PageIndex(page)
+
+    def get_train_name(self, page, train_number):
         """Extract train name from multiple sources"""
+        page = self._page_index(page)
+        patterns = train_patterns(train_number)
+
         # Try JSON-LD script first
-        json_scripts = soup.find_all('script', type='application/ld+json')
-        for script in json_scripts:
+        for script in page.json_ld_scripts:
             try:
                 data = json.loads(script.string)
                 if isinstance(data, dict):
@@ -675,18 +761,17 @@ class ConfirmTktAPI:
                 continue
                 
         # Try finding in script data
-        scripts = soup.find_all('script', type='text/javascript')
-        for script in scripts:
+        for script in page.js_scripts:
             if script.string and 'trainName' in script.string:
                 try:
                     # Look for trainName assignment
-                    match = re.search(r'trainName\s*=\s*["\']([^"\']+)["\']', script.string)
+                    match = TRAIN_NAME_ASSIGNMENT.search(script.string)
                     if match:
                         name = self.clean_text(match.group(1))
                         if name and name != train_number:
                             return name
                     # Look for data object with TrainName
-                    match = re.search(r'data\s*=\s*({[^;]+})', script.string)
+                    match = DATA_ASSIGNMENT.search(script.string)
                     if match:
                         data = json.loads(match.group(1))
                         if 'TrainName' in data:
@@ -697,77 +782,61 @@ class ConfirmTktAPI:
                     continue
         
         # Try title and h1/h2 headers
-        for element in soup.find_all(['title', 'h1', 'h2']):
+        for element in page.headings:
             text = element.text.strip()
             if train_number in text and text != train_number:
                 # Remove common suffixes
-                text = re.sub(r'\s*(?:Train Route|Train Schedule|Running Status|Live Status|Train running status|Spot your train).*$', '', text, flags=re.IGNORECASE)
+                text = HEADING_SUFFIX.sub('', text)
                 # Extract name part
-                name_match = re.search(f"{train_number}\\s*[-/]\\s*([^-/]+)", text)
+                name_match = patterns.name_after_number.search(text)
                 if name_match:
                     name = self.clean_text(name_match.group(1))
                     if name and name != train_number:
                         return name
                 # Try extracting from parentheses
-                name_match = re.search(r'\((.*?)\)', text)
+                name_match = PARENTHESES.search(text)
                 if name_match:
                     name = self.clean_text(name_match.group(1))
                     if name and name != train_number:
                         return name
                 
-        # Try finding in page content with expanded patterns
-        train_name_patterns = [
-            f"{train_number}\\s*[-/]\\s*([A-Za-z\\s]+?)(?:\\s+(?:EXP|EXPRESS|MAIL|SF|SPL|SPECIAL|FEST|FESTIVAL|LINK|PASSENGER|PASS|LOCAL|SHUTTLE|MEMU|DEMU|EMU|INTERCITY|SUPERFAST|RAJDHANI|SHATABDI|DURONTO|GARIB|RATH|HUMSAFAR|TEJAS|VANDE|BHARAT))",
-            f"{train_number}\\s+([A-Za-z\\s]+?)(?:\\s+(?:EXP|EXPRESS|MAIL|SF|SPL|SPECIAL|FEST|FESTIVAL|LINK|PASSENGER|PASS|LOCAL|SHUTTLE|MEMU|DEMU|EMU|INTERCITY|SUPERFAST|RAJDHANI|SHATABDI|DURONTO|GARIB|RATH|HUMSAFAR|TEJAS|VANDE|BHARAT))",
-            f"([A-Za-z\\s]+?)(?:\\s+(?:EXP|EXPRESS|MAIL|SF|SPL|SPECIAL|FEST|FESTIVAL|LINK|PASSENGER|PASS|LOCAL|SHUTTLE|MEMU|DEMU|EMU|INTERCITY|SUPERFAST|RAJDHANI|SHATABDI|DURONTO|GARIB|RATH|HUMSAFAR|TEJAS|VANDE|BHARAT))\\s*[-/]?\\s*{train_number}",
-            f"{train_number}\\s*[-/]\\s*([A-Za-z\\s]+)",
-            f"([A-Za-z\\s]+)\\s*[-/]\\s*{train_number}"
-        ]
-        
-        page_text = soup.get_text()
-        for pattern in train_name_patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
+        # Try finding in page content with expanded patterns, near the train number only
+        windows = patterns.windows(page.compact_text)
+        for pattern in patterns.page_text:
+            match = patterns.search_page_text(pattern, windows)
             if match:
                 name = match.group(1).strip() if match.lastindex else match.group().strip()
                 if name and name != train_number:
                     name = self.clean_text(name)
                     # Remove train number if present
-                    name = re.sub(f"\\s*{train_number}\\s*", '', name)
+                    name = patterns.number.sub('', name)
                     if name:
                         return name
         
         # Try finding train name in table headers or cells
-        tables = soup.find_all('table')
-        for table in tables:
-            # Check table headers and cells
-            for cell in table.find_all(['th', 'td']):
-                cell_text = cell.text.strip()
-                if train_number in cell_text:
-                    # Try extracting name from cell
-                    name_match = re.search(f"{train_number}\\s*[-/]\\s*([^-/]+)", cell_text)
-                    if name_match:
-                        name = self.clean_text(name_match.group(1))
-                        if name and name != train_number:
-                            return name
-                    # Try extracting from parentheses
-                    name_match = re.search(r'\((.*?)\)', cell_text)
-                    if name_match:
-                        name = self.clean_text(name_match.group(1))
-                        if name and name != train_number:
-                            return name
+        for cell in page.table_cells:
+            cell_text = cell.text.strip()
+            if train_number in cell_text:
+                # Try extracting name from cell
+                name_match = patterns.name_after_number.search(cell_text)
+                if name_match:
+                    name = self.clean_text(name_match.group(1))
+                    if name and name != train_number:
+                        return name
+                # Try extracting from parentheses
+                name_match = PARENTHESES.search(cell_text)
+                if name_match:
+                    name = self.clean_text(name_match.group(1))
+                    if name and name != train_number:
+                        return name
         
         # Try finding in specific elements with train-related classes
-        train_elements = soup.find_all(class_=lambda x: x and any(c in str(x).lower() for c in ['train', 'schedule', 'status']))
-        for element in train_elements:
+        for element in page.train_elements:
             text = element.text.strip()
             if train_number in text:
                 # Try various patterns
-                for pattern in [
-                    f"{train_number}\\s*[-/]\\s*([^-/]+)",
-                    r'\((.*?)\)',
-                    f"([A-Za-z\\s]+)\\s*[-/]\\s*{train_number}"
-                ]:
-                    match = re.search(pattern, text)
+                for pattern in [patterns.name_after_number, PARENTHESES, patterns.name_before_number]:
+                    match = pattern.search(text)
                     if match:
                         name = self.clean_text(match.group(1))
                         if name and name != train_number:
@@ -775,29 +844,19 @@ class ConfirmTktAPI:
         
         return "Train"  # Default fallback if no name found
 
-    def get_route_info(self, soup):
+    def get_route_info(self, page):
         """Extract route information from multiple sources"""
+        page = self._page_index(page)
+
         # Look for route in specific elements first
-        route_elements = soup.find_all(['div', 'p', 'span'], class_=lambda x: x and any(
-            c in str(x).lower() for c in ['route', 'path', 'direction', 'journey']
-        ))
-        
-        for element in route_elements:
+        for element in page.route_elements:
             route = self.parse_route(element.get_text())
             if route and ' to ' in route:
                 return route
         
         # Try finding in page content
-        route_patterns = [
-            r'(?:From|Source)\s*:\s*([A-Za-z\s]+)\s+(?:To|Destination)\s*:\s*([A-Za-z\s]+)',
-            r'([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)',
-            r'([A-Za-z\s]+)\s*-\s*([A-Za-z\s]+)\s+Route',
-            r'Route\s*:\s*([A-Za-z\s]+)\s*-\s*([A-Za-z\s]+)'
-        ]
-        
-        page_text = soup.get_text()
-        for pattern in route_patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
+        for pattern in ROUTE_PATTERNS:
+            match = pattern.search(page.compact_text)
             if match:
                 from_station = self.clean_station_name(match.group(1))
                 to_station = self.clean_station_name(match.group(2))
@@ -806,393 +865,319 @@ class ConfirmTktAPI:
         
         return ''
 
-    def get_running_days(self, soup):
+    def _match_running_days(self, text):
+        for pattern in RUNNING_DAY_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                days = match.group(1) if match.lastindex else match.group()
+                days = DAY_SEPARATOR.sub(', ', days)  # Standardize separators
+                return self.clean_text(days)
+        return None
+
+    def get_running_days(self, page):
         """Extract running days from multiple sources"""
-        # Common day patterns
-        day_patterns = [
-            r'(?:Running|Runs)\s+(?:Days|on)\s*[:\s]*((?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)(?:\s*[,&]\s*(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun))*)',
-            r'(?:Running|Runs)\s+(?:on|every)\s+((?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)(?:\s*[,&]\s*(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun))*)',
-            r'((?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)(?:\s*[,&]\s*(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun))*)\s+only',
-            r'Daily',
-            r'All Days'
-        ]
-        
+        page = self._page_index(page)
+
         # Look in specific elements first
-        running_elements = soup.find_all(['div', 'p', 'span'], class_=lambda x: x and any(
-            c in str(x).lower() for c in ['running', 'schedule', 'frequency', 'days']
-        ))
-        
-        for element in running_elements:
+        for element in page.running_elements:
             text = element.get_text()
             if 'Daily' in text or 'All Days' in text:
                 return 'Daily'
-                
-            for pattern in day_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    days = match.group(1) if match.lastindex else match.group()
-                    days = re.sub(r'\s*[,&]\s*', ', ', days)  # Standardize separators
-                    return self.clean_text(days)
+            days = self._match_running_days(text)
+            if days is not None:
+                return days
         
         # Try finding in page content
-        page_text = soup.get_text()
-        if 'Daily' in page_text or 'All Days' in page_text:
+        if 'Daily' in page.text or 'All Days' in page.text:
             return 'Daily'
-            
-        for pattern in day_patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
-            if match:
-                days = match.group(1) if match.lastindex else match.group()
-                days = re.sub(r'\s*[,&]\s*', ', ', days)  # Standardize separators
-                return self.clean_text(days)
+        days = self._match_running_days(page.text)
+        if days is not None:
+            return days
         
         return 'Daily'  # Default to Daily if no specific days found
 
     def get_train_schedule(self, train_number):
         """Get train schedule using ConfirmTkt API"""
         try:
-            # Use cached response if available
-            cache_key = f"schedule_{train_number}"
-            cached_response = getattr(self, cache_key, None)
-            if cached_response and time.time() - cached_response['timestamp'] < 3600:  # 1 hour cache
-                return cached_response['data']
-
-            main_url = f"{self.base_url}/train-schedule/{train_number}"
-            
-            # Use session for connection pooling and set aggressive timeouts
-            with requests.Session() as session:
-                session.verify = False
-                session.headers.update(self.base_headers)
-                session.headers.update({
-                    'Cache-Control': 'no-cache',
-                    'Pragma': 'no-cache'
-                })
-                
-                response = self.make_request_with_proxy(
-                    main_url,
-                    timeout=10,  # 10 second timeout
-                    verify=False
-                )
-            
-            if response and response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Initialize response structure
-                result = {
-                    'train_number': train_number,
-                    'train_name': '',
-                    'route': '',
-                    'running_days': '',
-                    'stations': []
-                }
-                
-                # Parallel extraction of basic info
-                # Extract train name from title or meta description first (fastest)
-                title = soup.find('title')
-                if title:
-                    title_text = title.text
-                    train_name_match = re.search(f"{train_number}\\s*[-/]\\s*([^-/]+)", title_text)
-                    if train_name_match:
-                        result['train_name'] = self.clean_text(train_name_match.group(1))
-                
-                if not result['train_name']:
-                    meta_desc = soup.find('meta', {'name': 'description'})
-                    if meta_desc:
-                        desc_text = meta_desc.get('content', '')
-                        train_name_match = re.search(f"{train_number}\\s*[-/]\\s*([^-/]+)", desc_text)
-                        if train_name_match:
-                            result['train_name'] = self.clean_text(train_name_match.group(1))
-                
-                # Only do expensive name search if still not found
-                if not result['train_name']:
-                    result['train_name'] = self.get_train_name(soup, train_number)
-                
-                # Find schedule table directly - most important data
-                tables = soup.find_all('table')
-                schedule_found = False
-                seen_stations = set()
-                
-                for table in tables:
-                    rows = table.find_all('tr')
-                    if len(rows) > 1:
-                        # Quick check for schedule table
-                        header_cells = [cell.text.strip().lower() for cell in rows[0].find_all(['th', 'td'])]
-                        if any(indicator in ' '.join(header_cells) for indicator in ['station', 'arrives', 'departs']):
-                            schedule_found = True
-                            
-                            # Process schedule rows in parallel
-                            for row in rows[1:]:
-                                cols = row.find_all(['td', 'th'])
-                                station_data = self.parse_schedule_row(cols)
-                                
-                                if station_data and station_data['station'] not in seen_stations:
-                                    seen_stations.add(station_data['station'])
-                                    result['stations'].append(station_data)
-                
-                # Extract route and running days in parallel if schedule found
-                if schedule_found:
-                    # Extract route from first/last station if available
-                    if len(result['stations']) >= 2:
-                        first_station = result['stations'][0]['station']
-                        last_station = result['stations'][-1]['station']
-                        result['route'] = f"{first_station} to {last_station}"
-                    
-                    # Quick running days check
-                    page_text = soup.get_text()
-                    if 'Daily' in page_text or 'All Days' in page_text:
-                        result['running_days'] = 'Daily'
-                    else:
-                        result['running_days'] = self.get_running_days(soup)
-                else:
-                    # Fallback to slower extraction methods
-                    result['route'] = self.get_route_info(soup)
-                    result['running_days'] = self.get_running_days(soup)
-                
-                # Cache the response
-                setattr(self, cache_key, {
-                    'timestamp': time.time(),
-                    'data': {
-                        'status': 'success',
-                        'message': 'Schedule fetched successfully',
-                        'data': result
-                    }
-                })
-                
-                return {
-                    'status': 'success',
-                    'message': 'Schedule fetched successfully',
-                    'data': result
-                }
+            # Use cached response if available, refreshing it in the background once stale
+            return self._lookup('schedule', train_number, self._schedule_request, self.parse_schedule_response)
                 
+        except Exception as e:
+            logger.error("Error getting train schedule: %s", e)
             return {
                 'status': 'error',
-                'message': 'Failed to get train schedule'
+                'message': f'Failed to get train schedule: {str(e)}'
             }
+
+    async def get_train_schedule_async(self, train_number):
+        """Async variant of get_train_schedule running on the asyncio fetch engine"""
+        try:
+            return await self._lookup_async('schedule', train_number, self._schedule_request, self.parse_schedule_response)
                 
         except Exception as e:
-            print(f"Error getting train schedule: {str(e)}")
+            logger.error("Error getting train schedule: %s", e)
             return {
                 'status': 'error',
                 'message': f'Failed to get train schedule: {str(e)}'
             }
 
-    def get_pnr_status(self, pnr_number):
-        """Get PNR status using ConfirmTkt API"""
-        try:
-            # Use cached response if available
-            cache_key = f"pnr_{pnr_number}"
-            cached_response = getattr(self, cache_key, None)
-            if cached_response and time.time() - cached_response['timestamp'] < 300:  # 5 min cache
-                return cached_response['data']
-
-            # Updated URL format to match the website
-            main_url = f"{self.base_url}/rbooking/pnr/{pnr_number}"
-            print(f"Fetching PNR status from: {main_url}")
+    def _schedule_request(self, train_number):
+        """URL and request options for the schedule page"""
+        main_url = f"{self.base_url}/train-schedule/{train_number}"
+        return main_url, {
+            'timeout': 10,  # 10 second timeout
+            'verify': False
+        }
+
+    def parse_schedule_response(self, train_number, response):
+        """Build the schedule API result from an upstream response"""
+        if response and response.status_code == 200:
+            # Only title, description and tables; the full page is parsed if a fallback needs it
+            soup = parse_html(response.text, SCHEDULE_STRAINER)
+            full_page = None  # PageIndex of the whole page, built once if a fallback needs it
             
-            # Use session for connection pooling and set aggressive timeouts
-            with requests.Session() as session:
-                session.verify = False
-                session.headers.update(self.base_headers)
-                session.headers.update({
-                    'Cache-Control': 'no-cache',
-                    'Pragma': 'no-cache',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Referer': 'https://www.confirmtkt.com/',
-                    'Origin': 'https://www.confirmtkt.com'
-                })
-                
-                response = self.make_request_with_proxy(
-                    main_url,
-                    timeout=15,  # 15 second timeout
-                    verify=False
-                )
+            # Initialize response structure
+            result = {
+                'train_number': train_number,
+                'train_name': '',
+                'route': '',
+                'running_days': '',
+                'stations': []
+            }
             
-            if response and response.status_code == 200:
-                print("Got 200 response, parsing HTML...")
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Save the HTML for debugging
-                with open('pnr_test_response.html', 'w') as f:
-                    f.write(response.text)
-                print("Saved response HTML to pnr_test_response.html")
-                
-                # Initialize response structure
-                result = {
-                    'pnr': pnr_number,
-                    'train_number': '',
-                    'train_name': '',
-                    'train_journey': {
-                        'from': '',
-                        'to': '',
-                        'date': '',
-                        'class': '',
-                        'quota': '',
-                        'platform': ''
-                    },
-                    'passengers': [],
-                    'chart_status': 'Chart not prepared',
-                    'rating': None
-                }
-                
-                # Extract train number and name
-                train_info = soup.find('h2') or soup.find('h1')
-                if train_info:
-                    print(f"Found train info: {train_info.text.strip()}")
-                    train_text = train_info.get_text().strip()
-                    train_match = re.search(r'(\d{5})\s*[-–]\s*([^\n]+)', train_text)
-                    if train_match:
-                        result['train_number'] = train_match.group(1)
-                        result['train_name'] = train_match.group(2).strip()
-                        print(f"Extracted train: {result['train_number']} - {result['train_name']}")
-                
-                # Extract journey details
-                journey_div = soup.find('div', class_=lambda x: x and any(c in str(x).lower() for c in ['journey', 'travel', 'route']))
-                if journey_div:
-                    print(f"Found journey div: {journey_div.text.strip()}")
-                    journey_text = journey_div.get_text()
-                    
-                    # Extract stations and timings
-                    station_pattern = r'([A-Za-z\s]+)\s*-\s*([A-Z]{3,4}),\s*(\d{2}:\d{2})\s*[→⟶]\s*([A-Za-z\s]+)\s*-\s*([A-Z]{3,4}),\s*(\d{2}:\d{2})'
-                    journey_match = re.search(station_pattern, journey_text)
-                    if journey_match:
-                        result['train_journey'].update({
-                            'from': f"{journey_match.group(1).strip()} - {journey_match.group(2)}, {journey_match.group(3)}",
-                            'to': f"{journey_match.group(4).strip()} - {journey_match.group(5)}, {journey_match.group(6)}"
-                        })
-                        print(f"Extracted journey: {result['train_journey']['from']} → {result['train_journey']['to']}")
-                    
-                    # Extract date, class, quota and platform
-                    details_pattern = r'(?:([A-Za-z]{3}),\s*(\d{1,2}\s+[A-Za-z]{3}))\s*\|\s*([A-Z]{1,2})\s*\|\s*([A-Z]{2})\s*\|\s*Expected platform:\s*(\d+)'
-                    details_match = re.search(details_pattern, journey_text)
-                    if details_match:
-                        result['train_journey'].update({
-                            'date': f"{details_match.group(1)}, {details_match.group(2)}",
-                            'class': details_match.group(3),
-                            'quota': details_match.group(4),
-                            'platform': details_match.group(5)
-                        })
-                        print(f"Extracted details: {result['train_journey']['date']} | {result['train_journey']['class']} | {result['train_journey']['quota']} | Platform: {result['train_journey']['platform']}")
-                
-                # Extract chart status
-                chart_div = soup.find('div', class_=lambda x: x and 'chart' in str(x).lower())
-                if chart_div:
-                    chart_text = chart_div.get_text().strip()
-                    print(f"Found chart status: {chart_text}")
-                    if 'not prepared' in chart_text.lower():
-                        result['chart_status'] = 'Chart not prepared'
-                    elif 'prepared' in chart_text.lower():
-                        result['chart_status'] = 'Chart prepared'
-                
-                # Find passenger table
-                passenger_table = soup.find('table')
-                if passenger_table:
-                    print("Found passenger table")
-                    rows = passenger_table.find_all('tr')
-                    for i, row in enumerate(rows[1:], 1):  # Skip header
-                        cols = row.find_all(['td', 'th'])
-                        if len(cols) >= 3:
-                            current_status = cols[1].get_text().strip()
-                            booking_status = cols[2].get_text().strip()
-                            coach = cols[3].get_text().strip() if len(cols) > 3 else '-'
-                            
-                            print(f"Processing passenger {i}: Current={current_status}, Booking={booking_status}, Coach={coach}")
-                            
-                            # Parse RAC/WL number
-                            current_status_match = re.search(r'(RAC|GNWL|CNF)\s*(\d+)', current_status)
-                            is_available = 'available' in current_status.lower() or cols[1].find('span', style=lambda x: x and 'green' in str(x).lower())
+            # Parallel extraction of basic info
+            # Extract train name from title or meta description first (fastest)
+            title = soup.find('title')
+            if title:
+                title_text = title.text
+                train_name_match = train_patterns(train_number).name_after_number.search(title_text)
+                if train_name_match:
+                    result['train_name'] = self.clean_text(train_name_match.group(1))
+            
+            if not result['train_name']:
+                meta_desc = soup.find('meta', {'name': 'description'})
+                if meta_desc:
+                    desc_text = meta_desc.get('content', '')
+                    train_name_match = train_patterns(train_number).name_after_number.search(desc_text)
+                    if train_name_match:
+                        result['train_name'] = self.clean_text(train_name_match.group(1))
+            
+            # Only do expensive name search if still not found
+            if not result['train_name']:
+                full_page = PageIndex(parse_html(response.text))
+                result['train_name'] = self.get_train_name(full_page, train_number)
+            
+            # Find schedule table directly - most important data
+            tables = soup.find_all('table')
+            schedule_found = False
+            seen_stations = set()
+            
+            for table in tables:
+                rows = table.find_all('tr')
+                if len(rows) > 1:
+                    # Quick check for schedule table
+                    header_cells = [cell.text.strip().lower() for cell in rows[0].find_all(['th', 'td'])]
+                    if any(indicator in ' '.join(header_cells) for indicator in ['station', 'arrives', 'departs']):
+                        schedule_found = True
+                        
+                        # Process schedule rows in parallel
+                        for row in rows[1:]:
+                            cols = row.find_all(['td', 'th'])
+                            station_data = self.parse_schedule_row(cols)
                             
-                            passenger = {
-                                'sr_no': str(i),
-                                'current_status': {
-                                    'status': current_status_match.group(1) + ' ' + current_status_match.group(2) if current_status_match else current_status,
-                                    'available': bool(is_available),
-                                    'coach': current_status_match.group(1) if current_status_match else '',
-                                    'berth': current_status_match.group(2) if current_status_match else ''
-                                },
-                                'booking_status': booking_status,
-                                'coach': coach if coach != '-' else ''
-                            }
-                            result['passengers'].append(passenger)
-                            print(f"Added passenger: {passenger}")
-                
-                # Extract rating if available
-                rating_span = soup.find('span', class_=lambda x: x and 'rating' in str(x).lower())
-                if rating_span:
-                    rating_match = re.search(r'(\d+\.?\d*)', rating_span.get_text())
-                    if rating_match:
-                        result['rating'] = float(rating_match.group(1))
-                        print(f"Found rating: {result['rating']}")
-                
-                # Cache the response
-                setattr(self, cache_key, {
-                    'timestamp': time.time(),
-                    'data': {
-                        'status': 'success',
-                        'message': 'PNR status fetched successfully',
-                        'data': result
-                    }
-                })
+                            if station_data and station_data['station'] not in seen_stations:
+                                seen_stations.add(station_data['station'])
+                                result['stations'].append(station_data)
+            
+            # Extract route and running days in parallel if schedule found
+            if schedule_found:
+                # Extract route from first/last station if available
+                if len(result['stations']) >= 2:
+                    first_station = result['stations'][0]['station']
+                    last_station = result['stations'][-1]['station']
+                    result['route'] = f"{first_station} to {last_station}"
                 
-                return {
-                    'status': 'success',
-                    'message': 'PNR status fetched successfully',
-                    'data': result
-                }
+                # Quick running days check on the raw page
+                if 'Daily' in response.text or 'All Days' in response.text:
+                    result['running_days'] = 'Daily'
+                else:
+                    full_page = full_page or PageIndex(parse_html(response.text))
+                    result['running_days'] = self.get_running_days(full_page)
+            else:
+                # Fallback to slower extraction methods
+                full_page = full_page or PageIndex(parse_html(response.text))
+                result['route'] = self.get_route_info(full_page)
+                result['running_days'] = self.get_running_days(full_page)
             
+            return {
+                'status': 'success',
+                'message': 'Schedule fetched successfully',
+                'data': result
+            }
+            
+        return {
+            'status': 'error',
+            'message': 'Failed to get train schedule'
+        }
+
+    def get_pnr_status(self, pnr_number):
+        """Get PNR status using ConfirmTkt API"""
+        try:
+            # Use cached response if available, refreshing it in the background once stale
+            return self._lookup('pnr', pnr_number, self._pnr_request, self.parse_pnr_response)
+                
+        except Exception as e:
+            logger.exception("Error getting PNR status: %s", e)
             return {
                 'status': 'error',
-                'message': 'Failed to get PNR status'
+                'message': f'Failed to get PNR status: {str(e)}'
             }
+
+    async def get_pnr_status_async(self, pnr_number):
+        """Async variant of get_pnr_status running on the asyncio fetch engine"""
+        try:
+            return await self._lookup_async('pnr', pnr_number, self._pnr_request, self.parse_pnr_response)
                 
         except Exception as e:
-            print(f"Error getting PNR status: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error getting PNR status: %s", e)
             return {
                 'status': 'error',
                 'message': f'Failed to get PNR status: {str(e)}'
             }
 
-    def parse_station_status(self, status_text):
-        """Parse detailed station status information"""
-        if not status_text:
-            return []
+    def _pnr_request(self, pnr_number):
+        """URL and request options for the PNR page"""
+        # Updated URL format to match the website
+        main_url = f"{self.base_url}/rbooking/pnr/{pnr_number}"
+        logger.debug("Fetching PNR status from: %s", main_url)
+        return main_url, {
+            'timeout': 15,  # 15 second timeout
+            'verify': False
+        }
+
+    def parse_pnr_response(self, pnr_number, response):
+        """Build the PNR API result from an upstream response"""
+        if response and response.status_code == 200:
+            logger.debug("Got 200 response, parsing HTML")
+            soup = parse_html(response.text)
             
-        stations = []
-        # Split by "Right Time" and clean up
-        parts = status_text.split("Right Time")
-        
-        for part in parts:
-            if not part.strip():
-                continue
+            # Initialize response structure
+            result = {
+                'pnr': pnr_number,
+                'train_number': '',
+                'train_name': '',
+                'train_journey': {
+                    'from': '',
+                    'to': '',
+                    'date': '',
+                    'class': '',
+                    'quota': '',
+                    'platform': ''
+                },
+                'passengers': [],
+                'chart_status': 'Chart not prepared',
+                'rating': None
+            }
+            
+            # Extract train number and name
+            train_info = soup.find('h2') or soup.find('h1')
+            if train_info:
+                logger.debug("Found train info: %s", train_info.text.strip())
+                train_text = train_info.get_text().strip()
+                train_match = PNR_TRAIN.search(train_text)
+                if train_match:
+                    result['train_number'] = train_match.group(1)
+                    result['train_name'] = train_match.group(2).strip()
+                    logger.debug("Extracted train: %s - %s", result['train_number'], result['train_name'])
+            
+            # Extract journey details
+            journey_div = soup.find('div', class_=lambda x: x and any(c in str(x).lower() for c in ['journey', 'travel', 'route']))
+            if journey_div:
+                logger.debug("Found journey div: %s", journey_div.text.strip())
+                journey_text = journey_div.get_text()
                 
-            # Extract station info using regex
-            match = re.search(r'([A-Za-z\s]+?)(?:Day\s+(\d+)-Jul(\d+):(\d+):(\d+))?', part)
-            if match:
-                station_name = self.clean_station_name(match.group(1))
-                if match.group(2):  # If time info exists
-                    day = match.group(2)
-                    month = "Jul"
-                    hour = match.group(4)
-                    minute = match.group(5)
-                    
-                    stations.append({
-                        'station': station_name,
-                        'date': f"Day {day}-{month}",
-                        'time': f"{hour}:{minute}",
-                        'status': 'Right Time'
+                # Extract stations and timings
+                journey_match = PNR_JOURNEY.search(journey_text)
+                if journey_match:
+                    result['train_journey'].update({
+                        'from': f"{journey_match.group(1).strip()} - {journey_match.group(2)}, {journey_match.group(3)}",
+                        'to': f"{journey_match.group(4).strip()} - {journey_match.group(5)}, {journey_match.group(6)}"
                     })
-                else:
-                    stations.append({
-                        'station': station_name,
-                        'date': '',
-                        'time': '',
-                        'status': 'Right Time'
+                    logger.debug("Extracted journey: %s → %s", result['train_journey']['from'], result['train_journey']['to'])
+                
+                # Extract date, class, quota and platform
+                details_match = PNR_DETAILS.search(journey_text)
+                if details_match:
+                    result['train_journey'].update({
+                        'date': f"{details_match.group(1)}, {details_match.group(2)}",
+                        'class': details_match.group(3),
+                        'quota': details_match.group(4),
+                        'platform': details_match.group(5)
                     })
-                    
-        return stations
+                    logger.debug("Extracted details: %(date)s | %(class)s | %(quota)s | Platform: %(platform)s", result['train_journey'])
+            
+            # Extract chart status
+            chart_div = soup.find('div', class_=lambda x: x and 'chart' in str(x).lower())
+            if chart_div:
+                chart_text = chart_div.get_text().strip()
+                logger.debug("Found chart status: %s", chart_text)
+                if 'not prepared' in chart_text.lower():
+                    result['chart_status'] = 'Chart not prepared'
+                elif 'prepared' in chart_text.lower():
+                    result['chart_status'] = 'Chart prepared'
+            
+            # Find passenger table
+            passenger_table = soup.find('table')
+            if passenger_table:
+                logger.debug("Found passenger table")
+                rows = passenger_table.find_all('tr')
+                for i, row in enumerate(rows[1:], 1):  # Skip header
+                    cols = row.find_all(['td', 'th'])
+                    if len(cols) >= 3:
+                        current_status = cols[1].get_text().strip()
+                        booking_status = cols[2].get_text().strip()
+                        coach = cols[3].get_text().strip() if len(cols) > 3 else '-'
+                        
+                        logger.debug("Processing passenger %d: Current=%s, Booking=%s, Coach=%s", i, current_status, booking_status, coach)
+                        
+                        # Parse RAC/WL number
+                        current_status_match = PNR_BERTH.search(current_status)
+                        is_available = 'available' in current_status.lower() or cols[1].find('span', style=lambda x: x and 'green' in str(x).lower())
+                        
+                        passenger = {
+                            'sr_no': str(i),
+                            'current_status': {
+                                'status': current_status_match.group(1) + ' ' + current_status_match.group(2) if current_status_match else current_status,
+                                'available': bool(is_available),
+                                'coach': current_status_match.group(1) if current_status_match else '',
+                                'berth': current_status_match.group(2) if current_status_match else ''
+                            },
+                            'booking_status': booking_status,
+                            'coach': coach if coach != '-' else ''
+                        }
+                        result['passengers'].append(passenger)
+                        logger.debug("Added passenger: %s", passenger)
+            
+            # Extract rating if available
+            rating_span = soup.find('span', class_=lambda x: x and 'rating' in str(x).lower())
+            if rating_span:
+                rating_match = RATING.search(rating_span.get_text())
+                if rating_match:
+                    result['rating'] = float(rating_match.group(1))
+                    logger.debug("Found rating: %s", result['rating'])
+            
+            return {
+                'status': 'success',
+                'message': 'PNR status fetched successfully',
+                'data': result
+            }
+        
+        return {
+            'status': 'error',
+            'message': 'Failed to get PNR status'
+        }
+
+    parse_station_status = staticmethod(text_parsers.parse_station_status)
 
     def format_station_schedule(self, stations):
         """Format station schedule into a clean structure"""
@@ -1224,214 +1209,249 @@ class ConfirmTktAPI:
     def get_live_status(self, train_number):
         """Get live status using ConfirmTkt API"""
         try:
-            # First try the running-status endpoint
-            main_url = f"https://www.confirmtkt.com/train-running-status/{train_number}"
-            response = self.make_request_with_proxy(
-                main_url,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Cache-Control': 'no-cache',
-                    'Pragma': 'no-cache'
-                },
-                verify=False,
-                timeout=30
-            )
-            
-            if response and response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+            # Use cached response if available, refreshing it in the background once stale
+            return self._lookup('live_status', train_number, self._live_status_request, self.parse_live_status_response)
                 
-                # Initialize response structure
-                result = {
-                    'train_number': train_number,
-                    'train_name': '',
-                    'current_status': '',
-                    'current_station': '',
-                    'next_station': '',
-                    'last_updated': '',
-                    'schedule': [],
-                    'has_data': True
-                }
+        except Exception as e:
+            logger.exception("Error getting live status: %s", e)
+            return {
+                'status': 'error',
+                'message': f'Failed to get live status - {str(e)}'
+            }
 
-                # Extract train name from title or meta description
-                title = soup.find('title')
-                if title:
-                    title_text = title.text
-                    # Try extracting from meta description first
-                    meta_desc = soup.find('meta', {'name': 'description'})
-                    if meta_desc:
-                        desc_text = meta_desc.get('content', '')
-                        # Pattern: "Live Train Status of DEE JU SF EXP and"
-                        desc_match = re.search(r'Live Train Status of\s+([^\\s]+(?:\s+[^\\s]+)*?)\s+and', desc_text)
-                        if desc_match:
-                            result['train_name'] = desc_match.group(1).strip()
-                        else:
-                            result['train_name'] = f"Train {train_number}"
-                    else:
-                        result['train_name'] = f"Train {train_number}"
+    async def get_live_status_async(self, train_number):
+        """Async variant of get_live_status running on the asyncio fetch engine"""
+        try:
+            return await self._lookup_async('live_status', train_number, self._live_status_request, self.parse_live_status_response)
+                
+        except Exception as e:
+            logger.exception("Error getting live status: %s", e)
+            return {
+                'status': 'error',
+                'message': f'Failed to get live status - {str(e)}'
+            }
 
-                # Look for the current status in train-update section
-                train_update = soup.find('div', class_='train-update')
-                if train_update:
-                    status_div = train_update.find('div', class_='train-update__status')
-                    if status_div:
-                        status_text = status_div.get_text().strip()
-                        result['current_status'] = status_text
-                        
-                        # Extract current station from status
-                        if 'Yet to start from' in status_text:
-                            result['current_station'] = 'Yet to start'
-                        else:
-                            # Try to extract current station name
-                            station_match = re.search(r'at\\s+([^\\n]+)', status_text, re.IGNORECASE)
-                            if station_match:
-                                result['current_station'] = station_match.group(1).strip()
-                    
-                    # Get last updated time
-                    time_div = train_update.find('div', class_='train-update__time')
-                    if time_div:
-                        time_text = time_div.get_text()
-                        time_match = re.search(r'Last Updated:\s*([^,]+)', time_text)
-                        if time_match:
-                            result['last_updated'] = time_match.group(1).strip()
-
-                # Look for the running status section with station information
-                running_status = soup.find('div', class_='running-status')
-                if running_status:
-                    print("Found running-status section")
-                    
-                    # Find all station rows
-                    station_rows = running_status.find_all('div', class_='well')
-                    print(f"Found {len(station_rows)} station rows")
-                    
-                    current_found = False
-                    for i, row in enumerate(station_rows):
-                        station_row_div = row.find('div', class_='rs__station-row')
-                        if station_row_div:
-                            # Extract station information
-                            station_grid = station_row_div.find('div', class_='rs__station-grid')
-                            if station_grid:
-                                # Get station name
-                                station_name_span = station_grid.find('span', class_='rs__station-name')
-                                if station_name_span:
-                                    station_name = station_name_span.get_text().strip()
-                                    
-                                    # Check if this is the current station (has blinking circle)
-                                    circle = station_grid.find('div', class_='circle')
-                                    is_current = circle and 'blink' in circle.get('class', [])
-                                    
-                                    # Get all columns for this row
-                                    cols = station_row_div.find_all('div', class_=lambda x: x and x.startswith('col-xs-'))
-                                    
-                                    station_data = {
-                                        'station': self.clean_station_name(station_name),
-                                        'date': '',
-                                        'arrives': '',
-                                        'departs': '',
-                                        'status': 'Right Time'
-                                    }
-                                    
-                                    # Extract date (Day X DD-Mon format)
-                                    if len(cols) >= 2:
-                                        date_col = cols[1]
-                                        spans = date_col.find_all('span')
-                                        if len(spans) >= 2:
-                                            day = spans[0].get_text().strip()
-                                            date = spans[1].get_text().strip()
-                                            station_data['date'] = f"{day} {date}"
-                                    
-                                    # Extract arrival time
-                                    if len(cols) >= 3:
-                                        arrives_col = cols[2]
-                                        arrives_span = arrives_col.find('span')
-                                        if arrives_span:
-                                            arrives_time = arrives_span.get_text().strip()
-                                            if arrives_time:
-                                                station_data['arrives'] = arrives_time
-                                            elif i == 0:  # First station
-                                                station_data['arrives'] = 'Start'
-                                    
-                                    # Extract departure time
-                                    if len(cols) >= 4:
-                                        departs_col = cols[3]
-                                        departs_span = departs_col.find('span')
-                                        if departs_span:
-                                            departs_time = departs_span.get_text().strip()
-                                            if departs_time:
-                                                station_data['departs'] = departs_time
-                                            elif i == len(station_rows) - 1:  # Last station
-                                                station_data['departs'] = 'End'
-                                    
-                                    # Extract delay/status
-                                    if len(cols) >= 5:
-                                        status_col = cols[4]
-                                        delay_div = status_col.find('div', class_='rs__station-delay')
-                                        if delay_div:
-                                            delay_text = delay_div.get_text().strip()
-                                            station_data['status'] = delay_text
-                                    
-                                    # Set current station status
-                                    if is_current:
-                                        station_data['status'] = 'current'
-                                        result['current_station'] = station_data['station']
-                                        current_found = True
-                                        
-                                        # Set next station
-                                        if i + 1 < len(station_rows):
-                                            next_row = station_rows[i + 1]
-                                            next_station_grid = next_row.find('div', class_='rs__station-grid')
-                                            if next_station_grid:
-                                                next_station_span = next_station_grid.find('span', class_='rs__station-name')
-                                                if next_station_span:
-                                                    result['next_station'] = self.clean_station_name(next_station_span.get_text().strip())
-                                    elif not current_found:
-                                        station_data['status'] = 'completed'
-                                    else:
-                                        station_data['status'] = 'upcoming'
-                                    
-                                    result['schedule'].append(station_data)
-                                    print(f"Added station: {station_data['station']} - {station_data['status']}")
-
-                # Check if we found any data
-                if not result['schedule']:
-                    # Check for "no data" messages
-                    page_text = soup.get_text().lower()
-                    if any(pattern in page_text for pattern in ['no schedule data', 'no data available', 'service not available']):
-                        result['has_data'] = False
-                        result['current_status'] = 'No schedule data available'
-                        print("Found 'no data' message in page")
-                    else:
-                        print("No schedule data found but no explicit 'no data' message")
-                        result['has_data'] = False
-                        result['current_status'] = 'Unable to fetch schedule data'
+    def _live_status_request(self, train_number):
+        """URL and request options for the running-status page"""
+        main_url = f"{self.base_url}/train-running-status/{train_number}"
+        return main_url, {
+            'headers': {
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Cache-Control': 'no-cache',
+                'Pragma': 'no-cache'
+            },
+            'verify': False,
+            'timeout': 30
+        }
 
-                print(f"Final result: has_data={result['has_data']}, schedule_count={len(result['schedule'])}")
-                print(f"Current station: {result['current_station']}, Next station: {result['next_station']}")
-                
+    def extract_live_status_fast(self, train_number, page):
+        """Live status without a DOM walk; None when the page doesn't have the expected layout"""
+        try:
+            result = extract_live_status(page, train_number, self.clean_station_name)
+        except Exception as e:
+            logger.warning("Fast live status extraction failed: %s", e)
+            return None
+        if result:
+            logger.debug("Live status from embedded state", extra={'schedule_count': len(result['schedule']), 'current_station': result['current_station']})
+        return result
+
+    def parse_live_status_response(self, train_number, response):
+        """Build the live status API result from an upstream response"""
+        if response and response.status_code == 200:
+            # Fast path: embedded state plus one scan of the station rows
+            fast_result = self.extract_live_status_fast(train_number, response.text)
+            if fast_result:
                 return {
                     'status': 'success',
                     'message': 'Live status fetched successfully',
-                    'data': result
+                    'data': fast_result
                 }
+
+            # Only title, description and the train-update / running-status sections
+            soup = parse_html(response.text, LIVE_STATUS_STRAINER)
             
-            print(f"HTTP request failed with status code: {response.status_code if response else 'No response'}")
-            return {
-                'status': 'error',
-                'message': 'Failed to get live status - Service temporarily unavailable'
+            # Initialize response structure
+            result = {
+                'train_number': train_number,
+                'train_name': '',
+                'current_status': '',
+                'current_station': '',
+                'next_station': '',
+                'last_updated': '',
+                'schedule': [],
+                'has_data': True
             }
+
+            # Extract train name from title or meta description
+            title = soup.find('title')
+            if title:
+                # Try extracting from meta description first
+                meta_desc = soup.find('meta', {'name': 'description'})
+                if meta_desc:
+                    desc_text = meta_desc.get('content', '')
+                    # Pattern: "Live Train Status of DEE JU SF EXP and"
+                    desc_match = LIVE_DESCRIPTION_NAME.search(desc_text)
+                    if desc_match:
+                        result['train_name'] = desc_match.group(1).strip()
+                    else:
+                        result['train_name'] = f"Train {train_number}"
+                else:
+                    result['train_name'] = f"Train {train_number}"
+
+            # Look for the current status in train-update section
+            train_update = soup.find('div', class_='train-update')
+            if train_update:
+                status_div = train_update.find('div', class_='train-update__status')
+                if status_div:
+                    status_text = status_div.get_text().strip()
+                    result['current_status'] = status_text
+                    
+                    # Extract current station from status
+                    if 'Yet to start from' in status_text:
+                        result['current_station'] = 'Yet to start'
+                    else:
+                        # Try to extract current station name
+                        station_match = LIVE_STATUS_STATION.search(status_text)
+                        if station_match:
+                            result['current_station'] = station_match.group(1).strip()
                 
-        except Exception as e:
-            print(f"Error getting live status: {str(e)}")
-            import traceback
-            traceback.print_exc()
+                # Get last updated time
+                time_div = train_update.find('div', class_='train-update__time')
+                if time_div:
+                    time_text = time_div.get_text()
+                    time_match = LAST_UPDATED.search(time_text)
+                    if time_match:
+                        result['last_updated'] = time_match.group(1).strip()
+
+            # Look for the running status section with station information
+            running_status = soup.find('div', class_='running-status')
+            if running_status:
+                logger.debug("Found running-status section")
+                
+                # Find all station rows
+                station_rows = running_status.find_all('div', class_='well')
+                logger.debug("Found %d station rows", len(station_rows))
+                
+                current_found = False
+                for i, row in enumerate(station_rows):
+                    station_row_div = row.find('div', class_='rs__station-row')
+                    if station_row_div:
+                        # Extract station information
+                        station_grid = station_row_div.find('div', class_='rs__station-grid')
+                        if station_grid:
+                            # Get station name
+                            station_name_span = station_grid.find('span', class_='rs__station-name')
+                            if station_name_span:
+                                station_name = station_name_span.get_text().strip()
+                                
+                                # Check if this is the current station (has blinking circle)
+                                circle = station_grid.find('div', class_='circle')
+                                is_current = circle and 'blink' in circle.get('class', [])
+                                
+                                # Get all columns for this row
+                                cols = station_row_div.find_all('div', class_=lambda x: x and x.startswith('col-xs-'))
+                                
+                                station_data = {
+                                    'station': self.clean_station_name(station_name),
+                                    'date': '',
+                                    'arrives': '',
+                                    'departs': '',
+                                    'status': 'Right Time'
+                                }
+                                
+                                # Extract date (Day X DD-Mon format)
+                                if len(cols) >= 2:
+                                    date_col = cols[1]
+                                    spans = date_col.find_all('span')
+                                    if len(spans) >= 2:
+                                        day = spans[0].get_text().strip()
+                                        date = spans[1].get_text().strip()
+                                        station_data['date'] = f"{day} {date}"
+                                
+                                # Extract arrival time
+                                if len(cols) >= 3:
+                                    arrives_col = cols[2]
+                                    arrives_span = arrives_col.find('span')
+                                    if arrives_span:
+                                        arrives_time = arrives_span.get_text().strip()
+                                        if arrives_time:
+                                            station_data['arrives'] = arrives_time
+                                        elif i == 0:  # First station
+                                            station_data['arrives'] = 'Start'
+                                
+                                # Extract departure time
+                                if len(cols) >= 4:
+                                    departs_col = cols[3]
+                                    departs_span = departs_col.find('span')
+                                    if departs_span:
+                                        departs_time = departs_span.get_text().strip()
+                                        if departs_time:
+                                            station_data['departs'] = departs_time
+                                        elif i == len(station_rows) - 1:  # Last station
+                                            station_data['departs'] = 'End'
+                                
+                                # Extract delay/status
+                                if len(cols) >= 5:
+                                    status_col = cols[4]
+                                    delay_div = status_col.find('div', class_='rs__station-delay')
+                                    if delay_div:
+                                        delay_text = delay_div.get_text().strip()
+                                        station_data['status'] = delay_text
+                                
+                                # Set current station status
+                                if is_current:
+                                    station_data['status'] = 'current'
+                                    result['current_station'] = station_data['station']
+                                    current_found = True
+                                    
+                                    # Set next station
+                                    if i + 1 < len(station_rows):
+                                        next_row = station_rows[i + 1]
+                                        next_station_grid = next_row.find('div', class_='rs__station-grid')
+                                        if next_station_grid:
+                                            next_station_span = next_station_grid.find('span', class_='rs__station-name')
+                                            if next_station_span:
+                                                result['next_station'] = self.clean_station_name(next_station_span.get_text().strip())
+                                elif not current_found:
+                                    station_data['status'] = 'completed'
+                                else:
+                                    station_data['status'] = 'upcoming'
+                                
+                                result['schedule'].append(station_data)
+                                logger.debug("Added station: %s - %s", station_data['station'], station_data['status'])
+
+            # Check if we found any data
+            if not result['schedule']:
+                # Check for "no data" messages anywhere on the page
+                page_text = parse_html(response.text).get_text().lower()
+                if any(pattern in page_text for pattern in ['no schedule data', 'no data available', 'service not available']):
+                    result['has_data'] = False
+                    result['current_status'] = 'No schedule data available'
+                    logger.debug("Found 'no data' message in page")
+                else:
+                    logger.debug("No schedule data found but no explicit 'no data' message")
+                    result['has_data'] = False
+                    result['current_status'] = 'Unable to fetch schedule data'
+
+            logger.debug("Final result: has_data=%s, schedule_count=%d", result['has_data'], len(result['schedule']))
+            logger.debug("Current station: %s, Next station: %s", result['current_station'], result['next_station'])
+            
             return {
-                'status': 'error',
-                'message': f'Failed to get live status - {str(e)}'
+                'status': 'success',
+                'message': 'Live status fetched successfully',
+                'data': result
             }
+        
+        logger.warning("HTTP request failed with status code: %s", response.status_code if response else 'No response')
+        return {
+            'status': 'error',
+            'message': 'Failed to get live status - Service temporarily unavailable'
+        }
 
 # Initialize Flask application
 app = Flask(__name__)
@@ -1441,16 +1461,59 @@ app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 300  # 5 minutes cache
 app.config['TEMPLATES_AUTO_RELOAD'] = False
 app.config['JSON_SORT_KEYS'] = False  # Disable JSON key sorting for faster responses
 
+# Leveled logs go through a bounded queue to a background writer (LOG_LEVEL, LOG_FORMAT)
+structured_log.configure_logging()
+
 # Initialize API instance with connection pooling
 session = requests.Session()
 session.verify = False
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-api = ConfirmTktAPI()
+api = ConfirmTktAPI(test_proxies_on_start=os.environ.get('PROXY_TEST_ON_START', '1') != '0')
 
 # Add response compression
 from flask_compress import Compress
 Compress(app)
 
+# Request-level metrics, registered alongside the API's on /metrics
+http_requests_in_flight = api.metrics.gauge(
+    'confirmtkt_http_requests_in_flight', 'API requests being served', ['endpoint'])
+http_request_seconds = api.metrics.histogram(
+    'confirmtkt_http_request_seconds', 'API request handling time', ['endpoint', 'status'])
+
+# Correlation ID on every log line of a request: the caller's X-Request-ID or a new one
+@app.before_request
+def start_request_log_context():
+    g.request_id = structured_log.request_id_from(request.headers.get('X-Request-ID'))
+    g.request_id_token = structured_log.request_id_var.set(g.request_id)
+
+@app.after_request
+def add_request_id(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.teardown_request
+def finish_request_log_context(error=None):
+    if 'request_id_token' in g:
+        structured_log.request_id_var.reset(g.request_id_token)
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.time()
+    g.metrics_endpoint = request.endpoint or 'not_found'
+    http_requests_in_flight.inc((g.metrics_endpoint,))
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_start' in g:
+        http_request_seconds.observe(time.time() - g.request_start, (g.metrics_endpoint, str(response.status_code)))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if 'request_start' in g:
+        http_requests_in_flight.dec((g.metrics_endpoint,))
+
 @app.after_request
 def add_header(response):
     """Add headers to improve caching and performance"""
@@ -1462,6 +1525,34 @@ def add_header(response):
 def home():
     return render_template('index.html')
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    response = make_response(api.metrics.render())
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/admin/reload-proxies', methods=['POST'])
+def reload_proxies():
+    """Merge the proxy files into the running rotation now; needs ADMIN_TOKEN as a bearer token"""
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        return not_found(None)  # Admin endpoints are off unless a token is configured
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid admin token'
+        }), 403
+    
+    added, removed = api.proxy_rotator.reload_proxies()
+    return jsonify({
+        'status': 'success',
+        'added': added,
+        'removed': removed,
+        'proxies': len(api.proxy_rotator.proxies)
+    })
+
 @app.route('/api/live-status', methods=['GET', 'POST'])
 @app.route('/api/live-status/<train_number>', methods=['GET', 'POST'])
 def live_status(train_number=None):
@@ -1559,10 +1650,10 @@ if __name__ == '__main__':
     try:
         from waitress import serve
         port = int(os.environ.get('PORT', 5001))
-        print(f"Starting production server on port {port}")
+        logger.info("Starting production server on port %d", port)
         serve(app, host='0.0.0.0', port=port, threads=4)
     except ImportError:
         # Fallback to Flask development server
         port = int(os.environ.get('PORT', 5001))
-        print(f"Starting development server on port {port}")
+        logger.info("Starting development server on port %d", port)
         app.run(host='0.0.0.0', port=port, debug=False) 
\ No newline at end of file
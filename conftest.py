@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Shared test setup: an offline environment for the whole session and an
+API factory wired to the local upstream stand-in
+"""
+
+import asyncio
+import os
+
+import pytest
+
+
+def pytest_configure(config):
+    # confirmtkt_clone builds its module-level API on import, so this has to
+    # happen before any test module is collected
+    os.environ.setdefault('PROXY_TEST_ON_START', '0')
+    os.environ.setdefault('PROXY_STORE_PATH', '')
+    os.environ.setdefault('PROXY_RELOAD_SECONDS', '0')
+
+
+class BackendSession:
+    """Sync session serving from an async test backend, so both retry loops see the same upstream"""
+    def __init__(self, backend, proxy_url):
+        self.backend = backend
+        self.proxy_url = proxy_url
+
+    def request(self, method, url, headers=None, timeout=30, **kwargs):
+        return asyncio.run(self.backend.fetch(method, url, self.proxy_url, headers=headers, timeout=timeout, **kwargs))
+
+
+@pytest.fixture
+def make_api():
+    """Build an offline API.
+
+    Async fetches are served from pages (url -> (status, text)) or from a
+    given backend; with sync=True the sync request path uses it too. With
+    neither, fetches are left alone for the test to replace.
+    """
+    from async_fetch import AsyncFetcher, LocalBackend
+    from confirmtkt_clone import ConfirmTktAPI
+
+    def build(pages=None, backend=None, sync=False, **backend_options):
+        api = ConfirmTktAPI(test_proxies_on_start=False)
+        if pages is not None:
+            backend = LocalBackend(pages, **backend_options)
+        if backend is not None:
+            api.async_fetcher = AsyncFetcher(api.session_pool, backend=backend)
+            if sync:
+                api.session_pool.get_session = lambda proxy_url: BackendSession(backend, proxy_url)
+        return api
+    return build
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Fake Upstream - Local stand-ins for confirmtkt.com and the public proxies,
+serving the saved pages so the whole request path can be load tested on one
+machine without touching the real site.
+
+- FakeUpstream: running-status, schedule and PNR pages from the fixtures,
+  with injected latency, HTTP errors and empty bodies
+- FakeHTTPProxy: forward proxy (absolute-form requests and CONNECT)
+- FakeSocksProxy: SOCKS5 proxy (no auth, CONNECT only)
+The proxies only forward to the upstream they were given and can inject
+latency and dropped connections.
+"""
+
+import http.client
+import random
+import re
+import selectors
+import socket
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from fixtures import load_fixture, schedule_page
+
+HOP_BY_HOP = {
+    'connection', 'keep-alive', 'proxy-connection', 'proxy-authorization', 'proxy-authenticate',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'content-length', 'server', 'date'
+}
+
+
+def relay(client, upstream):
+    """Copy bytes both ways between two sockets until either side closes"""
+    selector = selectors.DefaultSelector()
+    selector.register(client, selectors.EVENT_READ, upstream)
+    selector.register(upstream, selectors.EVENT_READ, client)
+    try:
+        while True:
+            for key, _ in selector.select(timeout=60):
+                data = key.fileobj.recv(65536)
+                if not data:
+                    return
+                key.data.sendall(data)
+    except OSError:
+        pass
+    finally:
+        selector.close()
+        upstream.close()
+
+
+def dead_proxy_address(host='127.0.0.1'):
+    """host:port with nothing listening, for proxies that refuse connections"""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return f"{host}:{sock.getsockname()[1]}"
+
+
+class _Server:
+    """Runs a socketserver on a daemon thread and keeps request counters"""
+    def __init__(self, server):
+        self.server = server
+        self.server.daemon_threads = True
+        self.server.owner = self
+        self.thread = None
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _UpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status, body = self.server.owner.respond(self.path)
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeUpstream(_Server):
+    ROUTES = [
+        (re.compile(r'^/train-running-status/(\d+)'), 'live_status'),
+        (re.compile(r'^/train-schedule/(\d+)'), 'schedule'),
+        (re.compile(r'^/rbooking/pnr/(\d+)'), 'pnr')
+    ]
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0,
+                 error_rate=0.0, empty_rate=0.0, seed=None):
+        super().__init__(ThreadingHTTPServer((host, port), _UpstreamHandler))
+        self.latency = latency  # Seconds added to every page
+        self.latency_jitter = latency_jitter  # Plus up to this many seconds, uniformly random
+        self.error_rate = error_rate  # Fraction of pages answered with a 503
+        self.empty_rate = empty_rate  # Fraction of pages answered 200 with an empty body
+        self.random = random.Random(seed)
+
+        train_status = load_fixture('train_status.html')
+        self.pages = {
+            'live_status': [train_status, load_fixture('response.html')],  # Picked by train number
+            'schedule': [schedule_page(train_status)],
+            'pnr': [load_fixture('pnr_test_response.html')]
+        }
+
+    @property
+    def base_url(self):
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def respond(self, path):
+        """(status_code, body) for a request path"""
+        if path == '/':
+            self.count('probes')
+            return 200, 'OK'  # Proxy health checks
+
+        for pattern, page in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            self.count('not_found')
+            return 404, ''
+
+        self.count(page)
+        delay = self.latency + self.random.uniform(0, self.latency_jitter)
+        if delay:
+            time.sleep(delay)
+
+        roll = self.random.random()
+        if roll < self.error_rate:
+            self.count('errors')
+            return 503, 'Service Unavailable'
+        if roll < self.error_rate + self.empty_rate:
+            self.count('empty')
+            return 200, ''
+        pages = self.pages[page]
+        return 200, pages[int(match.group(1)) % len(pages)]
+
+
+class _ProxyServer(_Server):
+    def __init__(self, server, upstream_address, latency, failure_rate, seed):
+        super().__init__(server)
+        self.upstream_address = tuple(upstream_address)  # (host, port) the proxy forwards to
+        self.latency = latency  # Seconds added before each forwarded request
+        self.failure_rate = failure_rate  # Fraction of connections dropped without an answer
+        self.random = random.Random(seed)
+
+    @property
+    def proxy(self):
+        """host:port as listed in the proxy files"""
+        host, port = self.address
+        return f"{host}:{port}"
+
+    def allows(self, host, port):
+        return (host, port) == self.upstream_address or (host == 'localhost' and port == self.upstream_address[1])
+
+    def admit(self):
+        """Apply the injected latency; False if this connection should be dropped"""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            self.count('dropped')
+            return False
+        self.count('forwarded')
+        return True
+
+
+class _HTTPProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _forward(self):
+        proxy = self.server.owner
+        if not proxy.admit():
+            self.close_connection = True
+            return
+
+        target = urlsplit(self.path)
+        if not target.hostname or not proxy.allows(target.hostname, target.port or 80):
+            proxy.count('refused')
+            self.send_error(403, 'Target not allowed')
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+        path = (target.path or '/') + (f"?{target.query}" if target.query else '')
+
+        connection = http.client.HTTPConnection(*proxy.upstream_address, timeout=60)
+        try:
+            connection.request(self.command, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except OSError as e:
+            self.send_error(502, str(e))
+            return
+        finally:
+            connection.close()
+
+        self.send_response(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP:
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_HEAD = _forward
+
+    def do_CONNECT(self):
+        proxy = self.server.owner
+        if not proxy.admit():
+            self.close_connection = True
+            return
+
+        host, _, port = self.path.rpartition(':')
+        if not port.isdigit() or not proxy.allows(host, int(port)):
+            proxy.count('refused')
+            self.send_error(403, 'Target not allowed')
+            return
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=10)
+        except OSError as e:
+            self.send_error(502, str(e))
+            return
+
+        self.send_response(200, 'Connection established')
+        self.end_headers()
+        self.close_connection = True
+        relay(self.connection, upstream)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeHTTPProxy(_ProxyServer):
+    def __init__(self, upstream_address, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, seed=None):
+        super().__init__(ThreadingHTTPServer((host, port), _HTTPProxyHandler), upstream_address, latency, failure_rate, seed)
+
+
+class _SocksHandler(socketserver.BaseRequestHandler):
+    def _read(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('SOCKS client closed the connection')
+            data += chunk
+        return data
+
+    def _reply(self, code):
+        self.request.sendall(struct.pack('!BBBB4sH', 5, code, 0, 1, b'\x00' * 4, 0))
+
+    def handle(self):
+        proxy = self.server.owner
+        try:
+            version, method_count = self._read(2)
+            self._read(method_count)
+            if version != 5 or not proxy.admit():
+                return
+            self.request.sendall(b'\x05\x00')  # No authentication
+
+            _, command, _, address_type = self._read(4)
+            if address_type == 1:
+                host = socket.inet_ntoa(self._read(4))
+            elif address_type == 3:
+                host = self._read(self._read(1)[0]).decode()
+            elif address_type == 4:
+                host = socket.inet_ntop(socket.AF_INET6, self._read(16))
+            else:
+                return self._reply(8)  # Address type not supported
+            port = struct.unpack('!H', self._read(2))[0]
+
+            if command != 1:
+                return self._reply(7)  # Only CONNECT
+            if not proxy.allows(host, port):
+                proxy.count('refused')
+                return self._reply(2)  # Not allowed by ruleset
+            try:
+                upstream = socket.create_connection((host, port), timeout=10)
+            except OSError:
+                return self._reply(5)  # Connection refused
+            self._reply(0)
+            relay(self.request, upstream)
+        except (ConnectionError, OSError):
+            pass
+
+
+class FakeSocksProxy(_ProxyServer):
+    def __init__(self, upstream_address, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, seed=None):
+        server = socketserver.ThreadingTCPServer((host, port), _SocksHandler)
+        super().__init__(server, upstream_address, latency, failure_rate, seed)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Fixtures - The saved upstream pages checked into the repo, for the offline
+benchmarks and the fake upstream.
+"""
+
+import os
+
+from live_status_extractor import extract_embedded_state
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_fixture(name):
+    """Contents of a saved page next to this module"""
+    with open(os.path.join(FIXTURE_DIR, name)) as f:
+        return f.read()
+
+
+def schedule_page(page):
+    """The page with its embedded timetable rendered as a schedule table.
+
+    The saved pages are running-status pages with no <table>, so this is
+    what exercises the schedule table loop and parse_schedule_row.
+    """
+    data, _, _ = extract_embedded_state(page)
+    rows = ['<tr><th>S.No</th><th>Station</th><th>Arrives</th><th>Departs</th>'
+            '<th>Halt</th><th>Distance</th><th>Avg Delay</th><th>Day</th></tr>']
+    for stop in data['Schedule']:
+        delay = ''.join(c for c in stop.get('arrivalDelay') or '' if c.isdigit())
+        rows.append(
+            f"<tr><td>{stop['StopNumber']}</td><td>{stop['StationName']} - {stop['StationCode']}</td>"
+            f"<td>{stop['ArrivalTime'] or 'Source'}</td><td>{stop['DepartureTime'] or 'Destination'}</td>"
+            f"<td>{stop['HaltMinutes']}</td><td>{stop['Distance']} km</td>"
+            f"<td>{f'Late by {int(delay)} min' if delay else 'Right Time'}</td><td>{stop['Day']}</td></tr>"
+        )
+    table = f"<table class=\"schedule\">{''.join(rows)}</table>"
+    return page.replace('<div class="running-status">', table + '<div class="running-status">', 1)
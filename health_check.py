@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Health Check - Background scheduler that keeps re-probing the proxy pool.
+
+Proxies whose last failure hasn't been re-checked come first, then proxies
+with no fresh evidence (no probe or successful request for stale_after
+seconds), oldest first. Healthy, recently used proxies are left alone, and
+so are proxies whose circuit breaker is open or already running its
+half-open trial; a probe of a due breaker claims that trial itself.
+Probes are rate limited by a token bucket (probes_per_minute) and run at
+most max_concurrent at a time, so checking never competes with live traffic.
+"""
+
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from structured_log import get_logger
+
+logger = get_logger(__name__)
+
+class HealthChecker:
+    def __init__(self, rotator, probe, probes_per_minute=12, max_concurrent=2, stale_after=600, tick_interval=5):
+        self.rotator = rotator
+        self.probe = probe  # probe(proxy) -> (working, response_time, scheme)
+        self.probes_per_minute = probes_per_minute  # Probe budget
+        self.max_concurrent = max_concurrent  # Probes in flight at once, also the burst size
+        self.stale_after = stale_after  # Seconds without evidence before a healthy proxy is re-checked
+        self.tick_interval = tick_interval  # Seconds between scheduling rounds
+        self.last_probed = {}  # Proxy -> time of its last health probe
+        self.tokens = 0.0
+        self.last_refill = time.time()
+        self.probes_run = 0
+        self.probes_failed = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='health-check')
+
+    def pick_proxies(self, count, current_time=None):
+        """Return up to count proxies most in need of a probe"""
+        if current_time is None:
+            current_time = time.time()
+        proxies, stats = self.rotator.snapshot()
+        breakers = self.rotator.breaker_states()
+
+        candidates = []
+        for proxy in proxies:
+            breaker = breakers.get(proxy)
+            if breaker and breaker['state'] != 'closed' and current_time < breaker['retry_at']:
+                continue  # Open period not over, or a half-open trial is already in flight
+            proxy_stats = stats[proxy]
+            last_probed = self.last_probed.get(proxy, 0)
+            last_evidence = max(last_probed, proxy_stats['last_success'] or 0)
+            last_failure = proxy_stats['last_failure'] or 0
+
+            if last_failure > last_probed:
+                # Failed (live traffic or blacklist) since we last looked at it
+                candidates.append((0, last_probed, proxy))
+            elif current_time - last_evidence > self.stale_after:
+                candidates.append((1, last_evidence, proxy))
+
+        return [proxy for _, _, proxy in heapq.nsmallest(count, candidates)]
+
+    def _refill(self, current_time):
+        """Token bucket: probes_per_minute spread evenly, bursting to max_concurrent"""
+        elapsed = current_time - self.last_refill
+        self.last_refill = current_time
+        self.tokens = min(self.max_concurrent, self.tokens + elapsed * self.probes_per_minute / 60.0)
+
+    def _check(self, proxy):
+        try:
+            is_working, response_time, scheme = self.probe(proxy)
+        except Exception as e:
+            logger.warning("Health check failed", extra={'proxy': proxy, 'error': str(e)})
+            is_working, response_time, scheme = False, None, None
+
+        self.rotator.record_probe(proxy, is_working, response_time, scheme)
+        # Stamped after the verdict so a failed probe doesn't count as a new failure to re-check
+        self.last_probed[proxy] = time.time()
+        self.probes_run += 1
+        if not is_working:
+            self.probes_failed += 1
+
+    def run_once(self, current_time=None):
+        """Probe as many proxies as the budget allows; returns the proxies probed"""
+        if current_time is None:
+            current_time = time.time()
+        self._refill(current_time)
+
+        # Claiming takes the half-open trial slot of a proxy whose breaker is due
+        batch = [proxy for proxy in self.pick_proxies(int(self.tokens), current_time) if self.rotator.claim_probe(proxy)]
+        self.tokens -= len(batch)
+        for future in [self.executor.submit(self._check, proxy) for proxy in batch]:
+            future.result()
+        return batch
+
+    def _run(self):
+        while not self.stop_event.wait(self.tick_interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Health check round failed: %s", e)
+
+    def start(self):
+        """Start the background scheduler thread"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.last_refill = time.time()
+        self.thread = threading.Thread(target=self._run, name='health-check')
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info("Proxy health checks started (%s probes/min)", self.probes_per_minute)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def get_stats(self):
+        return {
+            'probes_run': self.probes_run,
+            'probes_failed': self.probes_failed,
+            'probes_per_minute': self.probes_per_minute
+        }
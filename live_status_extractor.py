@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Live Status Extractor - Fast path for running-status pages that avoids
+building and walking a DOM.
+
+The page embeds its state as inline script (`var data = {...}` with the
+timetable, `var currentStnCode/currentStnName`); the live times and dates
+only exist in the server-rendered station rows. Both are read with a single
+scan of the page string. Anything unexpected (missing state, a row that
+doesn't match, row count disagreeing with the timetable) returns None so the
+caller falls back to the BeautifulSoup walk.
+"""
+
+import html
+import json
+
+from patterns import (
+    EMBEDDED_DATA, EMBEDDED_CURRENT_STATION, TRAIN_UPDATE_STATUS, TRAIN_UPDATE_TIME,
+    LAST_UPDATED, STATION_ROW, HTML_TAG, BLINKING_CIRCLE
+)
+
+
+def _text(fragment):
+    """Visible text of an HTML fragment"""
+    return html.unescape(HTML_TAG.sub('', fragment)).strip()
+
+
+def extract_embedded_state(page):
+    """Return (data, current_code, current_name) from the inline script, or None"""
+    match = EMBEDDED_DATA.search(page)
+    if not match:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(page, match.end())
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('Schedule'), list):
+        return None
+
+    current = dict(EMBEDDED_CURRENT_STATION.findall(page))
+    return data, current.get('Code', ''), current.get('Name', '')
+
+
+def extract_live_status(page, train_number, clean_station_name):
+    """Build the live status result from the embedded state and station rows, or None"""
+    state = extract_embedded_state(page)
+    if state is None:
+        return None
+    data, _, current_name = state
+
+    start = page.find('<div class="running-status">')
+    if start < 0:
+        return None
+    rows = list(STATION_ROW.finditer(page, start))
+    # Every rendered row must have matched, and agree with the timetable
+    if not rows or len(rows) != page.count('rs__station-row', start) or len(rows) != len(data['Schedule']):
+        return None
+
+    result = {
+        'train_number': train_number,
+        'train_name': data.get('TrainName') or f"Train {train_number}",
+        'current_status': '',
+        'current_station': '',
+        'next_station': '',
+        'last_updated': '',
+        'schedule': [],
+        'has_data': True
+    }
+
+    status_match = TRAIN_UPDATE_STATUS.search(page)
+    if status_match:
+        status_text = _text(status_match.group(1))
+        result['current_status'] = status_text
+        if 'Yet to start from' in status_text:
+            result['current_station'] = 'Yet to start'
+        elif current_name:
+            result['current_station'] = current_name
+
+    updated_match = TRAIN_UPDATE_TIME.search(page)
+    if updated_match:
+        time_match = LAST_UPDATED.search(_text(updated_match.group(1)))
+        if time_match:
+            result['last_updated'] = time_match.group(1).strip()
+
+    current_found = False
+    last_index = len(rows) - 1
+    for i, row in enumerate(rows):
+        station_data = {
+            'station': clean_station_name(_text(row.group('name'))),
+            'date': f"{_text(row.group('day'))} {_text(row.group('date'))}",
+            'arrives': _text(row.group('arrives')) or ('Start' if i == 0 else ''),
+            'departs': _text(row.group('departs')) or ('End' if i == last_index else ''),
+            'status': 'upcoming' if current_found else 'completed'
+        }
+
+        if not current_found and BLINKING_CIRCLE.search(row.group('grid')):
+            station_data['status'] = 'current'
+            result['current_station'] = station_data['station']
+            current_found = True
+            if i < last_index:
+                result['next_station'] = clean_station_name(_text(rows[i + 1].group('name')))
+
+        result['schedule'].append(station_data)
+
+    return result
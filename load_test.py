@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Load Test - Drives /api/live-status, /api/train-schedule and /api/pnr-status
+against local stand-ins for the upstream and the proxies (fake_upstream.py),
+and reports p50/p95/p99 latency and throughput per endpoint.
+
+The app runs as its own process (python confirmtkt_clone.py) in a scratch
+directory whose working_proxies_detailed.json lists only the fake proxies,
+with UPSTREAM_BASE_URL pointing at the fake upstream. The response cache is
+off by default so every request takes the proxied path.
+
+Usage:
+    python load_test.py --requests 300 --concurrency 16
+    python load_test.py --error-rate 0.05 --proxy-failure-rate 0.1 --dead-proxies 2
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from fake_upstream import FakeUpstream, FakeHTTPProxy, FakeSocksProxy, dead_proxy_address
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'confirmtkt_clone.py')
+
+ENDPOINTS = {
+    'live-status': '/api/live-status/{key}',
+    'train-schedule': '/api/train-schedule/{key}',
+    'pnr-status': '/api/pnr-status/{key}'
+}
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def endpoint_key(endpoint, index):
+    """Train number or PNR for the index-th distinct key of an endpoint"""
+    if endpoint == 'pnr-status':
+        return str(2000000000 + index)
+    return str(10000 + index)
+
+
+def run_load(app_url, endpoints=tuple(ENDPOINTS), total_requests=300, concurrency=16, keys=50, seed=0, timeout=120):
+    """Fire total_requests at the app from concurrency threads; returns the report dict"""
+    rng = random.Random(seed)
+    plan = [(endpoints[i % len(endpoints)], rng.randrange(keys)) for i in range(total_requests)]
+    local = threading.local()
+
+    def send(item):
+        endpoint, index = item
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        url = app_url + ENDPOINTS[endpoint].format(key=endpoint_key(endpoint, index))
+        start_time = time.perf_counter()
+        try:
+            response = local.session.get(url, timeout=timeout)
+            ok = response.status_code == 200 and response.json().get('status') == 'success'
+            outcome = 'ok' if ok else f"http_{response.status_code}" if response.status_code != 200 else 'error'
+        except requests.exceptions.RequestException as e:
+            outcome = type(e).__name__
+        return endpoint, time.perf_counter() - start_time, outcome
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(send, plan))
+    duration = time.perf_counter() - start_time
+
+    report = {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'duration': round(duration, 3),
+        'throughput': round(total_requests / duration, 2) if duration else 0,
+        'endpoints': {}
+    }
+    for endpoint in endpoints:
+        latencies = [latency for name, latency, _ in samples if name == endpoint]
+        outcomes = {}
+        for name, _, outcome in samples:
+            if name == endpoint:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        report['endpoints'][endpoint] = {
+            'requests': len(latencies),
+            'ok': outcomes.get('ok', 0),
+            'outcomes': outcomes,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(max(latencies) * 1000, 1) if latencies else 0.0,
+            'throughput': round(len(latencies) / duration, 2) if duration else 0
+        }
+    return report
+
+
+def write_proxy_files(workdir, proxies):
+    """Proxy list the app loads on start: [(host:port, scheme)]"""
+    with open(os.path.join(workdir, 'working_proxies_detailed.json'), 'w') as f:
+        json.dump({
+            'working_proxies': [
+                {'proxy': proxy, 'scheme': scheme, 'timings': {'total': 0.1}}
+                for proxy, scheme in proxies
+            ]
+        }, f, indent=2)
+
+
+def start_app(workdir, upstream_url, port, env=None, log=None):
+    """Run the app in workdir against the fake upstream; returns the Popen"""
+    app_env = dict(os.environ)
+    app_env.update({
+        'PORT': str(port),
+        'UPSTREAM_BASE_URL': upstream_url,
+        'PROXY_TEST_ON_START': '0',
+        'PYTHONUNBUFFERED': '1'
+    })
+    app_env.update(env or {})
+    return subprocess.Popen(
+        [sys.executable, APP_PATH],
+        cwd=workdir,
+        env=app_env,
+        stdout=log or subprocess.DEVNULL,
+        stderr=subprocess.STDOUT
+    )
+
+
+def wait_for_app(app_url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode} before it was ready")
+        try:
+            requests.get(app_url + '/api/live-status', timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"App not ready after {timeout}s")
+
+
+def print_report(report):
+    print(f"\n{report['requests']} requests, concurrency {report['concurrency']}: "
+          f"{report['duration']}s, {report['throughput']} req/s")
+    print(f"{'endpoint':<16} {'reqs':>5} {'ok':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>7}  outcomes")
+    for endpoint, r in report['endpoints'].items():
+        outcomes = ', '.join(f"{k}={v}" for k, v in sorted(r['outcomes'].items()))
+        print(f"{endpoint:<16} {r['requests']:>5} {r['ok']:>5} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+              f"{r['p99_ms']:>9} {r['max_ms']:>9} {r['throughput']:>7}  {outcomes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the API against a local fake upstream and proxies')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--keys', type=int, default=50, help='Distinct train numbers / PNRs per endpoint')
+    parser.add_argument('--endpoint', action='append', choices=list(ENDPOINTS), help='Endpoint to load (default: all)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Upstream latency (s)')
+    parser.add_argument('--latency-jitter', type=float, default=0.05, help='Extra random upstream latency, up to (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of upstream 503s')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='Fraction of upstream empty 200s')
+    parser.add_argument('--http-proxies', type=int, default=4)
+    parser.add_argument('--socks-proxies', type=int, default=2)
+    parser.add_argument('--dead-proxies', type=int, default=0, help='Listed proxies that refuse connections')
+    parser.add_argument('--proxy-failure-rate', type=float, default=0.0, help='Fraction of proxy connections dropped')
+    parser.add_argument('--proxy-latency', type=float, default=0.0, help='Latency added by each proxy (s)')
+    parser.add_argument('--cache-size', type=int, default=0, help='RESPONSE_CACHE_SIZE for the app (0 = off)')
+    parser.add_argument('--hedge', action='store_true', help='Run the app with HEDGE_REQUESTS=1')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--app-log', help='Write the app output to this file')
+    parser.add_argument('--json', help='Write the report to this JSON file')
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(latency=args.latency, latency_jitter=args.latency_jitter,
+                            error_rate=args.error_rate, empty_rate=args.empty_rate, seed=args.seed).start()
+    proxy_options = {'latency': args.proxy_latency, 'failure_rate': args.proxy_failure_rate}
+    fake_proxies = [FakeHTTPProxy(upstream.address, seed=args.seed + i, **proxy_options).start()
+                    for i in range(args.http_proxies)]
+    fake_proxies += [FakeSocksProxy(upstream.address, seed=args.seed + 100 + i, **proxy_options).start()
+                     for i in range(args.socks_proxies)]
+    proxy_list = [(p.proxy, 'socks5h' if isinstance(p, FakeSocksProxy) else 'http') for p in fake_proxies]
+    proxy_list += [(dead_proxy_address(), 'http') for _ in range(args.dead_proxies)]
+    print(f"Fake upstream at {upstream.base_url}, {len(proxy_list)} proxies "
+          f"({args.http_proxies} http, {args.socks_proxies} socks5, {args.dead_proxies} dead)")
+
+    app_env = {'RESPONSE_CACHE_SIZE': str(args.cache_size), 'HEDGE_REQUESTS': '1' if args.hedge else '0'}
+    log = open(args.app_log, 'w') if args.app_log else None
+    with tempfile.TemporaryDirectory() as workdir:
+        write_proxy_files(workdir, proxy_list)
+        process = start_app(workdir, upstream.base_url, args.port, app_env, log)
+        app_url = f"http://127.0.0.1:{args.port}"
+        try:
+            wait_for_app(app_url, process)
+            report = run_load(app_url, tuple(args.endpoint or ENDPOINTS), args.requests,
+                              args.concurrency, args.keys, args.seed)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            if log:
+                log.close()
+
+    report['upstream'] = upstream.get_stats()
+    report['proxies'] = {p.proxy: p.get_stats() for p in fake_proxies}
+    print_report(report)
+    print(f"Upstream: {report['upstream']}")
+    for proxy, stats in report['proxies'].items():
+        print(f"Proxy {proxy}: {stats}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.json}")
+
+    for server in [upstream] + fake_proxies:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
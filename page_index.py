@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Page Index - One pass over a parsed page collecting its text and the
+elements the fallback extractors (train name, route, running days) read,
+so each lookup scans a short list instead of re-walking the whole tree.
+"""
+
+import re
+from functools import lru_cache
+
+from bs4 import CData, NavigableString, Tag
+
+from patterns import TRAIN_TYPES
+
+TEXT_TYPES = (NavigableString, CData)  # What soup.get_text() includes (not scripts, styles or comments)
+HEADING_TAGS = ('title', 'h1', 'h2')
+BLOCK_TAGS = ('div', 'p', 'span')
+TRAIN_CLASSES = ('train', 'schedule', 'status')
+ROUTE_CLASSES = ('route', 'path', 'direction', 'journey')
+RUNNING_CLASSES = ('running', 'schedule', 'frequency', 'days')
+
+
+class PageIndex:
+    def __init__(self, soup):
+        self.json_ld_scripts = []  # <script type="application/ld+json">
+        self.js_scripts = []  # <script type="text/javascript">
+        self.headings = []  # title, h1, h2
+        self.table_cells = []  # th/td inside a table
+        self.train_elements = []  # Any tag with a train/schedule/status class
+        self.route_elements = []  # div/p/span with a route-like class
+        self.running_elements = []  # div/p/span with a running-days-like class
+        self.tags_indexed = 0
+
+        strings = []
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                if type(node) in TEXT_TYPES:
+                    strings.append(node)
+                continue
+
+            self.tags_indexed += 1
+            name = node.name
+            if name == 'script':
+                script_type = node.get('type')
+                if script_type == 'application/ld+json':
+                    self.json_ld_scripts.append(node)
+                elif script_type == 'text/javascript':
+                    self.js_scripts.append(node)
+            elif name in HEADING_TAGS:
+                self.headings.append(node)
+            elif name in ('th', 'td') and node.find_parent('table') is not None:
+                self.table_cells.append(node)
+
+            classes = node.get('class')
+            if classes:
+                class_text = ' '.join(classes).lower() if isinstance(classes, list) else str(classes).lower()
+                if any(c in class_text for c in TRAIN_CLASSES):
+                    self.train_elements.append(node)
+                if name in BLOCK_TAGS:
+                    if any(c in class_text for c in ROUTE_CLASSES):
+                        self.route_elements.append(node)
+                    if any(c in class_text for c in RUNNING_CLASSES):
+                        self.running_elements.append(node)
+
+        self.text = ''.join(strings)  # Same as soup.get_text()
+        # Whitespace runs collapsed as clean_text would; the free-text patterns
+        # backtrack badly over the long indentation runs in the raw text
+        self.compact_text = ' '.join(self.text.split())
+
+
+class TrainPatterns:
+    """Regexes that embed a train number, compiled once per train number"""
+    def __init__(self, train_number, window=160):
+        self.train_number = train_number
+        self.window = window  # Characters searched on each side of the train number
+        number = re.escape(train_number)
+        self.name_after_number = re.compile(f"{number}\\s*[-/]\\s*([^-/]+)")
+        self.name_before_number = re.compile(f"([A-Za-z\\s]+)\\s*[-/]\\s*{number}")
+        self.number = re.compile(f"\\s*{number}\\s*")
+        # Tried in order against the page text; every match contains the train number
+        self.page_text = [
+            re.compile(f"{number}\\s*[-/]\\s*([A-Za-z\\s]+?)(?:\\s+(?:{TRAIN_TYPES}))", re.IGNORECASE),
+            re.compile(f"{number}\\s+([A-Za-z\\s]+?)(?:\\s+(?:{TRAIN_TYPES}))", re.IGNORECASE),
+            re.compile(f"([A-Za-z\\s]+?)(?:\\s+(?:{TRAIN_TYPES}))\\s*[-/]?\\s*{number}", re.IGNORECASE),
+            re.compile(f"{number}\\s*[-/]\\s*([A-Za-z\\s]+)", re.IGNORECASE),
+            re.compile(f"([A-Za-z\\s]+)\\s*[-/]\\s*{number}", re.IGNORECASE)
+        ]
+
+    def windows(self, text):
+        """Slices of text around each occurrence of the train number, in order.
+
+        The page-text patterns are quadratic or worse in the length of the
+        text they scan (seconds on a normal page), so they only ever run on
+        these bounded slices.
+        """
+        windows = []
+        position = text.find(self.train_number)
+        while position >= 0:
+            windows.append(text[max(0, position - self.window):position + len(self.train_number) + self.window])
+            position = text.find(self.train_number, position + 1)
+        return windows
+
+    def search_page_text(self, pattern, windows):
+        """First match of a page-text pattern, in page order"""
+        for window in windows:
+            match = pattern.search(window)
+            if match:
+                return match
+        return None
+
+
+@lru_cache(maxsize=512)
+def train_patterns(train_number):
+    return TrainPatterns(train_number)
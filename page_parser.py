@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Page Parser - HTML parsing for the upstream pages.
+
+lxml is used as BeautifulSoup's tree builder when it is installed (several
+times faster than html.parser); HTML_PARSER overrides the choice. Restricted
+parses only build the top-level elements a strainer keeps, with everything
+inside them, and skip the rest of the page.
+"""
+
+import importlib.util
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+
+HTML_PARSER = os.environ.get('HTML_PARSER') or ('lxml' if LXML_AVAILABLE else 'html.parser')
+
+
+class TagStrainer(SoupStrainer):
+    """SoupStrainer keeping the tags accepted by keep(name, classes, attrs)"""
+    def __init__(self, keep):
+        super().__init__()
+        self.keep = keep
+
+    def _keep_tag(self, name, attrs):
+        attrs = attrs or {}
+        classes = attrs.get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        return self.keep(name, classes, attrs)
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._keep_tag(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return markup_name if self._keep_tag(markup_name, markup_attrs) else None
+
+
+def _is_page_summary(name, attrs):
+    return name == 'title' or (name == 'meta' and attrs.get('name') == 'description')
+
+
+LIVE_STATUS_STRAINER = TagStrainer(
+    lambda name, classes, attrs: _is_page_summary(name, attrs) or (
+        name == 'div' and ('train-update' in classes or 'running-status' in classes))
+)
+
+SCHEDULE_STRAINER = TagStrainer(
+    lambda name, classes, attrs: _is_page_summary(name, attrs) or name == 'table'
+)
+
+
+def parse_html(html, strainer=None):
+    """Parse a page, keeping only what the strainer accepts when one is given"""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
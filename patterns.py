@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Patterns - Every static regex the page parsers use, compiled once at import.
+
+Patterns that embed a train number are compiled per number in
+page_index.TrainPatterns.
+"""
+
+import re
+
+DAYS = r'(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)'
+MONTHS = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
+TRAIN_TYPES = (
+    'EXP|EXPRESS|MAIL|SF|SPL|SPECIAL|FEST|FESTIVAL|LINK|PASSENGER|PASS|LOCAL|SHUTTLE|MEMU|DEMU|EMU|'
+    'INTERCITY|SUPERFAST|RAJDHANI|SHATABDI|DURONTO|GARIB|RATH|HUMSAFAR|TEJAS|VANDE|BHARAT'
+)
+
+# Text cleanup
+WHITESPACE = re.compile(r'\s+')
+STATION_CODE_SUFFIX = re.compile(r'\s*-\s*[A-Z]{2,5}$')
+STATION_TYPE_SUFFIX = re.compile(r'\s*(?:Jn|Junction|Junc|Stn|Station|Halt|H|Terminal|Term)\s*$', re.IGNORECASE)
+NAME_AND_CODE = re.compile(r'(.*?)\s*-\s*([A-Z]{2,5})$')
+NON_NUMERIC = re.compile(r'[^\d.]')
+
+# Station rows
+STATION_INFO = re.compile(r'^([A-Za-z\s\(\)-]+?)(?:\s*-\s*[A-Z]{2,5})?(?:Day\s+\d|[\d:]+|Right Time|Late by|Delay by|Running|Departed|Arrived)')
+ROW_DATE = re.compile(rf'Day\s+(\d+)[-\s]*({MONTHS}[-\s]*\d+)?')
+ROW_TIMES = re.compile(r'\d{2}:\d{2}')
+ROW_DELAY = re.compile(r'(?:Late by|Delay(?:ed)? by)\s+(\d+)\s*(?:min(?:ute)?s?|hrs?|hours?)', re.IGNORECASE)
+TIME = re.compile(r'(\d{1,2}:\d{2})')
+DELAY = re.compile(r'(?:Late by|Delay(?:ed)? by|Running late by)\s+(\d+)\s*(?:min|minutes|hrs|hours)', re.IGNORECASE)
+HALT = re.compile(r'(\d+)\s*(?:min|m)', re.IGNORECASE)
+STATION_STATUS = re.compile(r'([A-Za-z\s]+?)(?:Day\s+(\d+)-Jul(\d+):(\d+):(\d+))?')
+
+# Routes and running days
+ROUTE_NOISE_CHANGE = re.compile(r'\s*Change\s*')
+ROUTE_NOISE_RUNNING_DAYS = re.compile(r'\s*Running Days\s*')
+ROUTE_TEXT_PATTERNS = [
+    re.compile(r'([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)'),
+    re.compile(r'From\s+([A-Za-z\s]+)\s+To\s+([A-Za-z\s]+)'),
+    re.compile(r'([A-Z]{3,4})\s+to\s+([A-Z]{3,4})')
+]
+ROUTE_PATTERNS = [
+    re.compile(r'(?:From|Source)\s*:\s*([A-Za-z\s]+)\s+(?:To|Destination)\s*:\s*([A-Za-z\s]+)', re.IGNORECASE),
+    re.compile(r'([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)', re.IGNORECASE),
+    re.compile(r'([A-Za-z\s]+)\s*-\s*([A-Za-z\s]+)\s+Route', re.IGNORECASE),
+    re.compile(r'Route\s*:\s*([A-Za-z\s]+)\s*-\s*([A-Za-z\s]+)', re.IGNORECASE)
+]
+RUNNING_DAY_PATTERNS = [
+    re.compile(rf'(?:Running|Runs)\s+(?:Days|on)\s*[:\s]*({DAYS}(?:\s*[,&]\s*{DAYS})*)', re.IGNORECASE),
+    re.compile(rf'(?:Running|Runs)\s+(?:on|every)\s+({DAYS}(?:\s*[,&]\s*{DAYS})*)', re.IGNORECASE),
+    re.compile(rf'({DAYS}(?:\s*[,&]\s*{DAYS})*)\s+only', re.IGNORECASE),
+    re.compile(r'Daily', re.IGNORECASE),
+    re.compile(r'All Days', re.IGNORECASE)
+]
+DAY_SEPARATOR = re.compile(r'\s*[,&]\s*')
+
+# Train name fallbacks
+TRAIN_NAME_ASSIGNMENT = re.compile(r'trainName\s*=\s*["\']([^"\']+)["\']')
+DATA_ASSIGNMENT = re.compile(r'data\s*=\s*({[^;]+})')
+HEADING_SUFFIX = re.compile(r'\s*(?:Train Route|Train Schedule|Running Status|Live Status|Train running status|Spot your train).*$', re.IGNORECASE)
+PARENTHESES = re.compile(r'\((.*?)\)')
+
+# Live status page
+LIVE_DESCRIPTION_NAME = re.compile(r'Live Train Status of\s+([^\\s]+(?:\s+[^\\s]+)*?)\s+and')
+LIVE_STATUS_STATION = re.compile(r'at\\s+([^\\n]+)', re.IGNORECASE)
+LAST_UPDATED = re.compile(r'Last Updated:\s*([^,]+)')
+EMBEDDED_DATA = re.compile(r'var data\s*=\s*')
+EMBEDDED_CURRENT_STATION = re.compile(r'var currentStn(Code|Name)\s*=\s*"([^"]*)"')
+TRAIN_UPDATE_STATUS = re.compile(r'<div class="train-update__status">(.*?)</div>', re.DOTALL)
+TRAIN_UPDATE_TIME = re.compile(r'<div class="train-update__time">(.*?)</div>', re.DOTALL)
+STATION_ROW = re.compile(
+    r'<div class="row rs__station-row[^"]*">\s*'
+    r'<div class="col-xs-\d rs__station-grid">(?P<grid>.*?)'
+    r'<span\s+class="rs__station-name[^"]*">(?P<name>[^<]*)</span>\s*</div>\s*'
+    r'<div class="col-xs-\d">\s*<span>(?P<day>[^<]*)</span>(?:&nbsp;)?\s*<span>(?P<date>[^<]*)</span>\s*</div>\s*'
+    r'<div class="col-xs-\d">\s*<span>(?P<arrives>[^<]*)</span>(?:<br>)?\s*</div>\s*'
+    r'<div class="col-xs-\d">\s*<span>(?P<departs>[^<]*)</span>',
+    re.DOTALL
+)
+HTML_TAG = re.compile(r'<[^>]+>')
+BLINKING_CIRCLE = re.compile(r'class="circle\b[^"]*\bblink\b')
+
+# PNR page
+PNR_TRAIN = re.compile(r'(\d{5})\s*[-–]\s*([^\n]+)')
+PNR_JOURNEY = re.compile(r'([A-Za-z\s]+)\s*-\s*([A-Z]{3,4}),\s*(\d{2}:\d{2})\s*[→⟶]\s*([A-Za-z\s]+)\s*-\s*([A-Z]{3,4}),\s*(\d{2}:\d{2})')
+PNR_DETAILS = re.compile(r'(?:([A-Za-z]{3}),\s*(\d{1,2}\s+[A-Za-z]{3}))\s*\|\s*([A-Z]{1,2})\s*\|\s*([A-Z]{2})\s*\|\s*Expected platform:\s*(\d+)')
+PNR_BERTH = re.compile(r'(RAC|GNWL|CNF)\s*(\d+)')
+RATING = re.compile(r'(\d+\.?\d*)')
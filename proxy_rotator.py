@@ -0,0 +1,676 @@
+#!/usr/bin/env python3
+"""
+Proxy Rotator - Picks the proxy for each upstream request.
+
+Every proxy has a score from proxy_score.py: the mean of its streaming p50
+and p95 latency divided by its success rate over the last requests (lower is
+better). get_proxy uses power-of-two-choices: it samples two random proxies
+whose circuit breaker is closed and takes the one with the better score.
+That sends most traffic to the best proxies without herding all of it onto
+one, and needs no fixed latency cutoff, so nothing flaps between tiers.
+Proxies without measurements are scored on their proxy test timing, or on
+fast_threshold if they have none; idle proxies get fresh samples from the
+health checker's probes.
+
+Each proxy has a CircuitBreaker (circuit_breaker.py). Proxies whose breaker
+is open or half-open are in failed_proxies and out of the sampling; they sit
+on a heap keyed by when their next trial is due. Once a breaker's open
+period has passed, the next get_proxy hands that proxy out as its single
+half-open trial before anything else. Closed-breaker proxies are kept in a
+list get_proxy samples from directly, however many breakers are open, and
+on a heap keyed by score that get_best_proxies reads its top entries from.
+Each proxy carries a version number; heap entries from an older version
+are stale and skipped when they reach the top.
+
+Threading model: waitress worker threads, hedged request legs and the
+background proxy tester all share one rotator. All selection state (the
+heaps, the closed list, proxy_stats, sketches, scores, breakers and the
+failed set) is guarded by a single lock. get_proxy, stats updates and
+probes are O(1) plus a few O(log n) heap operations; get_best_proxies(k)
+is O(k log n). Stale heap entries are compacted by an O(n) rebuild once
+they outnumber live ones four to one, so that cost is amortized over as
+many updates. Replacing the proxy list and the inspection methods
+(get_stats, scores, breaker_states) walk the whole pool and are O(n).
+The proxy list is an immutable tuple that is swapped, never mutated, so
+`proxies` can be iterated without the lock. Blacklist callbacks run after
+the lock is released.
+
+With a ProxyStore (proxy_store.py) the rotator warm-starts each proxy's
+counters, sketch and outcome window from the last run, marks proxies dirty
+as their state changes and saves only those, every save_interval seconds
+and on shutdown, outside the lock.
+
+The proxy files can change under a running server (proxy_tester.py,
+test_proxies): start_watching polls their mtime and size and
+reload_proxies merges the new list in - added proxies join the rotation,
+removed ones leave it, and everything else keeps its state.
+"""
+
+import heapq
+import json
+import os
+import random
+import threading
+import time
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, STATES
+from proxy_score import LatencySketch, OutcomeWindow, rounded, score
+from proxy_tester import PROXY_SCHEMES
+from structured_log import get_logger
+
+logger = get_logger(__name__)
+
+# Proxy lists written by proxy_tester.py and ConfirmTktAPI.test_proxies; the detailed one wins,
+# and writers replace it first so a reload between the two writes never reads a stale list
+PROXY_FILES = ('working_proxies_detailed.json', 'working_proxies.txt')
+
+class ProxyRotator:
+    def __init__(self, store=None):
+        self.lock = threading.Lock()
+        self._proxies = ()
+        self.last_shuffle = time.time()
+        self.shuffle_interval = 300  # 5 minutes
+        self.proxy_stats = {}  # Track proxy performance
+        self.failed_proxies = set()  # Proxies whose circuit breaker is open or half-open
+        self.max_failures = 3  # Consecutive failures that open a proxy's circuit breaker
+        self.breaker_open = 30  # Seconds a breaker stays open after its first trip; doubles per failed trial...
+        self.breaker_max_open = 1800  # ...up to this
+        self.breakers = {}  # Proxy -> CircuitBreaker
+        self.fast_threshold = 2.0  # p95 (s) under which a proxy counts as fast; also the latency prior for untimed proxies
+        self.latency_half_life = 50  # Observations after which a proxy's older latency samples count half
+        self.success_window = 20  # Requests the success rate is measured over
+        self.latency = {}  # Proxy -> LatencySketch of its response times
+        self.outcomes = {}  # Proxy -> OutcomeWindow of its recent successes and failures
+        self._scores = {}  # Proxy -> current score, lower is better
+        self.proxy_schemes = {}  # Proxy -> scheme (http/https/socks5h) it last worked with
+        self.blacklist_callbacks = []  # Called with the proxy when it gets blacklisted
+        self.removed_callbacks = []  # Called with each proxy a reload or replace_proxies drops from rotation
+        self.selections = {'trial': 0, 'scored': 0, 'failed': 0, 'last_resort': 0}  # get_proxy picks per path
+        self.blacklisted = 0  # Times a proxy's circuit breaker tripped
+        self.store = store  # ProxyStore to warm-start from and save to, or None
+        self.save_interval = 30  # Seconds between saves of the proxies that changed
+        self._dirty = set()  # Proxies whose state changed since the last save
+        self._stop_saving = threading.Event()
+        self._save_thread = None
+        self.proxy_files = [os.path.abspath(name) for name in PROXY_FILES]  # Absolute, so a later chdir doesn't matter
+        self.reload_interval = 5  # Seconds between checks of the proxy files for changes
+        self.reloads = 0  # Times the proxy files were merged into the rotation
+        self._files_seen = None  # _file_signature() at the last read
+        self._reload_lock = threading.Lock()  # One reload at a time; self.lock is not held while files are read
+        self._stop_watching = threading.Event()
+        self._watch_thread = None
+
+        # Selection indexes, see module docstring
+        self._version = {}  # Proxy -> current version of its heap entries
+        self._order = {}  # Proxy -> position in the rotation, breaks ties
+        self._failed = []  # Heap of (retry_at, order, version, proxy) for tripped breakers
+        self._best = []  # Heap of (score, order, version, proxy) for closed breakers
+        self._closed = []  # Closed-breaker proxies, in no particular order, for sampling
+        self._closed_at = {}  # Proxy -> its index in _closed
+        self.load_proxies()
+
+    def _new_stats(self, avg_response=float('inf')):
+        return {
+            'success': 0,
+            'failure': 0,
+            'last_success': None,
+            'last_failure': None,
+            'avg_response': avg_response,
+            'last_used': 0
+        }
+
+    def load_proxies(self):
+        """Load proxies with performance data"""
+        proxies, timings, schemes = self.read_proxy_files()
+        # The proxy test timing is each proxy's latency prior until it has been used
+        for proxy in proxies:
+            self.proxy_stats[proxy] = self._new_stats(timings.get(proxy, float('inf')))
+        self.proxy_schemes.update(schemes)
+
+        # Then to the proxies that passed their last test, per the store
+        if not proxies and self.store:
+            try:
+                proxies = self.store.working_proxies()
+                for proxy in proxies:
+                    self.proxy_stats[proxy] = self._new_stats()
+            except Exception as e:
+                logger.warning("Error loading proxies from %s: %s", self.store.path, e)
+
+        # Add backup proxies if no proxies loaded
+        if not proxies:
+            backup_proxies = [
+                "188.166.230.109:31028",  # Fastest from last test
+                "161.35.70.249:8080",
+                "138.68.60.8:80",
+                "35.179.146.181:3128",
+                "51.81.245.3:17981"
+            ]
+            proxies = backup_proxies
+            for proxy in backup_proxies:
+                self.proxy_stats[proxy] = self._new_stats()
+
+        random.shuffle(proxies)  # Initial shuffle
+        self.replace_proxies(proxies)
+        if self.store:
+            self._warm_start(proxies)
+        logger.info("Loaded %d proxies (%d fast) for rotation", len(self.proxies), len(self.fast_proxies))
+
+    def read_proxy_files(self):
+        """Proxies listed in the proxy files, fastest first: (proxies, proxy -> test time, proxy -> scheme)"""
+        self._files_seen = self._file_signature()  # Taken before reading, so a write during the read is seen later
+        proxies = []
+        timings = {}
+        schemes = {}
+        detailed = False  # The detailed file was read, even if it lists nothing
+        try:
+            # Load detailed proxy information
+            with open(self.proxy_files[0], 'r') as f:
+                data = json.load(f)
+                if isinstance(data, dict) and 'working_proxies' in data:
+                    detailed = True
+                    # Sort proxies by response time
+                    proxy_infos = data['working_proxies']
+                    proxy_infos.sort(key=lambda x: x['timings']['total'])
+
+                    for proxy_info in proxy_infos:
+                        if isinstance(proxy_info, dict) and 'proxy' in proxy_info:
+                            proxy = proxy_info['proxy']
+                            proxies.append(proxy)
+                            timings[proxy] = proxy_info['timings']['total']
+                            if proxy_info.get('scheme') in PROXY_SCHEMES:
+                                schemes[proxy] = proxy_info['scheme']
+        except Exception as e:
+            logger.warning("Error loading %s: %s", os.path.basename(self.proxy_files[0]), e)
+
+        # Fallback to simple proxy list if detailed info not available
+        if not detailed:
+            try:
+                with open(self.proxy_files[1], 'r') as f:
+                    proxies = [line.strip() for line in f if line.strip()]
+            except Exception as e:
+                logger.warning("Error loading %s: %s", os.path.basename(self.proxy_files[1]), e)
+
+        return list(dict.fromkeys(proxies)), timings, schemes
+
+    def _file_signature(self):
+        """(mtime, size) of each proxy file, None where missing; changes whenever a file is rewritten"""
+        signature = []
+        for path in self.proxy_files:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload_proxies(self):
+        """Merge the proxy files into the running rotation; returns (added, removed).
+
+        Unchanged proxies keep their stats, breakers and pooled sessions; new
+        ones start from their test timing (or their saved state, if the store
+        has any); removed ones are handed to removed_callbacks. An empty or
+        unreadable list leaves the rotation as it is.
+        """
+        with self._reload_lock:
+            proxies, timings, schemes = self.read_proxy_files()
+            if not proxies:
+                logger.warning("Proxy files list no proxies; keeping the %d in rotation", len(self._proxies))
+                return [], []
+
+            with self.lock:
+                current = set(self._proxies)
+                listed = set(proxies)
+                kept = [p for p in self._proxies if p in listed]
+                added = [p for p in proxies if p not in current]
+                unseen = [p for p in added if p not in self.proxy_stats]  # Re-added proxies keep what they had
+                for proxy in unseen:
+                    self.proxy_stats[proxy] = self._new_stats(timings.get(proxy, float('inf')))
+                for proxy in added:
+                    if proxy in schemes:
+                        self.proxy_schemes[proxy] = schemes[proxy]
+                # New proxies go to the end of the rotation order, which only breaks heap ties
+                removed = self._replace(tuple(kept + added))
+                self.reloads += 1
+
+            if self.store and unseen:
+                self._warm_start(unseen)
+
+        self._removed(removed)
+        logger.info("Reloaded proxy files: %d added, %d removed, %d in rotation", len(added), len(removed), len(kept) + len(added))
+        return added, removed
+
+    def start_watching(self):
+        """Reload the proxies whenever a proxy file changes, checking every reload_interval seconds"""
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, name='proxy-reload', daemon=True)
+        self._watch_thread.start()
+
+    def _watch_loop(self):
+        while not self._stop_watching.wait(self.reload_interval):
+            if self._file_signature() != self._files_seen:
+                try:
+                    self.reload_proxies()
+                except Exception:
+                    logger.exception("Proxy reload failed")
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watch_thread:
+            self._watch_thread.join(timeout=5)
+
+    def _warm_start(self, proxies):
+        """Restore counters, latency sketches, outcome windows and schemes saved by earlier runs"""
+        try:
+            rows = self.store.load()
+        except Exception as e:
+            logger.warning("Error reading proxy state from %s: %s", self.store.path, e)
+            return
+
+        restored = 0
+        with self.lock:
+            for proxy in proxies:
+                row = rows.get(proxy)
+                if row is None:
+                    continue
+                if row['scheme'] in PROXY_SCHEMES:
+                    self.proxy_schemes[proxy] = row['scheme']
+                if row['latency'] is None and row['outcomes'] is None:
+                    continue  # Tested but never used by a server yet
+                stats = self.proxy_stats[proxy]
+                for key in ('success', 'failure', 'last_success', 'last_failure'):
+                    stats[key] = row[key]
+                if row['avg_response'] is not None:
+                    stats['avg_response'] = row['avg_response']
+                if row['latency']:
+                    self.latency[proxy].restore(json.loads(row['latency']))
+                self.outcomes[proxy].restore(row['outcomes'] or '')
+                self._rescore(proxy)
+                self._reindex(proxy)
+                restored += 1
+        logger.info("Warm-started %d proxies from %s", restored, self.store.path)
+
+    def save_state(self):
+        """Write the proxies that changed since the last save to the store; returns how many"""
+        if not self.store:
+            return 0
+        with self.lock:
+            rows = {proxy: self._state_row(proxy) for proxy in self._dirty}
+            self._dirty.clear()
+        if not rows:
+            return 0
+        try:
+            self.store.save_stats(rows)
+        except Exception as e:
+            logger.warning("Error saving proxy state to %s: %s", self.store.path, e)
+            with self.lock:
+                self._dirty.update(rows)  # Retried on the next save
+            return 0
+        return len(rows)
+
+    def _state_row(self, proxy):
+        """A proxy's learned state as a store row (lock held)"""
+        stats = self.proxy_stats[proxy]
+        return {
+            'scheme': self.proxy_schemes.get(proxy),
+            'success': stats['success'],
+            'failure': stats['failure'],
+            'last_success': stats['last_success'],
+            'last_failure': stats['last_failure'],
+            'avg_response': stats['avg_response'] if stats['avg_response'] != float('inf') else None,
+            'latency': json.dumps(self.latency[proxy].state(), separators=(',', ':')),
+            'outcomes': self.outcomes[proxy].state()
+        }
+
+    def start_saving(self):
+        """Save changed proxies every save_interval seconds on a daemon thread"""
+        if self._save_thread and self._save_thread.is_alive():
+            return
+        self._stop_saving.clear()
+        self._save_thread = threading.Thread(target=self._save_loop, name='proxy-state', daemon=True)
+        self._save_thread.start()
+
+    def _save_loop(self):
+        while not self._stop_saving.wait(self.save_interval):
+            self.save_state()
+
+    def stop_saving(self):
+        """Stop the save thread and write whatever changed since its last save"""
+        self._stop_saving.set()
+        if self._save_thread:
+            self._save_thread.join(timeout=5)
+        self.save_state()
+
+    def replace_proxies(self, proxies):
+        """Atomically swap in a new proxy list; dropped proxies are handed to removed_callbacks"""
+        with self.lock:
+            removed = self._replace(tuple(proxies))
+        self._removed(removed)
+
+    def _removed(self, proxies):
+        """Run removed_callbacks for proxies that left the rotation (lock not held)"""
+        for proxy in proxies:
+            for callback in self.removed_callbacks:
+                callback(proxy)
+
+    def _replace(self, proxies):
+        """Swap in a new proxy tuple, creating state for proxies seen for the first time (lock held).
+
+        Returns the proxies that were in rotation and no longer are.
+        """
+        listed = set(proxies)
+        removed = [p for p in self._proxies if p not in listed]
+        for proxy in proxies:
+            self.proxy_stats.setdefault(proxy, self._new_stats())
+            if proxy not in self.breakers:
+                self.breakers[proxy] = CircuitBreaker(self.max_failures, self.breaker_open, self.breaker_max_open)
+            if proxy not in self.latency:
+                self.latency[proxy] = LatencySketch(self.latency_half_life)
+                self.outcomes[proxy] = OutcomeWindow(self.success_window)
+            self._rescore(proxy)
+        self._order = {proxy: i for i, proxy in enumerate(proxies)}
+        self._proxies = proxies
+        self.failed_proxies = {p for p in proxies if self.breakers[p].state != CLOSED}
+        self._rebuild()
+        return removed
+
+    @property
+    def proxies(self):
+        """All proxies in rotation order, as an immutable snapshot"""
+        return self._proxies
+
+    @proxies.setter
+    def proxies(self, proxies):
+        self.replace_proxies(proxies)
+
+    @property
+    def fast_proxies(self):
+        """Closed-breaker proxies whose p95 is under fast_threshold, best score first"""
+        with self.lock:
+            return sorted(filter(self._is_fast, self._proxies), key=self._scores.__getitem__)
+
+    def _is_fast(self, proxy):
+        """Breaker closed and p95 (or proxy test timing, if untried) under fast_threshold (lock held)"""
+        if proxy in self.failed_proxies:
+            return False
+        p95 = self.latency[proxy].quantile(0.95)
+        return (p95 if p95 is not None else self.proxy_stats[proxy]['avg_response']) < self.fast_threshold
+
+    def _quantiles(self, proxy):
+        """(p50, p95) of a proxy, falling back to its latency prior before the first sample (lock held)"""
+        sketch = self.latency[proxy]
+        p50 = sketch.quantile(0.5)
+        if p50 is None:
+            prior = self.proxy_stats[proxy]['avg_response']
+            prior = rounded(prior if prior != float('inf') else self.fast_threshold)
+            return prior, prior
+        return p50, sketch.quantile(0.95)
+
+    def _rescore(self, proxy):
+        """Recompute a proxy's score after its latency or outcomes changed (lock held)"""
+        p50, p95 = self._quantiles(proxy)
+        self._scores[proxy] = score(p50, p95, self.outcomes[proxy].success_rate())
+
+    def _rebuild(self):
+        """Drop every index entry and index all proxies afresh (lock held)"""
+        self._failed = []
+        self._best = []
+        self._closed = []
+        self._closed_at = {}
+        for proxy in self._proxies:
+            self._reindex(proxy)
+
+    def _reindex(self, proxy):
+        """Invalidate a proxy's heap entries and index it under its current state and score (lock held)"""
+        if proxy not in self._order:
+            return
+        version = self._version.get(proxy, 0) + 1
+        self._version[proxy] = version
+        if proxy in self.failed_proxies:
+            heapq.heappush(self._failed, (self.breakers[proxy].retry_at(), self._order[proxy], version, proxy))
+            self._remove_closed(proxy)
+        else:
+            heapq.heappush(self._best, (self._scores[proxy], self._order[proxy], version, proxy))
+            if proxy not in self._closed_at:
+                self._closed_at[proxy] = len(self._closed)
+                self._closed.append(proxy)
+
+        # Stale entries only leave a heap when they reach the top; compact if they pile up
+        if len(self._failed) + len(self._best) > 4 * len(self._proxies) + 64:
+            self._rebuild()
+
+    def _remove_closed(self, proxy):
+        """Take a proxy out of the closed list by swapping the last one into its slot (lock held)"""
+        index = self._closed_at.pop(proxy, None)
+        if index is None:
+            return
+        last = self._closed.pop()
+        if last != proxy:
+            self._closed[index] = last
+            self._closed_at[last] = index
+
+    def _peek(self, heap):
+        """Return the top live entry of a heap, discarding stale ones (lock held)"""
+        while heap:
+            entry = heap[0]
+            if self._version.get(entry[-1]) == entry[2]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def record_scheme(self, proxy, scheme):
+        """Remember the scheme a proxy answered on so later requests go straight to it"""
+        if scheme in PROXY_SCHEMES:
+            with self.lock:
+                self.proxy_schemes[proxy] = scheme
+                if proxy in self.proxy_stats:
+                    self._dirty.add(proxy)
+
+    def get_proxy_formats(self, proxy):
+        """Proxy URLs to try for a proxy: the known-good scheme first, the rest as fallback"""
+        with self.lock:
+            known = self.proxy_schemes.get(proxy)
+        schemes = PROXY_SCHEMES if not known else [known] + [s for s in PROXY_SCHEMES if s != known]
+        return [f"{scheme}://{proxy}" for scheme in schemes]
+
+    def update_proxy_stats(self, proxy, success, response_time=None):
+        """Update proxy statistics"""
+        blacklisted = False
+        with self.lock:
+            if proxy not in self.proxy_stats:
+                return
+
+            stats = self.proxy_stats[proxy]
+            current_time = time.time()
+            self._dirty.add(proxy)
+
+            self.outcomes[proxy].add(success)
+            if success:
+                stats['success'] += 1
+                stats['last_success'] = current_time
+                if response_time:
+                    self.latency[proxy].add(response_time)
+                    # Moving average kept for the metrics and the health checker
+                    if stats['avg_response'] == float('inf'):
+                        stats['avg_response'] = response_time
+                    else:
+                        stats['avg_response'] = (stats['avg_response'] * 0.7) + (response_time * 0.3)
+
+                # A success closes the breaker, whatever state it was in
+                if self.breakers[proxy].record_success():
+                    self.failed_proxies.discard(proxy)
+            else:
+                stats['failure'] += 1
+                stats['last_failure'] = current_time
+
+                # Open the breaker after max_failures in a row, or on a failed half-open trial
+                if self.breakers[proxy].record_failure(current_time):
+                    blacklisted = self._open(proxy)
+
+            stats['last_used'] = current_time
+            self._rescore(proxy)
+            self._reindex(proxy)
+
+        if blacklisted:
+            for callback in self.blacklist_callbacks:
+                callback(proxy)
+
+    def _open(self, proxy):
+        """Take a proxy whose breaker just tripped out of rotation (lock held)"""
+        self.failed_proxies.add(proxy)
+        self.blacklisted += 1
+        return True
+
+    def is_healthy(self, proxy):
+        """True if the last request through the proxy succeeded (or it is untried and tested fast)"""
+        with self.lock:
+            stats = self.proxy_stats.get(proxy)
+            if stats is None or proxy in self.failed_proxies:
+                return False
+            if stats['last_success'] is None:
+                return stats['avg_response'] < self.fast_threshold
+            return stats['last_failure'] is None or stats['last_success'] >= stats['last_failure']
+
+    def snapshot(self):
+        """Consistent copy of the proxy list and per-proxy stats for background readers"""
+        with self.lock:
+            return self._proxies, {proxy: dict(self.proxy_stats[proxy]) for proxy in self._proxies}
+
+    def get_stats(self):
+        """Return pool counters for monitoring"""
+        with self.lock:
+            return {
+                'proxies': len(self._proxies),
+                'fast': sum(1 for p in self._proxies if self._is_fast(p)),
+                'failed': len(self.failed_proxies),
+                'blacklisted': self.blacklisted,
+                'reloads': self.reloads,
+                'selections': dict(self.selections),
+                'breakers': {state: sum(1 for p in self._proxies if self.breakers[p].state == state) for state in STATES}
+            }
+
+    def scores(self):
+        """Latency percentiles, success rate and score of every proxy in rotation, for inspection"""
+        with self.lock:
+            result = {}
+            for proxy in self._proxies:
+                p50, p95 = self._quantiles(proxy)
+                result[proxy] = {
+                    'p50': p50,
+                    'p95': p95,
+                    'success_rate': self.outcomes[proxy].success_rate(),
+                    'score': self._scores[proxy]
+                }
+            return result
+
+    def breaker_states(self):
+        """Circuit breaker state of every proxy in rotation, for inspection"""
+        with self.lock:
+            return {proxy: self.breakers[proxy].snapshot() for proxy in self._proxies}
+
+    def record_probe(self, proxy, success, response_time=None, scheme=None):
+        """Feed a health probe verdict into the rotator as soon as it is known"""
+        if success:
+            if scheme:
+                self.record_scheme(proxy, scheme)
+            self.update_proxy_stats(proxy, True, response_time)
+            return
+
+        # A failed probe trips a closed breaker straight away rather than after max_failures
+        # requests, and re-opens a half-open one as a failed trial. A breaker that is open
+        # already (a probe that didn't claim a trial) is left to run out its open period.
+        with self.lock:
+            if proxy not in self.proxy_stats:
+                return
+            current_time = time.time()
+            stats = self.proxy_stats[proxy]
+            stats['failure'] += 1
+            stats['last_failure'] = current_time
+            self.outcomes[proxy].add(False)
+            self._dirty.add(proxy)
+            self._rescore(proxy)
+            if self.breakers[proxy].state == OPEN:
+                return
+            self.breakers[proxy].trip(current_time)
+            self._open(proxy)
+            self._reindex(proxy)
+
+        for callback in self.blacklist_callbacks:
+            callback(proxy)
+
+    def claim_probe(self, proxy):
+        """True if a health probe may go through the proxy now.
+
+        Probes follow the breaker like requests do: free while it is closed,
+        never while it is open, and once its open period has passed the
+        probe takes the single half-open trial (so _select won't hand out
+        another until it reports back or trial_timeout passes).
+        """
+        with self.lock:
+            breaker = self.breakers.get(proxy)
+            if breaker is None:
+                return False
+            if breaker.state == CLOSED:
+                return True
+            current_time = time.time()
+            if not breaker.ready_for_trial(current_time):
+                return False
+            breaker.start_trial(current_time)
+            self._reindex(proxy)
+            return True
+
+    def get_proxy(self):
+        """Get the proxy for the next request: a due half-open trial, else the better of two random picks"""
+        with self.lock:
+            return self._select(time.time())
+
+    def _select(self, current_time):
+        """Pick a proxy (lock held)"""
+        if not self._proxies:
+            return None
+
+        # An open breaker whose open period has passed gets its single half-open trial first
+        entry = self._peek(self._failed)
+        if entry and entry[0] <= current_time:
+            proxy = entry[-1]
+            self.breakers[proxy].start_trial(current_time)
+            self._reindex(proxy)
+            self.selections['trial'] += 1
+            return proxy
+
+        # Power of two choices among the proxies whose breaker is closed
+        proxy = self._two_choices()
+        if proxy is not None:
+            self.selections['scored'] += 1
+            return proxy
+
+        # If every breaker is open, try the one whose trial is due soonest
+        entry = self._peek(self._failed)
+        if entry:
+            self.selections['failed'] += 1
+            return entry[-1]
+
+        self.selections['last_resort'] += 1
+        return self._proxies[0]  # Last resort
+
+    def _two_choices(self):
+        """The better-scored of two random closed-breaker proxies, or None if there are none (lock held)"""
+        closed = self._closed
+        if len(closed) < 2:
+            return closed[0] if closed else None
+        first = random.randrange(len(closed))
+        second = random.randrange(len(closed) - 1)
+        if second >= first:
+            second += 1
+        return min(closed[first], closed[second], key=self._scores.__getitem__)
+
+    def get_best_proxies(self, count):
+        """Get up to count closed-breaker proxies, best score first, for hedged requests"""
+        with self.lock:
+            best = []
+            while len(best) < count and self._peek(self._best):
+                best.append(heapq.heappop(self._best))
+            for entry in best:
+                heapq.heappush(self._best, entry)
+            return [entry[-1] for entry in best]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Proxy Score - Streaming latency percentiles and windowed success rates that
+ProxyRotator turns into one score per proxy (lower is better).
+
+LatencySketch keeps response times in log-spaced buckets, so p50/p95 come
+out within ~10% of the true value from a fixed 70-odd counters, and halves
+every count each half_life observations so the percentiles follow the
+proxy's recent behaviour. OutcomeWindow is the success rate over the last
+`size` requests.
+
+    score = (p50 + p95) / 2 / success_rate
+
+Averaging in p95 penalises proxies with bad tails that a mean hides;
+dividing by the success rate prices in the retries a flaky proxy causes.
+"""
+
+import collections
+import math
+
+MIN_LATENCY = 0.005  # Seconds; faster responses share the first bucket
+MAX_LATENCY = 120.0  # Slower responses share the last bucket
+BUCKET_GROWTH = 1.2  # Ratio between bucket bounds; sets the quantile error (~10%)
+BUCKETS = int(math.log(MAX_LATENCY / MIN_LATENCY, BUCKET_GROWTH)) + 1
+MIN_SUCCESS_RATE = 0.05  # Floor so a proxy that never succeeds gets a large, finite score
+
+
+def bucket_of(latency):
+    bucket = int(math.log(max(latency, MIN_LATENCY) / MIN_LATENCY, BUCKET_GROWTH))
+    return min(bucket, BUCKETS - 1)
+
+
+def bucket_value(bucket):
+    """Geometric middle of a bucket, the latency a sketch reports for it"""
+    return MIN_LATENCY * BUCKET_GROWTH ** (bucket + 0.5)
+
+
+def rounded(latency):
+    """A latency as a sketch would report it, so priors compare fairly with measurements"""
+    return bucket_value(bucket_of(latency))
+
+
+class LatencySketch:
+    def __init__(self, half_life=50):
+        self.half_life = half_life  # Observations after which older samples count half
+        self.counts = [0.0] * BUCKETS
+        self.total = 0.0
+        self.observed = 0
+
+    def add(self, latency):
+        self.observed += 1
+        if self.observed % self.half_life == 0:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+        self.counts[bucket_of(latency)] += 1
+        self.total += 1
+
+    def state(self):
+        """Non-empty buckets and the observation count, JSON-serialisable"""
+        return {'observed': self.observed, 'counts': {str(b): round(c, 4) for b, c in enumerate(self.counts) if c}}
+
+    def restore(self, state):
+        self.observed = state['observed']
+        self.counts = [0.0] * BUCKETS
+        for bucket, count in state['counts'].items():
+            self.counts[min(int(bucket), BUCKETS - 1)] = count
+        self.total = sum(self.counts)
+
+    def quantile(self, q):
+        """Latency at quantile q (0-1), or None before the first sample"""
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0.0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return bucket_value(bucket)
+        return MAX_LATENCY
+
+
+class OutcomeWindow:
+    def __init__(self, size=20):
+        self.outcomes = collections.deque(maxlen=size)
+        self.successes = 0
+
+    def add(self, success):
+        if len(self.outcomes) == self.outcomes.maxlen:
+            self.successes -= self.outcomes[0]
+        self.outcomes.append(bool(success))
+        self.successes += bool(success)
+
+    def state(self):
+        """Outcomes oldest first as a string of 1s and 0s"""
+        return ''.join('1' if success else '0' for success in self.outcomes)
+
+    def restore(self, state):
+        self.outcomes.clear()
+        self.successes = 0
+        for outcome in state:
+            self.add(outcome == '1')
+
+    def success_rate(self, default=1.0):
+        return self.successes / len(self.outcomes) if self.outcomes else default
+
+
+def score(p50, p95, success_rate):
+    """Expected cost of sending a request through a proxy; lower is better"""
+    return (p50 + p95) / 2 / max(success_rate, MIN_SUCCESS_RATE)
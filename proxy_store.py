@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Proxy Store - Crash-safe, incremental on-disk state for the proxy pool.
+
+One SQLite row per proxy, in WAL mode: every save is a small transaction
+that either lands whole or not at all, readers never block the writer, and
+several processes can write at once (busy_timeout makes the losers wait a
+moment instead of failing). Writers own separate columns, so they never
+clobber each other:
+
+    server (ProxyRotator.save_state)  request counters, latency sketch,
+                                      outcome window, learned scheme
+    proxy tests (record_tests)        last test verdict, timing and scheme
+
+The rotator warm-starts from these rows instead of resetting every proxy to
+zero on boot. working_proxies.txt / working_proxies_detailed.json stay as
+the human-readable proxy lists and are rewritten with atomic_write.
+"""
+
+import contextlib
+import os
+import sqlite3
+import tempfile
+import time
+
+from structured_log import get_logger
+
+logger = get_logger(__name__)
+
+# Next to this module rather than in whatever directory the server was started from
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'proxy_state.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxies (
+    proxy TEXT PRIMARY KEY,
+    scheme TEXT,
+    working INTEGER,
+    test_time REAL,
+    tested_at REAL,
+    success INTEGER NOT NULL DEFAULT 0,
+    failure INTEGER NOT NULL DEFAULT 0,
+    last_success REAL,
+    last_failure REAL,
+    avg_response REAL,
+    latency TEXT,
+    outcomes TEXT,
+    updated_at REAL
+)
+"""
+
+STATS_COLUMNS = ('success', 'failure', 'last_success', 'last_failure', 'avg_response', 'latency', 'outcomes')
+
+
+def atomic_write(path, text):
+    """Replace a file's contents so readers see the old or the new file, never half of one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+class ProxyStore:
+    def __init__(self, path=DEFAULT_PATH, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout  # Seconds a writer waits for another process's transaction
+        self.writes = 0
+        self.errors = 0
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        """Store at PROXY_STORE_PATH (default DEFAULT_PATH), or None if it is set empty or can't be opened.
+
+        The store is only a cache, so a read-only directory, a locked file or
+        a bad path means running without it rather than failing to start.
+        """
+        path = os.environ.get('PROXY_STORE_PATH', DEFAULT_PATH)
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning("Proxy store %s unavailable, running without it: %s", path, e)
+            return None
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """A short-lived connection committing one transaction; connections aren't shared across threads"""
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        try:
+            conn.execute('PRAGMA synchronous=NORMAL')  # A power cut may lose the last save, never corrupts the file
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self):
+        """Every stored row as proxy -> dict"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return {row['proxy']: dict(row) for row in conn.execute('SELECT * FROM proxies')}
+
+    def working_proxies(self):
+        """Proxies whose last test passed, fastest first"""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT proxy FROM proxies WHERE working = 1 ORDER BY test_time')
+            return [proxy for proxy, in rows]
+
+    def save_stats(self, rows):
+        """Upsert the server-owned columns; rows is proxy -> {column: value}"""
+        columns = ', '.join(STATS_COLUMNS)
+        placeholders = ', '.join('?' * len(STATS_COLUMNS))
+        updates = ', '.join(f"{column} = excluded.{column}" for column in STATS_COLUMNS)
+        now = time.time()
+        self._write(
+            f"INSERT INTO proxies (proxy, scheme, {columns}, updated_at) VALUES (?, ?, {placeholders}, ?) "
+            f"ON CONFLICT(proxy) DO UPDATE SET scheme = COALESCE(excluded.scheme, scheme), {updates}, "
+            f"updated_at = excluded.updated_at",
+            [(proxy, row.get('scheme'), *(row[column] for column in STATS_COLUMNS), now) for proxy, row in rows.items()]
+        )
+
+    def record_tests(self, results):
+        """Upsert proxy test verdicts; results is proxy -> (working, response_time, scheme)"""
+        now = time.time()
+        self._write(
+            "INSERT INTO proxies (proxy, scheme, working, test_time, tested_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(proxy) DO UPDATE SET scheme = COALESCE(excluded.scheme, scheme), working = excluded.working, "
+            "test_time = excluded.test_time, tested_at = excluded.tested_at, updated_at = excluded.updated_at",
+            [
+                (proxy, scheme, int(bool(working)), response_time if working else None, now, now)
+                for proxy, (working, response_time, scheme) in results.items()
+            ]
+        )
+
+    def _write(self, sql, params):
+        try:
+            with self._connect() as conn:
+                conn.executemany(sql, params)
+            self.writes += 1
+        except sqlite3.Error:
+            self.errors += 1
+            raise
+
+    def get_stats(self):
+        return {'writes': self.writes, 'errors': self.errors}
+
@@ -12,9 +12,70 @@ import json
 from datetime import datetime
 import urllib3
 import sys
-from tabulate import tabulate
+from proxy_store import ProxyStore, atomic_write
+from structured_log import get_logger
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+logger = get_logger(__name__)
+
+# Proxy URL schemes a proxy may speak, in the order they are tried
+PROXY_SCHEMES = ['http', 'https', 'socks5h']
+
+class ProbeError(Exception):
+    """A proxy answered but not with a usable response"""
+
+def probe_proxy_schemes(proxy, probe, schemes=PROXY_SCHEMES):
+    """Probe a proxy under every scheme at once and return (scheme, result) for the first that works.
+
+    probe(proxy_url, stop) returns a result on success and raises on failure.
+    stop is set once one scheme has answered, and a probe should check it
+    between attempts and give up. The losing probes are joined before this
+    returns, so N callers never have more than N * len(schemes) probes
+    running. If every scheme fails, the error from the last probe to finish
+    is raised.
+    """
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(schemes))
+    futures = {executor.submit(probe, f"{scheme}://{proxy}", stop): scheme for scheme in schemes}
+    last_error = None
+    try:
+        for future in as_completed(futures):
+            try:
+                return futures[future], future.result()
+            except Exception as e:
+                last_error = e
+        raise last_error
+    finally:
+        # Losing probes stop at their next check; only an attempt already in flight is waited for
+        stop.set()
+        executor.shutdown(wait=True)
+
+def run_concurrent(items, test_fn, on_result=None, max_workers=50, on_error=None):
+    """Run test_fn over items on a bounded thread pool.
+
+    Each (item, result) is handed to on_result as soon as it completes, so
+    callers can act on verdicts while the rest are still running. An item
+    whose test raises gets no result; (item, error) goes to on_error, or to
+    the log if there is none.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(test_fn, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                if on_error:
+                    on_error(item, e)
+                else:
+                    logger.error("Proxy test raised", exc_info=e, extra={'proxy': item})
+                continue
+            results[item] = result
+            if on_result:
+                on_result(item, result)
+    return results
+
 class ProxyTester:
     def __init__(self):
         self.all_proxies = []
@@ -27,6 +88,7 @@ class ProxyTester:
             "https://www.example.com"
         ]
         self.timeout = 10
+        self.connect_timeout = 3  # Keeps a losing scheme from holding its probe thread for the full timeout
         self.max_workers = 50
         self.lock = threading.Lock()
         self.progress = 0
@@ -53,9 +115,9 @@ class ProxyTester:
                                 if isinstance(proxy_info, dict) and 'proxy' in proxy_info:
                                     all_proxies.add(proxy_info['proxy'])
                 else:
-                with open(file_name, 'r') as f:
-                    proxies = [line.strip() for line in f if line.strip()]
-                    all_proxies.update(proxies)
+                    with open(file_name, 'r') as f:
+                        proxies = [line.strip() for line in f if line.strip()]
+                        all_proxies.update(proxies)
                 print(f"✅ Loaded proxies from {file_name}")
             except FileNotFoundError:
                 print(f"⚠️  {file_name} not found")
@@ -80,13 +142,43 @@ class ProxyTester:
                         f"ETA: {eta/60:.1f}min")
         sys.stdout.flush()
     
-    def test_single_proxy(self, proxy):
-        """Test a single proxy with detailed timing"""
+    def probe(self, proxy_url, test_url):
+        """Fetch test_url through one proxy URL and return timing details"""
         proxy_dict = {
-            "http": f"http://{proxy}",
-            "https": f"http://{proxy}"
+            "http": proxy_url,
+            "https": proxy_url
         }
         
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        
+        # Measure connection time
+        start_connect = time.time()
+        response = session.get(
+            test_url,
+            proxies=proxy_dict,
+            timeout=(self.connect_timeout, self.timeout),
+            verify=False,
+            allow_redirects=True
+        )
+        end_request = time.time()
+        
+        if response.status_code != 200:
+            raise ProbeError(f"HTTP {response.status_code}")
+            
+        return {
+            'timings': {
+                'connect': round(end_request - start_connect, 3),
+                'total': round(end_request - start_connect, 3)
+            },
+            'status_code': response.status_code,
+            'content_length': len(response.content)
+        }
+
+    def test_single_proxy(self, proxy):
+        """Test a single proxy with detailed timing, probing all schemes concurrently"""
         test_url = random.choice(self.test_urls)
         result = {
             'proxy': proxy,
@@ -97,40 +189,17 @@ class ProxyTester:
         }
         
         try:
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            scheme, details = probe_proxy_schemes(proxy, lambda proxy_url, stop: self.probe(proxy_url, test_url))
+            result.update(details)
+            result.update({
+                'status': 'working',
+                'scheme': scheme
             })
-            
-            # Measure connection time
-            start_connect = time.time()
-            response = session.get(
-                test_url,
-                proxies=proxy_dict,
-                timeout=self.timeout,
-                verify=False,
-                allow_redirects=True
-            )
-            end_request = time.time()
-            
-            result['timings'] = {
-                'connect': round(end_request - start_connect, 3),
-                'total': round(end_request - start_connect, 3)
-            }
-            
-            if response.status_code == 200:
-                result.update({
-                    'status': 'working',
-                    'status_code': response.status_code,
-                    'content_length': len(response.content)
-                })
-                with self.lock:
-                    self.working_proxies.append(result)
-            else:
-                result['error'] = f"HTTP {response.status_code}"
-                with self.lock:
-                    self.failed_proxies.append(result)
+            with self.lock:
+                self.working_proxies.append(result)
                 
+        except ProbeError as e:
+            result['error'] = str(e)
         except requests.exceptions.Timeout:
             result['error'] = 'Timeout'
         except requests.exceptions.ConnectionError:
@@ -157,20 +226,18 @@ class ProxyTester:
         self.start_time = time.time()
         self.progress = 0
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(self.test_single_proxy, proxy) 
-                      for proxy in self.all_proxies]
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"\n❌ Error in proxy test: {e}")
+        def on_error(proxy, e):
+            print(f"\n❌ Error in proxy test for {proxy}: {e}")
+
+        run_concurrent(self.all_proxies, self.test_single_proxy, max_workers=self.max_workers, on_error=on_error)
         
         print("\n\n✅ Testing complete!")
         return len(self.working_proxies)
 
     def display_results(self):
         """Display detailed results in a formatted table"""
+        from tabulate import tabulate
+        
         if not self.working_proxies:
             print("\n❌ No working proxies found!")
             return
@@ -179,12 +246,13 @@ class ProxyTester:
         self.working_proxies.sort(key=lambda x: x['timings']['total'])
         
         # Prepare table data
-        headers = ["Proxy", "Response Time", "Connect Time", "Status"]
+        headers = ["Proxy", "Scheme", "Response Time", "Connect Time", "Status"]
         table_data = []
         
         for proxy in self.working_proxies[:20]:  # Show top 20
             table_data.append([
                 proxy['proxy'],
+                proxy.get('scheme', 'http'),
                 f"{proxy['timings']['total']}s",
                 f"{proxy['timings']['connect']}s",
                 "✅ Working" if proxy['status'] == 'working' else "❌ Failed"
@@ -214,12 +282,7 @@ class ProxyTester:
         """Save detailed results to files"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Save simple list of working proxies
-        with open('working_proxies.txt', 'w') as f:
-            for proxy in self.working_proxies:
-                f.write(f"{proxy['proxy']}\n")
-        
-        # Save detailed results
+        # Save detailed results first; a running server reloads from it and may read between the two writes
         results = {
             'timestamp': timestamp,
             'total_tested': len(self.all_proxies),
@@ -229,12 +292,22 @@ class ProxyTester:
             'failed_proxies': self.failed_proxies
         }
         
-        with open('working_proxies_detailed.json', 'w') as f:
-            json.dump(results, f, indent=2)
+        atomic_write('working_proxies_detailed.json', json.dumps(results, indent=2))
+        
+        # Save simple list of working proxies
+        atomic_write('working_proxies.txt', ''.join(f"{proxy['proxy']}\n" for proxy in self.working_proxies))
         
         print("\n💾 Results saved to:")
         print("   - working_proxies.txt")
         print("   - working_proxies_detailed.json")
+        
+        # Verdicts also go to the proxy store, which a running server may be writing to at the same time
+        store = ProxyStore.from_env()
+        if store:
+            verdicts = {p['proxy']: (True, p['timings']['total'], p.get('scheme')) for p in self.working_proxies}
+            verdicts.update((p['proxy'], (False, None, None)) for p in self.failed_proxies)
+            store.record_tests(verdicts)
+            print(f"   - {store.path}")
 
 def main():
     tester = ProxyTester()
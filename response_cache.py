@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Response Cache - Bounded LRU cache for parsed API results with a TTL per
+endpoint (live status for seconds, schedules for hours, PNRs for minutes).
+
+Each endpoint has a soft and a hard TTL. Past the soft TTL an entry is
+still served but reported as stale so the caller can refresh it in the
+background (stale-while-revalidate); past the hard TTL it is dropped.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_SOFT_TTLS = {
+    'live_status': 30,  # Trains move, keep it short
+    'schedule': 6 * 3600,  # Timetables rarely change
+    'pnr': 300  # Chart preparation can change a PNR within minutes
+}
+
+DEFAULT_TTLS = {
+    'live_status': 120,
+    'schedule': 7 * 24 * 3600,
+    'pnr': 300  # No stale PNRs
+}
+
+
+class ResponseCache:
+    def __init__(self, max_entries=2048, ttls=None, soft_ttls=None):
+        self.max_entries = max_entries  # Entries kept across all endpoints
+        self.ttls = dict(DEFAULT_TTLS)  # endpoint -> seconds before an entry is dropped (hard TTL)
+        self.ttls.update(ttls or {})
+        self.soft_ttls = dict(DEFAULT_SOFT_TTLS)  # endpoint -> seconds an entry stays fresh
+        self.soft_ttls.update(soft_ttls or {})
+        self.entries = OrderedDict()  # (endpoint, key) -> (stored_at, value), least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, endpoint, key, current_time=None):
+        """Return the cached value, or None if missing or past the endpoint's hard TTL"""
+        entry = self.get_entry(endpoint, key, current_time)
+        return entry[0] if entry else None
+
+    def get_entry(self, endpoint, key, current_time=None):
+        """Return (value, age, stale) for a cached entry, or None if missing or past the hard TTL"""
+        if current_time is None:
+            current_time = time.time()
+        cache_key = (endpoint, key)
+
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            age = current_time - stored_at
+            if age >= self.ttls[endpoint]:
+                del self.entries[cache_key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(cache_key)
+            stale = age >= self.soft_ttls[endpoint]
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return value, age, stale
+
+    def set(self, endpoint, key, value, current_time=None):
+        """Store a value, evicting the least recently used entries over the bound"""
+        if current_time is None:
+            current_time = time.time()
+        cache_key = (endpoint, key)
+
+        with self.lock:
+            self.entries.pop(cache_key, None)
+            self.entries[cache_key] = (current_time, value)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint, key):
+        with self.lock:
+            return self.entries.pop((endpoint, key), None) is not None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self):
+        """Return cache counters for monitoring"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
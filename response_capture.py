@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Response Capture - Samples upstream pages to disk for debugging and for
+refreshing the test fixtures, without touching the request path.
+
+Off unless CAPTURE_SAMPLE_PERCENT > 0. A sampled page is handed to a
+background writer through a bounded queue (dropped if the queue is full)
+and saved gzip-compressed as <endpoint>-<UTC timestamp>-<seq>-<key>.html.gz.
+Files are written under a temporary name and renamed, so a reader never
+sees a partial capture, and only the newest max_files are kept.
+
+Environment:
+    CAPTURE_SAMPLE_PERCENT  Share of upstream pages captured (default 0, off)
+    CAPTURE_DIR             Directory for the capture ring (default captures)
+    CAPTURE_MAX_FILES       Captures kept before the oldest is removed (default 50)
+"""
+
+import collections
+import gzip
+import os
+import queue
+import random
+import re
+import threading
+import time
+from structured_log import get_logger
+
+logger = get_logger(__name__)
+
+CAPTURE_SUFFIX = '.html.gz'
+UNSAFE_KEY_CHARS = re.compile(r'[^\w-]')
+
+
+class ResponseCapture:
+    def __init__(self, directory='captures', sample_percent=0.0, max_files=50, queue_size=16):
+        self.directory = directory
+        self.sample_percent = sample_percent  # 0 disables capture
+        self.max_files = max_files
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.files = collections.deque()  # Ring of capture paths, oldest first
+        self.sequence = 0  # Tells apart captures made in the same millisecond
+        self.lock = threading.Lock()
+        self.thread = None
+
+        # Counters
+        self.captured = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            directory=os.environ.get('CAPTURE_DIR', 'captures'),
+            sample_percent=float(os.environ.get('CAPTURE_SAMPLE_PERCENT', 0)),
+            max_files=int(os.environ.get('CAPTURE_MAX_FILES', 50))
+        )
+
+    @property
+    def enabled(self):
+        return self.sample_percent > 0 and self.max_files > 0
+
+    def capture(self, endpoint, key, text):
+        """Queue a page for writing if it is sampled; never blocks. Returns True if queued"""
+        if not self.enabled or not text or random.random() * 100 >= self.sample_percent:
+            return False
+        with self.lock:
+            self.sequence += 1
+            item = (endpoint, key, time.time(), self.sequence, text)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True, name='response-capture')
+                self.thread.start()
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+    def _run(self):
+        self._load_existing()
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Response capture failed: %s", e)
+            finally:
+                self.queue.task_done()
+
+    def _load_existing(self):
+        """Adopt captures left by an earlier run so the ring stays bounded across restarts"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            names = [n for n in os.listdir(self.directory) if n.endswith(CAPTURE_SUFFIX)]
+        except OSError as e:
+            logger.warning("Cannot use capture directory %s: %s", self.directory, e)
+            return
+        paths = [os.path.join(self.directory, n) for n in names]
+        self.files.extend(sorted(paths, key=os.path.getmtime))
+        self._prune()
+
+    def _write(self, endpoint, key, timestamp, sequence, text):
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(timestamp)) + f"{int(timestamp * 1000) % 1000:03d}Z"
+        name = f"{endpoint}-{stamp}-{sequence:06d}-{UNSAFE_KEY_CHARS.sub('_', str(key))}{CAPTURE_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(self.directory, exist_ok=True)
+        with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+        self.files.append(path)
+        self.captured += 1
+        self._prune()
+        logger.debug("Captured response", extra={'endpoint': endpoint, 'path': path})
+
+    def _prune(self):
+        while len(self.files) > self.max_files:
+            try:
+                os.remove(self.files.popleft())
+            except OSError:
+                pass
+
+    def flush(self):
+        """Block until every queued capture is written"""
+        if self.thread is not None:
+            self.queue.join()
+
+    def stop(self):
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+
+    def get_stats(self):
+        return {
+            'enabled': self.enabled,
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'files': len(self.files)
+        }
+
+
+def read_capture(path):
+    """Page text of a capture file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return f.read()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Retry Policy - One time budget per upstream request, shared by every attempt.
+
+A Deadline is started when a request begins; each attempt gets the caller's
+per-attempt timeout shrunk to what is left of the budget, and the retry loop
+stops as soon as the budget is spent. Between attempts Backoff waits a
+jittered, growing delay - but only when the next attempt is not expected to
+do better (no healthy proxy to switch to, or the upstream itself pushed back).
+RetryState carries the attempt count and last error between attempts.
+"""
+
+import random
+import time
+
+MIN_ATTEMPT_TIMEOUT = 0.05  # Seconds; less than this left is treated as spent
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before an attempt succeeded"""
+
+
+class Deadline:
+    def __init__(self, budget, clock=time.monotonic):
+        self.budget = budget
+        self.clock = clock
+        self.expires = clock() + budget
+
+    def remaining(self):
+        return max(0.0, self.expires - self.clock())
+
+    def expired(self):
+        return self.remaining() < MIN_ATTEMPT_TIMEOUT
+
+    def timeout(self, cap):
+        """Per-attempt timeout: the caller's cap, shrunk to fit the rest of the budget"""
+        return min(cap, self.remaining())
+
+    def exceeded(self, attempts, last_error):
+        message = f"Request budget of {self.budget:g}s spent after {attempts} attempt(s)"
+        return DeadlineExceeded(f"{message}. Last error: {last_error}" if last_error else message)
+
+
+class Backoff:
+    """Decorrelated jitter: each delay is drawn from [base, 3 x previous delay], capped"""
+    def __init__(self, base=0.1, cap=2.0, rng=random):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+        self.delay = 0.0
+
+    def next_delay(self, deadline=None):
+        """Delay before the next attempt, never longer than what is left of the deadline"""
+        self.delay = min(self.cap, self.rng.uniform(self.base, max(self.base, self.delay * 3)))
+        if deadline is not None:
+            return min(self.delay, deadline.remaining())
+        return self.delay
+
+
+class RetryState:
+    """Progress of one upstream request across its attempts, shared by the sync, async and hedged loops"""
+    def __init__(self, deadline, backoff=None, max_retries=1):
+        self.deadline = deadline
+        self.backoff = backoff
+        self.max_retries = max_retries
+        self.retries = 0  # Attempts made so far
+        self.last_error = None
+        self.upstream_busy = False  # Last attempt was turned away by the upstream, not failed by the proxy
+
+    def attempts_left(self):
+        return self.retries < self.max_retries and not self.deadline.expired()
+
+    def give_up(self):
+        """Raise why the request failed: budget spent or every attempt failed (None if there was nothing to try)"""
+        if self.retries < self.max_retries:
+            raise self.deadline.exceeded(self.retries, self.last_error)
+        if self.last_error:
+            raise Exception(f"All proxy attempts failed. Last error: {self.last_error}")
+        return None
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Session Pool - Keeps warm requests sessions per proxy URL so that
+keep-alive connections (TCP, proxy CONNECT and TLS) are reused across
+upstream requests instead of being rebuilt for every attempt.
+
+Pooled sessions are shared by every caller going through the same proxy, so
+they never store cookies, and an evicted session is only dropped from the
+pool, never closed: another thread may still be using it. Its connections
+are released when the last user lets go of it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import CookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RejectCookies(CookiePolicy):
+    """Cookie policy that never stores or sends a cookie"""
+    netscape = True
+    rfc2965 = False
+    hide_cookie2 = True
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+    def domain_return_ok(self, domain, request):
+        return False
+
+    def path_return_ok(self, path, request):
+        return False
+
+
+class SessionPool:
+    def __init__(self, max_sessions=64, pool_maxsize=10, idle_timeout=120):
+        self.max_sessions = max_sessions  # Max proxy URLs kept warm at once
+        self.pool_maxsize = pool_maxsize  # Max keep-alive connections per session
+        self.idle_timeout = idle_timeout  # Seconds before an unused session is dropped
+        self.sessions = OrderedDict()  # proxy_url -> (session, last_used), oldest first
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def _new_session(self, proxy_url):
+        """Build a session routed through a single proxy URL"""
+        session = requests.Session()
+        session.verify = False
+        session.cookies.set_policy(RejectCookies())  # Shared across callers, so no cookie jar
+        session.proxies = {
+            'http': proxy_url,
+            'https': proxy_url
+        }
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self, proxy_url):
+        """Return the warm session for a proxy URL, creating it if needed"""
+        current_time = time.time()
+
+        with self.lock:
+            # Drop sessions that have been idle too long (oldest are at the front)
+            while self.sessions:
+                _, last_used = next(iter(self.sessions.values()))
+                if current_time - last_used <= self.idle_timeout:
+                    break
+                self.sessions.popitem(last=False)
+                self.evicted += 1
+
+            if proxy_url in self.sessions:
+                session = self.sessions.pop(proxy_url)[0]
+                self.reused += 1
+            else:
+                session = self._new_session(proxy_url)
+                self.created += 1
+
+            self.sessions[proxy_url] = (session, current_time)
+
+            # Enforce the size bound by dropping the least recently used sessions
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evicted += 1
+
+        return session
+
+    def evict(self, proxy):
+        """Drop every pooled session that goes through the given proxy"""
+        suffix = f"://{proxy}"
+        with self.lock:
+            urls = [url for url in self.sessions if url == proxy or url.endswith(suffix)]
+            for url in urls:
+                del self.sessions[url]
+            self.evicted += len(urls)
+        return len(urls)
+
+    def close_all(self):
+        """Close all pooled sessions, for shutdown when no requests are in flight"""
+        with self.lock:
+            expired = [session for session, _ in self.sessions.values()]
+            self.sessions.clear()
+
+        for session in expired:
+            session.close()
+
+    def get_stats(self):
+        """Return pool counters for monitoring"""
+        with self.lock:
+            return {
+                'sessions': len(self.sessions),
+                'created': self.created,
+                'reused': self.reused,
+                'evicted': self.evicted
+            }
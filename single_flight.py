@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Single Flight - Coalesces identical concurrent lookups so that only one
+upstream fetch runs per key; every caller waiting on that key shares its
+result (or its exception).
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalescing for blocking callers on worker threads"""
+    def __init__(self):
+        self.calls = {}  # key -> _Call in flight
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn once for all concurrent callers with the same key"""
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self.calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'in_flight': len(self.calls),
+                'executed': self.executed,
+                'shared': self.shared
+            }
+
+
+class AsyncSingleFlight:
+    """Coalescing for coroutines; a flight belongs to the event loop that started it"""
+    def __init__(self):
+        self.calls = {}  # (loop, key) -> Future in flight
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Await fn once for all concurrent callers with the same key"""
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        future = self.calls.get(flight_key)
+        if future is not None:
+            self.shared += 1
+            # Shield so one cancelled waiter doesn't cancel the shared fetch
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self.calls[flight_key] = future
+        self.executed += 1
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a flight with no followers doesn't log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.calls[flight_key]
+
+    def get_stats(self):
+        return {
+            'in_flight': len(self.calls),
+            'executed': self.executed,
+            'shared': self.shared
+        }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Structured Log - Leveled, structured logging for the service that never does
+I/O on the request path.
+
+Records are tagged with the current request ID (a contextvar set per API
+request), sampled if they are high-volume DEBUG lines, and put on a bounded
+queue without blocking; a background listener thread formats and writes
+them. If the queue is full the record is dropped and counted rather than
+stalling the worker thread.
+
+Environment:
+    LOG_LEVEL               DEBUG, INFO (default), WARNING, ...
+    LOG_FORMAT              text (default, key=value fields) or json
+    LOG_DEBUG_SAMPLE_EVERY  Keep 1 in N DEBUG records per call site (default 100)
+"""
+
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import uuid
+
+LOGGER_NAME = 'confirmtkt'
+
+request_id_var = contextvars.ContextVar('request_id', default='-')
+REQUEST_ID = re.compile(r'[\w.:-]{1,64}\Z')  # Caller-supplied IDs end up in log lines verbatim
+
+# Attributes every LogRecord has; anything else on a record came in through extra=
+RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'taskName'}
+
+_listener = None
+_handler = None
+
+
+def get_logger(name):
+    """Logger under the service namespace, e.g. get_logger(__name__)"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def request_id_from(header_value):
+    """Request ID passed in by the caller if it is safe to log, else a new one"""
+    if header_value and REQUEST_ID.match(header_value):
+        return header_value
+    return new_request_id()
+
+
+class ContextFilter(logging.Filter):
+    """Stamp each record with the request ID of the thread or task that logged it"""
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Let 1 in every `every` DEBUG records through per call site; other levels always pass"""
+    def __init__(self, every=100):
+        super().__init__()
+        self.every = every
+        self.counts = {}  # (pathname, lineno) -> DEBUG records seen
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every <= 1:
+            return True
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            seen = self.counts.get(key, 0)
+            self.counts[key] = seen + 1
+        if seen % self.every:
+            return False
+        record.sample_rate = self.every  # This line stands for `every` records
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, json_format=False):
+        super().__init__()
+        self.json_format = json_format
+
+    def format(self, record):
+        fields = {k: v for k, v in vars(record).items() if k not in RECORD_ATTRS}
+        timestamp = datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds')
+        request_id = getattr(record, 'request_id', '-')
+        message = record.getMessage()
+
+        if self.json_format:
+            return json.dumps(dict({
+                'ts': timestamp,
+                'level': record.levelname,
+                'logger': record.name,
+                'request_id': request_id,
+                'msg': message
+            }, **fields), default=str)
+
+        line = f"{timestamp} {record.levelname:<7} [{request_id}] {record.name}: {message}"
+        if fields:
+            line += ' ' + ' '.join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def configure_logging(level=None, json_format=None, debug_sample_every=None, stream=None, queue_size=10000):
+    """Route the service loggers through the queue to a background writer; safe to call again"""
+    global _listener, _handler
+    level = level or os.environ.get('LOG_LEVEL', 'INFO')
+    if json_format is None:
+        json_format = os.environ.get('LOG_FORMAT', 'text') == 'json'
+    if debug_sample_every is None:
+        debug_sample_every = int(os.environ.get('LOG_DEBUG_SAMPLE_EVERY', 100))
+
+    shutdown_logging()
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(StructuredFormatter(json_format))
+
+    # Handler filters run in the thread that logged, where the request ID is still set;
+    # sampling there also keeps dropped DEBUG lines off the queue entirely
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    _handler.addFilter(ContextFilter())
+    _handler.addFilter(SamplingFilter(debug_sample_every))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.handlers = [_handler]
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(_handler.queue, writer)
+    _listener.start()
+    return _handler
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_stats():
+    return {
+        'queued': _handler.queue.qsize() if _handler else 0,
+        'dropped': _handler.dropped if _handler else 0
+    }
+
+
+atexit.register(shutdown_logging)
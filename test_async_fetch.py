@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the asyncio fetch engine using the local upstream stand-in
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from async_fetch import AiohttpBackend, AsyncFetcher
+from fake_upstream import FakeHTTPProxy, FakeUpstream
+from fixtures import load_fixture
+
+LIVE_URL = "https://www.confirmtkt.com/train-running-status/22482"
+
+
+def test_live_status_async_parses_fixture(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))})
+    result = asyncio.run(api.get_live_status_async('22482'))
+
+    assert result['status'] == 'success'
+    assert result['data']['schedule']
+    assert result['data']['train_number'] == '22482'
+
+
+def test_async_lookups_share_one_event_loop(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))}, latency=0.2)
+
+    async def run_many():
+        return await asyncio.gather(*[api.get_live_status_async('22482') for _ in range(50)])
+
+    start_time = time.time()
+    results = asyncio.run(run_many())
+    elapsed = time.time() - start_time
+
+    assert all(result['status'] == 'success' for result in results)
+    # 50 lookups with 0.2s upstream latency each must overlap, not queue
+    assert elapsed < 5
+
+
+def test_async_request_falls_through_to_next_proxy_format(make_api):
+    api = make_api({LIVE_URL: (200, 'ok')})
+    backend = api.async_fetcher.backend
+    backend.failing_proxies.update(f"http://{proxy}" for proxy in api.proxy_rotator.proxies)
+
+    response = asyncio.run(api.make_request_with_proxy_async(LIVE_URL))
+
+    assert response.status_code == 200
+    assert [proxy_url.split('://')[0] for _, proxy_url in backend.requests] == ['http', 'https']
+
+
+def test_learned_scheme_is_tried_first(make_api):
+    api = make_api({LIVE_URL: (200, 'ok')})
+    backend = api.async_fetcher.backend
+    backend.failing_proxies.update(f"http://{proxy}" for proxy in api.proxy_rotator.proxies)
+    backend.failing_proxies.update(f"https://{proxy}" for proxy in api.proxy_rotator.proxies)
+
+    asyncio.run(api.make_request_with_proxy_async(LIVE_URL))
+    proxy = backend.requests[-1][1].split('://')[1]
+    assert api.proxy_rotator.proxy_schemes[proxy] == 'socks5h'
+
+    backend.requests.clear()
+    api.proxy_rotator.replace_proxies([proxy])
+    asyncio.run(api.make_request_with_proxy_async(LIVE_URL))
+    assert backend.requests == [(LIVE_URL, f"socks5h://{proxy}")]
+
+
+def test_aiohttp_session_outlives_each_event_loop_and_closes_once():
+    pytest.importorskip('aiohttp')
+    upstream = FakeUpstream(seed=1).start()
+    proxy = FakeHTTPProxy(upstream.address).start()
+    try:
+        backend = AiohttpBackend()
+        url = f"{upstream.base_url}/rbooking/pnr/1234567890"
+        fetch = lambda: backend.fetch('get', url, f"http://{proxy.proxy}", timeout=5)
+
+        assert asyncio.run(fetch()).status_code == 200
+        session = backend.session
+        assert asyncio.run(fetch()).status_code == 200
+        assert backend.session is session and not session.closed
+
+        AsyncFetcher(None, backend=backend).shutdown()
+        assert session.closed and backend.loop is None
+    finally:
+        proxy.stop()
+        upstream.stop()
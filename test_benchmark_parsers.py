@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline parser benchmark harness
+"""
+
+import os
+
+from benchmark_parsers import (
+    CASES, FixtureResponse, available_backends, find_regressions, run_benchmarks
+)
+from benchmark_row_parsing import FIXTURES, LegacyRowParsers, load_rows, row_parsers
+from fixtures import load_fixture, schedule_page
+
+
+def test_schedule_page_goes_through_the_table_loop(make_api):
+    api = make_api()
+
+    result = api.parse_schedule_response('22482', FixtureResponse(schedule_page(load_fixture('train_status.html'))))
+
+    stations = result['data']['stations']
+    assert len(stations) == 20
+    assert stations[1]['code'] == 'DEC' and stations[1]['halt'] == '2m'
+    assert result['data']['route'] == 'Delhi Sarai Rohilla to Jodhpur'
+
+
+def test_every_case_runs_on_html_parser(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    results = run_benchmarks(backends=['html.parser'], iterations=1)
+
+    assert len(results) == len(CASES)
+    assert all(r['median_ms'] > 0 and r['peak_kb'] > 0 and r['pages_per_sec'] > 0 for r in results)
+    assert not os.listdir(tmp_path)  # Parsing writes nothing to disk
+    assert 'html.parser' in available_backends()
+
+
+def test_regressions_flag_slower_or_larger_parses():
+    baseline = [{'case': 'pnr', 'fixture': 'p.html', 'backend': 'lxml', 'median_ms': 2.0, 'peak_kb': 40.0}]
+
+    assert find_regressions([dict(baseline[0], median_ms=2.4)], baseline) == []
+    assert find_regressions([dict(baseline[0], median_ms=3.0)], baseline) == ['pnr:p.html:lxml median_ms 2.0 -> 3.0']
+    assert find_regressions([dict(baseline[0], peak_kb=80.0)], baseline, tolerance=0.5) == ['pnr:p.html:lxml peak_kb 40.0 -> 80.0']
+
+
+def test_row_parsers_match_the_legacy_baseline(make_api):
+    before = row_parsers(LegacyRowParsers())
+    after = row_parsers(make_api())
+
+    for fixture in FIXTURES:
+        for name, inputs in load_rows(fixture).items():
+            assert [after[name](value) for value in inputs] == [before[name](value) for value in inputs]
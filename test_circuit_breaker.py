@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-proxy circuit breaker state machine
+"""
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_open_duration_doubles_per_failed_trial_up_to_the_cap():
+    breaker = CircuitBreaker(max_failures=2, base_open=10, max_open=35)
+
+    assert not breaker.record_failure(0)
+    assert breaker.record_failure(1) and breaker.state == OPEN and breaker.retry_at() == 11
+    assert not breaker.record_failure(2)  # Late report from a request sent before the trip
+    assert not breaker.ready_for_trial(10) and breaker.ready_for_trial(11)
+
+    open_times = []
+    for now in (11, 40, 100, 200):
+        breaker.start_trial(now)
+        assert breaker.state == HALF_OPEN
+        breaker.record_failure(now)
+        open_times.append(breaker.open_for)
+    assert open_times == [20, 35, 35, 35]
+
+    assert breaker.record_success() and breaker.state == CLOSED and breaker.open_for == 0
+    assert breaker.snapshot() == {'state': CLOSED, 'failures': 0, 'open_for': 0, 'retry_at': None, 'trips': 5}
+
+
+def test_silent_trial_is_offered_again_after_trial_timeout():
+    breaker = CircuitBreaker(max_failures=1, base_open=10, trial_timeout=60)
+    breaker.record_failure(0)
+    breaker.start_trial(10)
+
+    assert not breaker.ready_for_trial(69)
+    assert breaker.ready_for_trial(70)
+    breaker.record_success()
+    assert not breaker.record_success()  # Already closed
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the local upstream and proxy stand-ins used by the load driver
+"""
+
+import pytest
+import requests
+
+from fake_upstream import FakeUpstream, FakeHTTPProxy, FakeSocksProxy
+from load_test import percentile
+
+
+@pytest.fixture
+def upstream():
+    server = FakeUpstream(seed=1).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def proxies(upstream):
+    servers = [FakeHTTPProxy(upstream.address).start(), FakeSocksProxy(upstream.address).start()]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def via(proxy_url):
+    return {'http': proxy_url, 'https': proxy_url}
+
+
+def test_upstream_serves_fixtures_and_injected_faults(upstream):
+    assert 'rs__station-row' in requests.get(f"{upstream.base_url}/train-running-status/22482").text
+    assert '<table' in requests.get(f"{upstream.base_url}/train-schedule/22482").text
+    assert requests.get(f"{upstream.base_url}/nowhere").status_code == 404
+
+    upstream.error_rate = 1.0
+    assert requests.get(f"{upstream.base_url}/rbooking/pnr/1234567890").status_code == 503
+    upstream.error_rate, upstream.empty_rate = 0.0, 1.0
+    response = requests.get(f"{upstream.base_url}/rbooking/pnr/1234567890")
+    assert response.status_code == 200 and response.text == ''
+    assert upstream.get_stats() == {'live_status': 1, 'schedule': 1, 'not_found': 1, 'pnr': 2, 'errors': 1, 'empty': 1}
+
+
+def test_proxies_forward_only_to_the_upstream(upstream, proxies):
+    http_proxy, socks_proxy = proxies
+    url = f"{upstream.base_url}/rbooking/pnr/1234567890"
+
+    assert requests.get(url, proxies=via(f"http://{http_proxy.proxy}"), timeout=5).status_code == 200
+    assert requests.get(url, proxies=via(f"socks5h://{socks_proxy.proxy}"), timeout=5).status_code == 200
+    assert requests.get('http://example.com/', proxies=via(f"http://{http_proxy.proxy}"), timeout=5).status_code == 403
+
+    http_proxy.failure_rate = 1.0
+    with pytest.raises(requests.exceptions.ConnectionError):
+        requests.get(url, proxies=via(f"http://{http_proxy.proxy}"), timeout=5)
+
+
+def test_api_request_path_through_fake_proxies(upstream, proxies, monkeypatch, make_api):
+    monkeypatch.setenv('UPSTREAM_BASE_URL', upstream.base_url)
+    api = make_api()
+    api.proxy_rotator.replace_proxies([p.proxy for p in proxies])
+    api.proxy_rotator.proxy_schemes.update({proxies[0].proxy: 'http', proxies[1].proxy: 'socks5h'})
+
+    assert api.get_live_status('22482')['data']['train_name'] == 'DEE JU SF EXP'
+    assert len(api.get_train_schedule('22482')['data']['stations']) == 20
+    assert api.get_pnr_status('1234567890')['status'] == 'success'
+    # Each call went through a fake proxy; kept-alive SOCKS tunnels are only admitted once
+    assert sum(stats['success'] for stats in api.proxy_rotator.proxy_stats.values()) == 3
+    assert sum(p.get_stats().get('forwarded', 0) for p in proxies) >= 1
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+
+    assert [percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([], 99) == 0.0
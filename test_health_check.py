@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the proxy health-check scheduler
+"""
+
+import json
+import time
+import types
+
+import pytest
+
+import proxy_rotator
+from health_check import HealthChecker
+from proxy_rotator import ProxyRotator
+
+
+@pytest.fixture
+def rotator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open('working_proxies_detailed.json', 'w') as f:
+        json.dump({
+            'working_proxies': [
+                {'proxy': f'10.0.3.{i}:80', 'timings': {'total': 5.0}}
+                for i in range(6)
+            ]
+        }, f)
+    return ProxyRotator()
+
+
+def test_recently_failed_then_stale_proxies_come_first(rotator):
+    now = time.time()
+    checker = HealthChecker(rotator, lambda proxy: (True, 1.0, 'http'), stale_after=600)
+    for proxy in rotator.proxies:
+        rotator.proxy_stats[proxy]['last_success'] = now
+    rotator.proxy_stats['10.0.3.4:80']['last_success'] = now - 1200
+    rotator.proxy_stats['10.0.3.2:80']['last_success'] = now - 900
+    rotator.update_proxy_stats('10.0.3.5:80', False)
+
+    assert checker.pick_proxies(10, now) == ['10.0.3.5:80', '10.0.3.4:80', '10.0.3.2:80']
+
+
+def test_probe_budget_is_respected(rotator):
+    probed = []
+
+    def probe(proxy):
+        probed.append(proxy)
+        return False, None, None
+
+    checker = HealthChecker(rotator, probe, probes_per_minute=6, max_concurrent=2)
+    start_time = checker.last_refill
+
+    # 6 probes/min is one every 10 s, bursting to max_concurrent
+    assert checker.run_once(start_time + 5) == []
+    assert len(checker.run_once(start_time + 10)) == 1
+    assert len(checker.run_once(start_time + 60)) == 2
+    assert len(probed) == 3
+
+    # A failed probe blacklists the proxy but doesn't queue it for an immediate re-check
+    assert set(probed) <= rotator.failed_proxies
+    assert not set(probed) & set(checker.pick_proxies(10, time.time()))
+
+
+def test_probes_wait_for_the_breaker_and_claim_its_trial(rotator, monkeypatch):
+    clock = types.SimpleNamespace(now=time.time())
+    monkeypatch.setattr(proxy_rotator, 'time', types.SimpleNamespace(time=lambda: clock.now))
+    probed = []
+
+    def probe(proxy):
+        probed.append(proxy)
+        return False, None, None
+
+    checker = HealthChecker(rotator, probe, probes_per_minute=600, max_concurrent=6)
+    checker.last_refill = clock.now
+    for _ in range(rotator.max_failures):
+        rotator.update_proxy_stats('10.0.3.0:80', False)
+    breaker = rotator.breakers['10.0.3.0:80']
+
+    # Open: failed most recently, but not probed until the open period is over
+    clock.now += 1
+    assert '10.0.3.0:80' not in checker.pick_proxies(10, clock.now)
+
+    # Due: the probe claims the single half-open trial, so requests don't get it too
+    clock.now += rotator.breaker_open
+    assert checker.pick_proxies(1, clock.now) == ['10.0.3.0:80']
+    assert rotator.claim_probe('10.0.3.0:80') and breaker.state == 'half_open'
+    assert rotator.get_proxy() != '10.0.3.0:80'
+    assert '10.0.3.0:80' not in checker.pick_proxies(10, clock.now)
+    assert not rotator.claim_probe('10.0.3.0:80')
+
+    # The failed trial doubles the open period once
+    rotator.record_probe('10.0.3.0:80', False)
+    assert breaker.state == 'open' and breaker.open_for == 2 * rotator.breaker_open
+    checker.run_once(clock.now + 10)
+    assert '10.0.3.0:80' not in probed and breaker.open_for == 2 * rotator.breaker_open
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for hedged requests: winner selection, losing legs and per-leg stats
+"""
+
+import threading
+import time
+
+import requests
+
+from async_fetch import AsyncResponse
+from retry_policy import Deadline
+
+LIVE_URL = "https://www.confirmtkt.com/train-running-status/22482"
+FAST, SLOW, SPARE = '10.0.3.1:80', '10.0.3.2:80', '10.0.3.3:80'
+
+
+class FakeSession:
+    """Answers through a per-proxy handler(proxy_url, timeout), recording every call"""
+    def __init__(self, api, proxy_url):
+        self.api = api
+        self.proxy_url = proxy_url
+
+    def request(self, method, url, headers=None, timeout=None, **kwargs):
+        with self.api.calls_lock:
+            self.api.calls.append(self.proxy_url)
+        proxy = self.proxy_url.split('://', 1)[1]
+        return self.api.handlers[proxy](self.proxy_url, timeout)
+
+
+def build_hedged_api(make_api, handlers):
+    """API whose sessions answer through handlers (proxy -> handler), hedging after 50 ms"""
+    api = make_api()
+    api.proxy_rotator.replace_proxies(list(handlers))
+    api.proxy_rotator.get_best_proxies = lambda count: list(handlers)[:count]
+    api.handlers = handlers
+    api.calls = []
+    api.calls_lock = threading.Lock()
+    api.session_pool.get_session = lambda proxy_url: FakeSession(api, proxy_url)
+    api.hedge_delay = 0.05
+    return api
+
+
+def ok(proxy_url, timeout):
+    return AsyncResponse(200, 'page')
+
+
+def slow_refusal(proxy_url, timeout):
+    time.sleep(0.3)
+    raise requests.exceptions.ProxyError("refused")
+
+
+def stats(api, proxy):
+    return api.proxy_rotator.proxy_stats[proxy]
+
+
+def test_first_good_leg_wins_and_later_legs_never_fire(make_api):
+    api = build_hedged_api(make_api, {SLOW: slow_refusal, FAST: ok, SPARE: ok})
+
+    response = api.make_hedged_request(LIVE_URL)
+
+    assert response.text == 'page'
+    assert all(call.endswith(FAST) or call.endswith(SLOW) for call in api.calls)
+    assert stats(api, FAST)['success'] == 1
+
+    # The losing leg stops at its failed scheme instead of trying the next one
+    time.sleep(0.5)
+    assert sum(call.endswith(SLOW) for call in api.calls) == 1
+    assert stats(api, SLOW)['failure'] == 0
+
+
+def test_rejected_response_books_one_failure_per_leg(make_api):
+    for status, text in ((503, 'busy'), (200, '')):
+        api = build_hedged_api(make_api, {SLOW: lambda proxy_url, timeout: AsyncResponse(status, text)})
+
+        assert api.make_hedged_request(LIVE_URL) is None
+        assert len(api.calls) == 1  # The proxy answered; other schemes would fetch the same
+        assert stats(api, SLOW)['failure'] == 1
+        assert api.proxy_rotator.breakers[SLOW].state == 'closed'
+
+
+def test_timeout_cut_short_by_the_budget_is_not_the_proxys_fault(make_api):
+    def read_timeout(proxy_url, timeout):
+        raise requests.exceptions.ReadTimeout(f"timed out after {timeout}")
+
+    api = build_hedged_api(make_api, {SLOW: read_timeout})
+    assert api.make_hedged_request(LIVE_URL, deadline=Deadline(1), timeout=15) is None
+    assert stats(api, SLOW)['failure'] == 0
+
+    assert api.make_hedged_request(LIVE_URL, deadline=Deadline(30), timeout=1) is None
+    assert stats(api, SLOW)['failure'] == 1
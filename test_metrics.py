@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the metrics registry and the /metrics endpoint
+"""
+
+import asyncio
+
+from fixtures import load_fixture
+from metrics import Registry
+
+LIVE_URL = "https://www.confirmtkt.com/train-running-status/22482"
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with line_start"""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"{line_start} not in output")
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter('app_requests_total', 'Requests', ['route'])
+    latency = registry.histogram('app_seconds', 'Latency', buckets=(0.1, 1))
+    requests.inc(('say "hi"\n',), 2)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+
+    def broken():
+        raise RuntimeError('boom')
+    registry.add_collector(broken)
+    text = registry.render()
+
+    assert '# TYPE app_requests_total counter' in text
+    assert 'app_requests_total{route="say \\"hi\\"\\n"} 2' in text
+    assert [sample(text, f'app_seconds_bucket{{le="{le}"}}') for le in ('0.1', '1', '+Inf')] == [1, 2, 3]
+    assert sample(text, 'app_seconds_count') == 3 and sample(text, 'app_seconds_sum') == 5.55
+    assert '# collector broken failed: boom' in text
+
+
+def test_lookups_record_upstream_parse_cache_and_proxy_metrics(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))})
+    proxy = api.proxy_rotator.proxies[0]
+
+    for _ in range(3):
+        asyncio.run(api.get_live_status_async('22482'))
+    text = api.metrics.render()
+
+    assert sample(text, 'confirmtkt_upstream_request_seconds_count{endpoint="live_status",result="ok"}') == 1
+    assert sample(text, 'confirmtkt_parse_seconds_count{endpoint="live_status"}') == 1
+    assert sample(text, 'confirmtkt_upstream_attempts_bucket{le="1"}') == 1
+    assert sample(text, 'confirmtkt_upstream_requests_in_flight{endpoint="live_status"}') == 0
+    assert sample(text, 'confirmtkt_cache_lookups_total{result="hit"}') == 2
+    assert abs(sample(text, 'confirmtkt_cache_hit_ratio') - 2 / 3) < 1e-9
+    successes = sum(sample(text, f'confirmtkt_proxy_requests_total{{proxy="{p}",result="success"}}')
+                    for p in api.proxy_rotator.proxies)
+    assert successes == 1 and f'proxy="{proxy}"' in text
+    scores = api.proxy_rotator.scores()
+    assert all(abs(sample(text, f'confirmtkt_proxy_score{{proxy="{p}"}}') - scores[p]['score']) < 1e-6 for p in scores)
+    assert sum(api.proxy_rotator.get_stats()['selections'].values()) == 1
+
+
+def test_metrics_endpoint_counts_requests_in_flight():
+    import confirmtkt_clone
+    client = confirmtkt_clone.app.test_client()
+
+    client.get('/api/live-status')  # 400, no train number
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert sample(text, 'confirmtkt_http_request_seconds_count{endpoint="live_status",status="400"}') >= 1
+    assert sample(text, 'confirmtkt_http_requests_in_flight{endpoint="prometheus_metrics"}') == 1
+    assert sample(text, 'confirmtkt_http_requests_in_flight{endpoint="live_status"}') == 0
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the page parsers using the saved upstream pages
+"""
+
+import time
+
+import pytest
+from bs4 import BeautifulSoup
+
+import confirmtkt_clone
+import page_parser
+from async_fetch import AsyncResponse
+from fixtures import load_fixture
+from live_status_extractor import extract_live_status
+from page_index import PageIndex
+from page_parser import parse_html, LIVE_STATUS_STRAINER, SCHEDULE_STRAINER
+
+FIXTURES = [('train_status.html', '22482'), ('response.html', '15032')]
+
+
+@pytest.fixture
+def api(make_api):
+    return make_api()
+
+
+def full_html_parser(html, strainer=None):
+    return BeautifulSoup(html, 'html.parser')
+
+
+def test_strainers_keep_only_the_sections_parsers_read():
+    html = load_fixture('train_status.html')
+
+    live = parse_html(html, LIVE_STATUS_STRAINER)
+    assert sorted(tag.name for tag in live.find_all(recursive=False)) == ['div', 'div', 'meta', 'title']
+    assert live.find('div', class_='running-status').find_all('div', class_='well')
+
+    schedule = parse_html(html, SCHEDULE_STRAINER)
+    assert {tag.name for tag in schedule.find_all(recursive=False)} <= {'meta', 'title', 'table'}
+
+
+@pytest.mark.parametrize('backend', ['html.parser', 'lxml'])
+@pytest.mark.parametrize('fixture,train_number', FIXTURES)
+def test_restricted_parse_matches_full_parse(api, monkeypatch, fixture, train_number, backend):
+    if backend == 'lxml' and not page_parser.LXML_AVAILABLE:
+        pytest.skip("lxml is not installed")
+    monkeypatch.setattr(page_parser, 'HTML_PARSER', backend)
+    response = AsyncResponse(200, load_fixture(fixture))
+
+    monkeypatch.setattr(api, 'extract_live_status_fast', lambda *args: None)
+    live_status = api.parse_live_status_response(train_number, response)
+    schedule = api.parse_schedule_response(train_number, response)
+    monkeypatch.setattr(confirmtkt_clone, 'parse_html', full_html_parser)
+
+    assert live_status == api.parse_live_status_response(train_number, response)
+    assert schedule == api.parse_schedule_response(train_number, response)
+    assert live_status['data']['schedule']
+
+
+def test_no_data_message_outside_parsed_sections_is_found(api):
+    html = '<html><head><title>x</title></head><body><p>No data available for this train</p></body></html>'
+
+    result = api.parse_live_status_response('12345', AsyncResponse(200, html))
+
+    assert result['data']['has_data'] is False
+    assert result['data']['current_status'] == 'No schedule data available'
+
+
+@pytest.mark.parametrize('fixture,train_number', FIXTURES)
+def test_embedded_state_fast_path_matches_dom_walk(api, monkeypatch, fixture, train_number):
+    page = load_fixture(fixture)
+
+    fast = extract_live_status(page, train_number, api.clean_station_name)
+    monkeypatch.setattr(api, 'extract_live_status_fast', lambda *args: None)
+    dom = api.parse_live_status_response(train_number, AsyncResponse(200, page))['data']
+
+    assert fast == dom
+    assert [station['status'] for station in fast['schedule']].count('current') == 1
+
+
+def test_unexpected_row_layout_falls_back_to_dom_walk(api):
+    page = load_fixture('response.html').replace('<span>Day 2</span>&nbsp;', '<b>Day 2</b>&nbsp;', 1)
+
+    assert extract_live_status(page, '15032', api.clean_station_name) is None
+    result = api.parse_live_status_response('15032', AsyncResponse(200, page))
+    assert result['data']['current_station'] == 'Barabanki'
+    assert len(result['data']['schedule']) == 12
+
+
+def test_page_index_text_matches_get_text():
+    soup = BeautifulSoup(load_fixture('train_status.html'), 'html.parser')
+
+    page = PageIndex(soup)
+
+    assert page.text == soup.get_text()
+    assert page.js_scripts and page.route_elements
+
+
+def test_fallback_extractors_on_saved_page(api):
+    page = PageIndex(BeautifulSoup(load_fixture('response.html'), 'html.parser'))
+
+    assert api.get_train_name(page, '15032') == 'GKP INTERCITY'
+    assert api.get_running_days(page) == 'Daily'
+    assert ' to ' in api.get_route_info(page)
+
+
+def test_train_name_search_is_bounded_on_long_pages(api):
+    # Long whitespace-indented text around the number made the page-text patterns take minutes
+    body = ('Station name here' + ' ' * 40 + '\n') * 150
+    soup = BeautifulSoup(f'<html><body><p>{body} 12345 - Howrah Mail {body}</p></body></html>', 'html.parser')
+
+    start_time = time.time()
+    name = api.get_train_name(soup, '12345')
+
+    assert time.time() - start_time < 1
+    assert name == 'Howrah'
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Offline tests for ProxyRotator selection
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+import proxy_rotator
+from proxy_rotator import ProxyRotator
+
+
+@pytest.fixture
+def make_rotator(tmp_path, monkeypatch):
+    """Build a rotator from a detailed proxy file of {proxy: response_time}"""
+    monkeypatch.chdir(tmp_path)
+
+    def build(timings):
+        with open('working_proxies_detailed.json', 'w') as f:
+            json.dump({
+                'working_proxies': [
+                    {'proxy': proxy, 'timings': {'total': total}}
+                    for proxy, total in timings.items()
+                ]
+            }, f)
+        return ProxyRotator()
+    return build
+
+
+def test_two_choices_prefers_the_better_score(make_rotator):
+    rotator = make_rotator({'10.0.0.1:80': 1.5, '10.0.0.2:80': 0.5, '10.0.0.3:80': 8.0})
+
+    assert rotator.fast_proxies == ['10.0.0.2:80', '10.0.0.1:80']
+    assert rotator.get_best_proxies(3) == ['10.0.0.2:80', '10.0.0.1:80', '10.0.0.3:80']
+
+    # With two proxies both are always sampled, so the better score always wins
+    rotator.replace_proxies(['10.0.0.1:80', '10.0.0.2:80'])
+    assert {rotator.get_proxy() for _ in range(20)} == {'10.0.0.2:80'}
+
+    # Failures outweigh a better median...
+    for _ in range(10):
+        rotator.update_proxy_stats('10.0.0.1:80', True, 0.3)
+        rotator.update_proxy_stats('10.0.0.2:80', True, 0.2)
+    assert rotator.get_proxy() == '10.0.0.2:80'
+    for _ in range(6):
+        rotator.update_proxy_stats('10.0.0.2:80', False)
+        rotator.update_proxy_stats('10.0.0.2:80', False)
+        rotator.update_proxy_stats('10.0.0.2:80', True, 0.2)
+    assert rotator.scores()['10.0.0.2:80']['success_rate'] == pytest.approx(0.4)
+    assert rotator.get_proxy() == '10.0.0.1:80'
+
+    # ...and so does a bad tail that an average would hide
+    rotator.update_proxy_stats('10.0.0.1:80', True, 6.0)
+    assert rotator.scores()['10.0.0.1:80']['p50'] < 0.5
+    assert rotator.get_proxy() == '10.0.0.2:80'
+
+
+def test_every_proxy_gets_traffic(make_rotator, monkeypatch):
+    monkeypatch.setattr(proxy_rotator, 'random', random.Random(7))
+    proxies = {f'10.0.1.{i}:80': 5.0 for i in range(10)}
+    rotator = make_rotator(proxies)
+
+    seen = []
+    for _ in range(20 * len(proxies)):
+        proxy = rotator.get_proxy()
+        seen.append(proxy)
+        rotator.update_proxy_stats(proxy, True, 5.0)
+
+    assert set(seen) == set(proxies)
+    assert rotator.get_stats()['selections']['scored'] == len(seen)
+
+
+def test_slow_response_leaves_fast_tier(make_rotator):
+    rotator = make_rotator({'10.0.0.1:80': 0.5, '10.0.0.2:80': 5.0})
+
+    rotator.update_proxy_stats('10.0.0.1:80', True, 3.0)
+
+    assert rotator.fast_proxies == []
+
+
+def test_breaker_opens_then_allows_one_half_open_trial(make_rotator, monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(proxy_rotator, 'time', types.SimpleNamespace(time=lambda: clock.now))
+    rotator = make_rotator({'10.0.0.1:80': 0.5, '10.0.0.2:80': 5.0})
+    blacklisted = []
+    rotator.blacklist_callbacks.append(blacklisted.append)
+    breaker = rotator.breakers['10.0.0.1:80']
+
+    for _ in range(rotator.max_failures):
+        rotator.update_proxy_stats('10.0.0.1:80', False)
+
+    assert rotator.failed_proxies == {'10.0.0.1:80'}
+    assert blacklisted == ['10.0.0.1:80']
+    assert rotator.get_proxy() == '10.0.0.2:80'
+
+    # Open period over: the proxy gets exactly one trial, which fails and doubles the open time
+    clock.now += rotator.breaker_open
+    assert rotator.get_proxy() == '10.0.0.1:80'
+    assert rotator.breaker_states()['10.0.0.1:80']['state'] == 'half_open'
+    assert rotator.get_proxy() == '10.0.0.2:80'
+    rotator.update_proxy_stats('10.0.0.1:80', False)
+    assert breaker.state == 'open' and breaker.open_for == 2 * rotator.breaker_open
+
+    # A successful trial closes the breaker without wiping the failure history
+    clock.now += 2 * rotator.breaker_open
+    assert rotator.get_proxy() == '10.0.0.1:80'
+    rotator.update_proxy_stats('10.0.0.1:80', True, 0.5)
+    assert rotator.failed_proxies == set() and breaker.open_for == 0
+    assert rotator.proxy_stats['10.0.0.1:80']['failure'] == rotator.max_failures + 1
+    assert rotator.get_stats()['breakers'] == {'closed': 2, 'open': 0, 'half_open': 0}
+
+
+def test_least_recently_failed_is_last_resort(make_rotator):
+    rotator = make_rotator({'10.0.0.1:80': 5.0, '10.0.0.2:80': 5.0})
+
+    for proxy in ['10.0.0.2:80', '10.0.0.1:80']:
+        for _ in range(rotator.max_failures):
+            rotator.update_proxy_stats(proxy, False)
+
+    assert rotator.get_proxy() == '10.0.0.2:80'
+
+
+def test_reload_merges_the_proxy_files_into_the_rotation(make_rotator):
+    rotator = make_rotator({'10.0.0.1:80': 0.5, '10.0.0.2:80': 5.0})
+    removed_seen = []
+    rotator.removed_callbacks.append(removed_seen.append)
+    rotator.update_proxy_stats('10.0.0.1:80', True, 0.4)
+    breaker = rotator.breakers['10.0.0.1:80']
+
+    with open('working_proxies_detailed.json', 'w') as f:
+        json.dump({'working_proxies': [
+            {'proxy': '10.0.0.1:80', 'timings': {'total': 3.0}},
+            {'proxy': '10.0.0.3:80', 'scheme': 'socks5h', 'timings': {'total': 0.2}}
+        ]}, f)
+
+    assert rotator.reload_proxies() == (['10.0.0.3:80'], ['10.0.0.2:80'])
+    assert sorted(rotator.proxies) == ['10.0.0.1:80', '10.0.0.3:80']
+    assert removed_seen == ['10.0.0.2:80']
+    assert rotator.proxy_stats['10.0.0.1:80']['success'] == 1 and rotator.breakers['10.0.0.1:80'] is breaker
+    assert rotator.proxy_stats['10.0.0.3:80']['avg_response'] == 0.2
+    assert rotator.proxy_schemes['10.0.0.3:80'] == 'socks5h'
+
+    # An empty list is a bad write, not a request to drop every proxy
+    with open('working_proxies_detailed.json', 'w') as f:
+        json.dump({'working_proxies': []}, f)
+    assert rotator.reload_proxies() == ([], []) and len(rotator.proxies) == 2
+
+
+def test_watcher_reloads_when_a_proxy_file_changes(make_rotator):
+    rotator = make_rotator({'10.0.0.1:80': 0.5})
+    rotator.reload_interval = 0.01
+    rotator.start_watching()
+    try:
+        with open('working_proxies_detailed.json', 'w') as f:
+            json.dump({'working_proxies': [{'proxy': '10.0.0.4:80', 'timings': {'total': 0.5}}]}, f)
+        deadline = time.time() + 5
+        while rotator.proxies != ('10.0.0.4:80',) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        rotator.stop_watching()
+
+    assert rotator.proxies == ('10.0.0.4:80',)
+    assert rotator.get_stats()['reloads'] == 1
+
+
+def test_concurrent_picks_updates_and_swaps(make_rotator):
+    proxies = {f'10.0.2.{i}:80': (i % 4) * 0.8 for i in range(64)}
+    rotator = make_rotator(proxies)
+    threads_count = 16
+    updates_per_thread = 2000
+    errors = []
+    stop = threading.Event()
+
+    def worker(seed):
+        try:
+            for i in range(updates_per_thread):
+                proxy = rotator.get_proxy()
+                rotator.update_proxy_stats(proxy, (i + seed) % 4 != 0, 0.5 + (i % 5) * 0.5)
+                rotator.get_best_proxies(3)
+        except Exception as e:
+            errors.append(e)
+
+    def swapper():
+        # Mimics the background tester replacing the list while requests run
+        try:
+            all_proxies = list(proxies)
+            while not stop.is_set():
+                rotator.replace_proxies(all_proxies[::-1])
+                rotator.replace_proxies(all_proxies[8:])
+        except Exception as e:
+            errors.append(e)
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Force frequent thread switches
+    try:
+        swap_thread = threading.Thread(target=swapper)
+        swap_thread.start()
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        stop.set()
+        swap_thread.join()
+    finally:
+        sys.setswitchinterval(old_interval)
+
+    assert errors == []
+    # No lost updates: every call is counted exactly once
+    recorded = sum(stats['success'] + stats['failure'] for stats in rotator.proxy_stats.values())
+    assert recorded == threads_count * updates_per_thread
+
+
+def test_selection_indexes_track_breakers_and_scores(make_rotator):
+    rotator = make_rotator({f'10.0.6.{i}:80': 0.1 * (i + 1) for i in range(40)})
+    rng = random.Random(7)
+    for _ in range(2000):
+        proxy = rotator.proxies[rng.randrange(40)]
+        rotator.update_proxy_stats(proxy, rng.random() < 0.6, rng.uniform(0.1, 5.0))
+
+        closed = [p for p in rotator.proxies if p not in rotator.failed_proxies]
+        assert sorted(rotator._closed) == sorted(closed)
+        expected = sorted(closed, key=lambda p: (rotator._scores[p], rotator._order[p]))[:3]
+        assert rotator.get_best_proxies(3) == expected
+        if closed:
+            assert rotator._two_choices() in closed
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming latency sketch, success window and proxy score
+"""
+
+import random
+
+import pytest
+
+from proxy_score import LatencySketch, OutcomeWindow, MIN_SUCCESS_RATE, score
+
+
+def test_sketch_quantiles_track_recent_latency():
+    sketch = LatencySketch(half_life=50)
+    assert sketch.quantile(0.5) is None
+
+    rng = random.Random(3)
+    samples = sorted(rng.uniform(0.1, 1.0) for _ in range(49))
+    for latency in samples:
+        sketch.add(latency)
+    assert sketch.quantile(0.5) == pytest.approx(samples[24], rel=0.1)
+    assert sketch.quantile(0.95) == pytest.approx(samples[46], rel=0.1)
+
+    # After a few half-lives the old fast samples barely count
+    for _ in range(300):
+        sketch.add(5.0)
+    assert sketch.quantile(0.5) == pytest.approx(5.0, rel=0.1)
+    assert sketch.quantile(0.01) == pytest.approx(5.0, rel=0.1)
+
+
+def test_window_success_rate_and_score():
+    window = OutcomeWindow(size=4)
+    assert window.success_rate() == 1.0
+
+    for success in (False, False, True, True, True, False):
+        window.add(success)
+    assert window.success_rate() == 0.75
+
+    assert score(1.0, 3.0, 0.5) == 4.0
+    assert score(1.0, 3.0, 0.0) == 2.0 / MIN_SUCCESS_RATE
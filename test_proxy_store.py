@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk proxy state store and the rotator's warm start
+"""
+
+import json
+import threading
+
+import pytest
+
+import proxy_store
+from proxy_rotator import ProxyRotator
+from proxy_store import ProxyStore, atomic_write
+
+
+@pytest.fixture
+def proxy_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    atomic_write('working_proxies_detailed.json', json.dumps({
+        'working_proxies': [
+            {'proxy': '10.0.0.1:80', 'timings': {'total': 0.5}},
+            {'proxy': '10.0.0.2:80', 'timings': {'total': 0.5}}
+        ]
+    }))
+    return tmp_path
+
+
+def test_rotator_warm_starts_from_saved_state(proxy_file):
+    rotator = ProxyRotator(ProxyStore('proxies.db'))
+    for _ in range(10):
+        rotator.update_proxy_stats('10.0.0.1:80', True, 0.3)
+    rotator.update_proxy_stats('10.0.0.2:80', False)
+    rotator.record_scheme('10.0.0.2:80', 'socks5h')
+
+    assert rotator.save_state() == 2
+    assert rotator.save_state() == 0  # Nothing changed since
+
+    restarted = ProxyRotator(ProxyStore('proxies.db'))
+    assert restarted.scores() == rotator.scores()
+    assert restarted.proxy_stats['10.0.0.1:80']['success'] == 10
+    assert restarted.proxy_stats['10.0.0.2:80']['failure'] == 1
+    assert restarted.proxy_schemes['10.0.0.2:80'] == 'socks5h'
+
+
+def test_server_and_tester_write_at_once_without_clobbering(proxy_file):
+    ProxyStore('proxies.db')
+    proxies = [f'10.0.1.{i}:80' for i in range(50)]
+    errors = []
+
+    def server():
+        store = ProxyStore('proxies.db')
+        for i in range(20):
+            rows = {proxy: {'success': i, 'failure': 1, 'last_success': None, 'last_failure': None,
+                            'avg_response': 0.4, 'latency': '{}', 'outcomes': '01'} for proxy in proxies}
+            store.save_stats(rows)
+
+    def tester():
+        store = ProxyStore('proxies.db')
+        for _ in range(20):
+            store.record_tests({proxy: (True, 0.7, 'http') for proxy in proxies})
+
+    def run(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in (server, tester, server, tester)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    rows = ProxyStore('proxies.db').load()
+    assert len(rows) == 50
+    assert all(row['success'] == 19 and row['working'] == 1 and row['test_time'] == 0.7 for row in rows.values())
+    assert sorted(ProxyStore('proxies.db').working_proxies()) == sorted(proxies)
+
+
+def test_from_env_runs_without_a_store_it_cannot_open(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROXY_STORE_PATH', str(tmp_path / 'missing' / 'proxies.db'))
+    assert ProxyStore.from_env() is None
+
+    monkeypatch.setenv('PROXY_STORE_PATH', '')
+    assert ProxyStore.from_env() is None
+
+    monkeypatch.delenv('PROXY_STORE_PATH')
+    monkeypatch.setattr(proxy_store, 'DEFAULT_PATH', str(tmp_path / 'proxies.db'))
+    monkeypatch.chdir(tmp_path / '..')
+    assert ProxyStore.from_env().path == str(tmp_path / 'proxies.db')
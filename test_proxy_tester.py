@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent proxy validation: bounded workers, streamed verdicts
+and workers that raise
+"""
+
+import json
+import threading
+import time
+
+import confirmtkt_clone
+import proxy_tester
+from proxy_store import atomic_write
+from proxy_tester import run_concurrent
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def error(self, msg, *args, **kwargs):
+        self.records.append((msg, kwargs))
+
+
+def test_workers_are_bounded():
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def test_fn(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return item * 2
+
+    results = run_concurrent(range(12), test_fn, max_workers=3)
+
+    assert results == {i: i * 2 for i in range(12)}
+    assert peak[0] == 3
+
+
+def test_results_stream_while_slow_items_still_run():
+    fast_done = threading.Event()
+    seen = []
+
+    def test_fn(item):
+        if item == 'slow':
+            # Only finishes once every fast verdict has already been handed over
+            return fast_done.wait(timeout=2)
+        return True
+
+    def on_result(item, result):
+        seen.append((item, result))
+        if len(seen) == 3:
+            fast_done.set()
+
+    run_concurrent(['slow', 'a', 'b', 'c'], test_fn, on_result, max_workers=4)
+
+    assert seen[-1] == ('slow', True)
+    assert sorted(item for item, _ in seen[:3]) == ['a', 'b', 'c']
+
+
+def test_a_raising_worker_is_reported_and_the_rest_still_run(monkeypatch):
+    def test_fn(item):
+        if item == 'bad':
+            raise ValueError('boom')
+        return item
+
+    errors = []
+    results = run_concurrent(['ok', 'bad', 'fine'], test_fn, on_error=lambda item, e: errors.append((item, str(e))))
+    assert results == {'ok': 'ok', 'fine': 'fine'}
+    assert errors == [('bad', 'boom')]
+
+    logger = RecordingLogger()
+    monkeypatch.setattr(proxy_tester, 'logger', logger)
+    assert run_concurrent(['ok', 'bad'], test_fn) == {'ok': 'ok'}
+    [(msg, kwargs)] = logger.records
+    assert kwargs['extra'] == {'proxy': 'bad'} and isinstance(kwargs['exc_info'], ValueError)
+
+
+def test_api_keeps_only_proxies_that_pass(tmp_path, monkeypatch, make_api):
+    monkeypatch.chdir(tmp_path)
+    logger = RecordingLogger()
+    monkeypatch.setattr(proxy_tester, 'logger', logger)
+    api = make_api()
+    api.proxy_rotator.replace_proxies(['10.0.5.1:80', '10.0.5.2:80', '10.0.5.3:80'])
+    for proxy in api.proxy_rotator.proxies:
+        api.session_pool.get_session(f'http://{proxy}')
+
+    def test_proxy(proxy):
+        if proxy == '10.0.5.3:80':
+            raise RuntimeError('probe crashed')
+        return proxy == '10.0.5.1:80', 0.2, 'socks5h'
+
+    api.test_proxy = test_proxy
+    api.test_proxies()
+
+    assert list(api.proxy_rotator.proxies) == ['10.0.5.1:80']
+    assert api.proxy_rotator.proxy_schemes['10.0.5.1:80'] == 'socks5h'
+    assert (tmp_path / 'working_proxies.txt').read_text() == '10.0.5.1:80'
+    assert list(api.session_pool.sessions) == ['http://10.0.5.1:80']  # Dropped proxies lose their sessions
+    assert [kwargs['extra'] for _, kwargs in logger.records] == [{'proxy': '10.0.5.3:80'}]
+
+
+def test_a_reload_between_the_proxy_file_writes_sees_only_passing_proxies(tmp_path, monkeypatch, make_api):
+    monkeypatch.chdir(tmp_path)
+    proxies = ['10.0.5.1:80', '10.0.5.2:80']
+    atomic_write('working_proxies_detailed.json', json.dumps({
+        'working_proxies': [{'proxy': proxy, 'timings': {'total': 0.5}} for proxy in proxies]
+    }))
+    atomic_write('working_proxies.txt', '\n'.join(proxies))
+    api = make_api()
+
+    # The file watcher fires after each write
+    reloaded = []
+
+    def write_then_reload(path, text):
+        atomic_write(path, text)
+        api.proxy_rotator.reload_proxies()
+        reloaded.append(sorted(api.proxy_rotator.proxies))
+    monkeypatch.setattr(confirmtkt_clone, 'atomic_write', write_then_reload)
+
+    api.test_proxy = lambda proxy: (proxy == '10.0.5.1:80', 0.2, 'http')
+    api.test_proxies()
+
+    assert reloaded == [['10.0.5.1:80'], ['10.0.5.1:80']]
+
+
+def test_losing_scheme_probes_stop_before_the_winner_returns():
+    running = []
+
+    def probe(proxy_url, stop):
+        running.append(proxy_url)
+        try:
+            if proxy_url.startswith('http://'):
+                return 'ok'
+            stop.wait(5)  # A scheme that never answers, retried until told to stop
+            raise proxy_tester.ProbeError("stopped")
+        finally:
+            running.remove(proxy_url)
+
+    assert proxy_tester.probe_proxy_schemes('10.0.5.1:80', probe) == ('http', 'ok')
+    assert running == []
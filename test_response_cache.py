@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the API response cache and request coalescing
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fixtures import load_fixture
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+
+LIVE_URL = "https://www.confirmtkt.com/train-running-status/22482"
+
+
+def test_entries_expire_per_endpoint_ttl():
+    cache = ResponseCache(ttls={'live_status': 30, 'schedule': 3600})
+    cache.set('live_status', '22482', 'live', current_time=1000)
+    cache.set('schedule', '22482', 'schedule', current_time=1000)
+
+    assert cache.get('live_status', '22482', current_time=1029) == 'live'
+    assert cache.get('live_status', '22482', current_time=1031) is None
+    assert cache.get('schedule', '22482', current_time=1031) == 'schedule'
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (2, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set('pnr', '1', 'a')
+    cache.set('pnr', '2', 'b')
+    cache.get('pnr', '1')
+    cache.set('pnr', '3', 'c')
+
+    assert cache.get('pnr', '2') is None
+    assert cache.get('pnr', '1') == 'a'
+    assert cache.get('pnr', '3') == 'c'
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_live_status_is_served_from_cache(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))})
+    backend = api.async_fetcher.backend
+
+    first = asyncio.run(api.get_live_status_async('22482'))
+    second = asyncio.run(api.get_live_status_async('22482'))
+
+    assert first['status'] == 'success'
+    assert first['cache']['state'] == 'miss'
+    assert second['cache'] == {'state': 'fresh', 'age': second['cache']['age'], 'refreshing': False}
+    assert second['data'] == first['data']
+    assert len(backend.requests) == 1
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))}, latency=0.2)
+    backend = api.async_fetcher.backend
+    cache = api.response_cache
+    cache.set('live_status', '22482', {'status': 'success', 'data': 'old'},
+              current_time=time.time() - cache.soft_ttls['live_status'] - 1)
+
+    async def serve_stale_then_refresh():
+        start_time = time.time()
+        first = await api.get_live_status_async('22482')
+        second = await api.get_live_status_async('22482')
+        elapsed = time.time() - start_time
+        await asyncio.gather(*api.refresh_tasks)
+        return first, second, elapsed
+
+    first, second, elapsed = asyncio.run(serve_stale_then_refresh())
+
+    # Served without waiting on the 0.2s upstream, with a single refresh behind it
+    assert elapsed < 0.1
+    assert first['data'] == 'old' and first['cache']['state'] == 'stale'
+    assert first['cache']['refreshing'] and second['cache']['refreshing']
+    assert len(backend.requests) == 1
+    assert cache.get('live_status', '22482')['data']['train_number'] == '22482'
+    assert api.refreshing == set()
+
+
+def test_entry_past_hard_ttl_is_refetched(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))})
+    cache = api.response_cache
+    cache.set('live_status', '22482', {'status': 'success', 'data': 'old'},
+              current_time=time.time() - cache.ttls['live_status'])
+
+    result = asyncio.run(api.get_live_status_async('22482'))
+
+    assert result['cache']['state'] == 'miss'
+    assert result['data']['train_number'] == '22482'
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'status': 'success'}
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do(('live_status', '22482'), slow_fetch)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 10 and all(result is results[0] for result in results)
+    assert flight.get_stats() == {'in_flight': 0, 'executed': 1, 'shared': 9}
+
+
+def test_failed_call_is_not_remembered():
+    flight = SingleFlight()
+
+    def failing_fetch():
+        raise ValueError('upstream down')
+
+    with pytest.raises(ValueError):
+        flight.do('key', failing_fetch)
+    assert flight.do('key', lambda: 'recovered') == 'recovered'
+
+
+def test_concurrent_async_lookups_share_one_upstream_fetch(make_api):
+    api = make_api({LIVE_URL: (200, load_fixture('train_status.html'))}, latency=0.2)
+    backend = api.async_fetcher.backend
+
+    async def run_many():
+        return await asyncio.gather(*[api.get_live_status_async('22482') for _ in range(20)])
+
+    results = asyncio.run(run_many())
+
+    assert all(result['status'] == 'success' for result in results)
+    assert len(backend.requests) == 1
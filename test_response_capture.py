@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for sampled upstream page capture
+"""
+
+import gzip
+import os
+
+from fixtures import load_fixture
+from response_capture import ResponseCapture, read_capture
+
+
+class FixtureResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+
+def test_captures_form_a_bounded_ring_of_compressed_files(tmp_path):
+    old = tmp_path / 'pnr-20000101T000000000Z-000001-old.html.gz'
+    with gzip.open(old, 'wt') as f:
+        f.write('left by an earlier run')
+    capture = ResponseCapture(str(tmp_path), sample_percent=100, max_files=3)
+
+    for i in range(4):
+        assert capture.capture('live_status', f"2248{i}", f"<html>{i}</html>")
+    capture.flush()
+    capture.stop()
+
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 3 and not old.exists()
+    assert all(n.startswith('live_status-') and n.endswith('.html.gz') for n in names)
+    assert [read_capture(tmp_path / n) for n in names] == ['<html>1</html>', '<html>2</html>', '<html>3</html>']
+    assert capture.get_stats() == {'enabled': True, 'captured': 4, 'dropped': 0, 'errors': 0, 'files': 3}
+
+
+def test_api_captures_parsed_pages_only_when_enabled(tmp_path, monkeypatch, make_api):
+    monkeypatch.chdir(tmp_path)
+    page = load_fixture('pnr_test_response.html')
+
+    api = make_api()
+    assert api._parse('pnr', '1234567890', FixtureResponse(page), api.parse_pnr_response)['status'] == 'success'
+    assert not os.listdir(tmp_path) and not api.response_capture.get_stats()['enabled']
+
+    monkeypatch.setenv('CAPTURE_SAMPLE_PERCENT', '100')
+    monkeypatch.setenv('CAPTURE_DIR', str(tmp_path / 'captures'))
+    api = make_api()
+    api._parse('pnr', '1234567890', FixtureResponse(page), api.parse_pnr_response)
+    api.response_capture.stop()
+
+    [name] = os.listdir(tmp_path / 'captures')
+    assert name.startswith('pnr-') and name.endswith('-1234567890.html.gz')
+    assert read_capture(tmp_path / 'captures' / name) == page
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-request deadline budget and adaptive retry backoff
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from async_fetch import LocalBackend
+from retry_policy import Backoff, Deadline, DeadlineExceeded
+
+LIVE_URL = "https://www.confirmtkt.com/train-running-status/22482"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TimeoutRecordingBackend(LocalBackend):
+    async def fetch(self, method, url, proxy_url, headers=None, timeout=30, **kwargs):
+        self.timeouts.append(timeout)
+        return await super().fetch(method, url, proxy_url, headers=headers, timeout=timeout, **kwargs)
+
+
+def test_deadline_shrinks_attempt_timeouts_and_bounds_backoff():
+    clock = FakeClock()
+    deadline = Deadline(10, clock)
+    assert deadline.timeout(15) == 10
+
+    clock.now += 9
+    assert deadline.timeout(15) == pytest.approx(1) and not deadline.expired()
+    backoff = Backoff(base=0.1, cap=2.0)
+    delays = [backoff.next_delay() for _ in range(20)]
+    assert all(0.1 <= d <= 2.0 for d in delays) and max(delays) > 0.3
+    assert backoff.next_delay(deadline) <= 1
+
+    clock.now += 1
+    assert deadline.expired()
+    assert str(deadline.exceeded(3, 'HTTP 503')) == "Request budget of 10s spent after 3 attempt(s). Last error: HTTP 503"
+
+
+def test_no_backoff_when_switching_to_a_healthy_proxy(make_api):
+    api = make_api()
+    proxy = api.proxy_rotator.proxies[0]
+    backoff = Backoff()
+
+    api.proxy_rotator.update_proxy_stats(proxy, True, 0.5)
+    assert api._retry_delay(1, proxy, False, backoff, None) == 0
+    assert api._retry_delay(1, proxy, True, backoff, None) > 0  # Upstream pushed back
+
+    api.proxy_rotator.update_proxy_stats(proxy, False)
+    assert api._retry_delay(1, proxy, False, backoff, None) > 0
+    assert api._retry_delay(0, proxy, False, backoff, None) == 0
+
+
+def test_request_fails_fast_once_the_budget_is_spent(make_api):
+    backend = TimeoutRecordingBackend({LIVE_URL: (503, 'busy')}, latency=0.05)
+    backend.timeouts = []
+    api = make_api(backend=backend)
+    api.retry_backoff_base = api.retry_backoff_cap = 0.3
+
+    start_time = time.time()
+    with pytest.raises(DeadlineExceeded, match=r"budget of 0.5s .* Last error: HTTP 503"):
+        asyncio.run(api.make_request_with_proxy_async(LIVE_URL, timeout=15, budget=0.5))
+
+    assert time.time() - start_time < 1
+    assert 1 < len(backend.timeouts) < api.max_retries
+    assert all(t <= 0.5 for t in backend.timeouts) and backend.timeouts[-1] < backend.timeouts[0]
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_sync_and_async_loops_book_one_outcome_per_attempt(make_api, mode):
+    backend = LocalBackend({LIVE_URL: (503, 'busy')})
+    api = make_api(backend=backend, sync=True)
+    api.retry_backoff_base = api.retry_backoff_cap = 0.01
+    api.max_retries = 3
+
+    with pytest.raises(Exception, match="All proxy attempts failed. Last error: HTTP 503"):
+        if mode == 'sync':
+            api.make_request_with_proxy(LIVE_URL)
+        else:
+            asyncio.run(api.make_request_with_proxy_async(LIVE_URL))
+
+    stats = api.proxy_rotator.proxy_stats.values()
+    assert len(backend.requests) == 3  # One scheme per attempt: the proxy answered
+    assert sum(s['failure'] for s in stats) == 3 and sum(s['success'] for s in stats) == 0
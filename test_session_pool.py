@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-proxy session pool: reuse, eviction and isolation
+"""
+
+import email
+import types
+
+import requests
+from requests.cookies import extract_cookies_to_jar
+
+import session_pool
+from session_pool import SessionPool
+
+URL = "https://www.confirmtkt.com/train-running-status/22482"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def set_cookie_response(header):
+    """Stand-in for the urllib3 response requests reads Set-Cookie headers from"""
+    return types.SimpleNamespace(_original_response=types.SimpleNamespace(
+        msg=email.message_from_string(f"Set-Cookie: {header}\n\n")
+    ))
+
+
+def test_sessions_are_reused_per_proxy_url_and_kept_apart():
+    pool = SessionPool()
+    first = pool.get_session('http://10.0.4.1:80')
+
+    assert pool.get_session('http://10.0.4.1:80') is first
+    other_scheme = pool.get_session('socks5h://10.0.4.1:80')
+    other_proxy = pool.get_session('http://10.0.4.2:80')
+    assert other_scheme is not first and other_proxy is not first
+    assert other_scheme.proxies == {'http': 'socks5h://10.0.4.1:80', 'https': 'socks5h://10.0.4.1:80'}
+    assert pool.get_stats() == {'sessions': 3, 'created': 3, 'reused': 1, 'evicted': 0}
+
+
+def test_pooled_sessions_never_keep_cookies():
+    pool = SessionPool()
+    session = pool.get_session('http://10.0.4.1:80')
+    request = requests.Request('GET', URL).prepare()
+
+    extract_cookies_to_jar(session.cookies, request, set_cookie_response('sid=alice; Path=/'))
+
+    assert len(session.cookies) == 0
+    assert 'Cookie' not in session.prepare_request(requests.Request('GET', URL)).headers
+
+
+def test_evicted_sessions_are_dropped_but_not_closed(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_pool, 'time', clock)
+    closed = []
+    monkeypatch.setattr(requests.Session, 'close', lambda self: closed.append(self))
+    pool = SessionPool(max_sessions=2, idle_timeout=60)
+
+    # Least recently used goes first once the pool is full
+    oldest = pool.get_session('http://10.0.4.1:80')
+    pool.get_session('http://10.0.4.2:80')
+    pool.get_session('http://10.0.4.1:80')
+    pool.get_session('http://10.0.4.3:80')
+    assert set(pool.sessions) == {'http://10.0.4.1:80', 'http://10.0.4.3:80'}
+
+    # Idle sessions are dropped on the next lookup
+    clock.now += 61
+    fresh = pool.get_session('http://10.0.4.4:80')
+    assert list(pool.sessions) == ['http://10.0.4.4:80']
+    assert pool.get_session('http://10.0.4.1:80') is not oldest
+
+    # Dropping a blacklisted proxy leaves callers still holding its session alone too
+    assert pool.evict('10.0.4.4:80') == 1
+    assert pool.get_stats()['evicted'] == 4
+    assert closed == []
+
+    pool.close_all()
+    assert fresh not in closed and len(closed) == 1
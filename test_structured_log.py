@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the queued, sampled structured logging and request correlation IDs
+"""
+
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+import structured_log
+from structured_log import NonBlockingQueueHandler, configure_logging, get_logger, request_id_var
+
+
+@pytest.fixture
+def log_output():
+    stream = io.StringIO()
+    configure_logging(level='DEBUG', json_format=True, debug_sample_every=3, stream=stream)
+    yield stream
+    configure_logging()
+
+
+def records(stream):
+    structured_log.shutdown_logging()  # Flushes the queue
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_sampled_and_carry_request_id_and_fields(log_output):
+    logger = get_logger('test')
+    token = request_id_var.set('req-1')
+    try:
+        for i in range(7):
+            logger.debug("Added station %d", i, extra={'station': f"S{i}"})
+        logger.warning("Request failed", extra={'proxy': '1.2.3.4:80', 'status': 503})
+    finally:
+        request_id_var.reset(token)
+    logger.info("Outside a request")
+
+    lines = records(log_output)
+    debug = [line for line in lines if line['level'] == 'DEBUG']
+    assert [line['msg'] for line in debug] == ['Added station 0', 'Added station 3', 'Added station 6']
+    assert debug[0]['station'] == 'S0' and debug[0]['sample_rate'] == 3
+    assert lines[-2] == dict(lines[-2], level='WARNING', msg='Request failed', proxy='1.2.3.4:80', status=503, request_id='req-1')
+    assert lines[-1]['request_id'] == '-' and lines[-1]['logger'] == 'confirmtkt.test'
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(logging.LogRecord('confirmtkt', logging.INFO, __file__, 1, 'line', (), None))
+
+    assert handler.queue.qsize() == 1 and handler.dropped == 2
+
+
+def test_api_requests_get_a_correlation_id():
+    import confirmtkt_clone
+    client = confirmtkt_clone.app.test_client()
+
+    generated = client.get('/api/live-status').headers['X-Request-ID']
+    passed = client.get('/api/live-status', headers={'X-Request-ID': 'abc-123'}).headers['X-Request-ID']
+    unsafe = client.get('/api/live-status', headers={'X-Request-ID': 'a b;c'}).headers['X-Request-ID']
+
+    assert len(generated) == 12 and passed == 'abc-123' and unsafe not in ('a b;c', generated)
+    assert request_id_var.get() == '-'
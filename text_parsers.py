@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Text Parsers - Row and field parsers shared by the schedule, live status and
+PNR pages, built on the precompiled patterns in patterns.py.
+"""
+
+from patterns import (
+    WHITESPACE, STATION_CODE_SUFFIX, STATION_TYPE_SUFFIX, NAME_AND_CODE, NON_NUMERIC,
+    STATION_INFO, ROW_DATE, ROW_TIMES, ROW_DELAY, TIME, DELAY, HALT, STATION_STATUS,
+    ROUTE_NOISE_CHANGE, ROUTE_NOISE_RUNNING_DAYS, ROUTE_TEXT_PATTERNS
+)
+from structured_log import get_logger
+
+logger = get_logger(__name__)
+
+
+def clean_text(text):
+    """Clean text by removing extra whitespace and newlines"""
+    if not text:
+        return ''
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def clean_station_name(text):
+    """Clean station name by removing codes and standardizing format"""
+    if not text:
+        return ''
+
+    # Remove station code at end (e.g. " - HWH" or " - NDLS")
+    text = STATION_CODE_SUFFIX.sub('', text)
+
+    # Remove common suffixes
+    text = STATION_TYPE_SUFFIX.sub('', text)
+
+    # Clean up remaining text
+    return clean_text(text)
+
+
+def parse_station_info(text):
+    """Parse station info from text containing date/time/status"""
+    if not text:
+        return None
+
+    # Try to extract station name
+    station_match = STATION_INFO.search(text)
+    if station_match:
+        return clean_station_name(station_match.group(1))
+
+    # If no match, clean the original text
+    return clean_station_name(text)
+
+
+def parse_station_row(text):
+    """Parse a live status row into station data"""
+    if not text:
+        return None
+
+    # Initialize station data
+    station_data = {
+        'station': '',
+        'date': '',
+        'arrives': '',
+        'departs': '',
+        'delay': '',
+        'status': 'upcoming'
+    }
+
+    # Extract station name
+    station_name = parse_station_info(text)
+    if not station_name:
+        return None
+
+    # Skip if this looks like a delay message
+    if any(d in station_name.lower() for d in ['delay', 'late']):
+        return None
+
+    station_data['station'] = station_name
+
+    # Extract date (Day X-Mon)
+    date_match = ROW_DATE.search(text)
+    if date_match:
+        day = date_match.group(1)
+        month = date_match.group(2) if date_match.group(2) else ''
+        station_data['date'] = f"Day {day} {month}".strip()
+
+    # Extract times (HH:MM)
+    time_matches = ROW_TIMES.findall(text)
+    if len(time_matches) >= 2:
+        station_data['arrives'] = time_matches[0]
+        station_data['departs'] = time_matches[1]
+    elif len(time_matches) == 1:
+        if 'arrives' in text.lower():
+            station_data['arrives'] = time_matches[0]
+        else:
+            station_data['departs'] = time_matches[0]
+
+    # Extract delay info
+    delay_match = ROW_DELAY.search(text)
+    if delay_match:
+        delay_mins = delay_match.group(1)
+        station_data['delay'] = f"Delayed by {delay_mins} minutes"
+    elif 'Right Time' in text:
+        station_data['delay'] = 'On Time'
+
+    return station_data
+
+
+def parse_route(text):
+    """Extract clean route information from text"""
+    if not text:
+        return ''
+
+    # Remove unwanted text
+    text = ROUTE_NOISE_CHANGE.sub('', text)
+    text = ROUTE_NOISE_RUNNING_DAYS.sub('', text)
+    # Collapse whitespace; the patterns below backtrack badly over indentation runs
+    text = ' '.join(text.split())
+
+    # Try to extract route with station names
+    for pattern in ROUTE_TEXT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            from_station = clean_station_name(match.group(1))
+            to_station = clean_station_name(match.group(2))
+            if from_station and to_station:
+                return f"{from_station} to {to_station}"
+
+    return clean_text(text)
+
+
+def _split_name_and_code(station_data, text):
+    station_code_match = NAME_AND_CODE.search(text)
+    if station_code_match:
+        station_data.update({
+            'station': clean_station_name(station_code_match.group(1)),
+            'code': station_code_match.group(2)
+        })
+    else:
+        station_data['station'] = clean_station_name(text)
+
+
+def parse_schedule_row(cols):
+    """Parse a schedule table row into station data"""
+    if not cols or len(cols) < 3:
+        return None
+
+    try:
+        # Initialize with empty values
+        station_data = {
+            'sr_no': '',
+            'station': '',
+            'code': '',
+            'arrives': '',
+            'departs': '',
+            'halt': '',
+            'distance': '',
+            'avg_delay': '',
+            'day': '1'
+        }
+
+        # Get station name from first column
+        station_text = cols[0].text.strip()
+        if not station_text or station_text.lower() in ['s.no', 'sr.no', 'station', 'stations']:
+            return None
+
+        # Fast path for common table format
+        if station_text.isdigit():
+            station_data['sr_no'] = station_text
+
+            # Station name and code
+            _split_name_and_code(station_data, cols[1].text.strip())
+
+            # Direct column mapping for speed
+            if len(cols) > 2: station_data['arrives'] = parse_time(cols[2].text.strip())
+            if len(cols) > 3: station_data['departs'] = parse_time(cols[3].text.strip())
+            if len(cols) > 4: station_data['halt'] = cols[4].text.strip()
+            if len(cols) > 5: station_data['distance'] = NON_NUMERIC.sub('', cols[5].text.strip())
+            if len(cols) > 6: station_data['avg_delay'] = parse_delay(cols[6].text.strip())
+            if len(cols) > 7: station_data['day'] = cols[7].text.strip()
+        else:
+            # Alternative format handling
+            _split_name_and_code(station_data, station_text)
+
+            # Direct column mapping
+            if len(cols) > 1: station_data['arrives'] = parse_time(cols[1].text.strip())
+            if len(cols) > 2: station_data['departs'] = parse_time(cols[2].text.strip())
+            if len(cols) > 3: station_data['distance'] = NON_NUMERIC.sub('', cols[3].text.strip())
+
+        # Quick validation
+        if not station_data['station']:
+            return None
+
+        # Clean arrival/departure
+        if station_data['arrives'].lower() in ['source', 'start', '']:
+            station_data['arrives'] = 'Start'
+        if station_data['departs'].lower() in ['destination', 'end', '']:
+            station_data['departs'] = 'End'
+
+        # Clean halt time
+        if station_data['halt']:
+            halt_match = HALT.search(station_data['halt'])
+            if halt_match:
+                station_data['halt'] = f"{halt_match.group(1)}m"
+
+        return station_data
+
+    except Exception as e:
+        logger.warning("Error parsing schedule row: %s", e)
+        return None
+
+
+def parse_time(text):
+    """Extract time from text in HH:MM format"""
+    time_match = TIME.search(text)
+    return time_match.group(1) if time_match else ''
+
+
+def parse_delay(text):
+    """Extract delay information from text"""
+    if not text:
+        return ''
+
+    delay_match = DELAY.search(text)
+    if delay_match:
+        return f"{delay_match.group(1)} Min"
+    return ''
+
+
+def parse_station_status(status_text):
+    """Parse detailed station status information"""
+    if not status_text:
+        return []
+
+    stations = []
+    # Split by "Right Time" and clean up
+    parts = status_text.split("Right Time")
+
+    for part in parts:
+        if not part.strip():
+            continue
+
+        # Extract station info using regex
+        match = STATION_STATUS.search(part)
+        if match:
+            station_name = clean_station_name(match.group(1))
+            if match.group(2):  # If time info exists
+                day = match.group(2)
+                month = "Jul"
+                hour = match.group(4)
+                minute = match.group(5)
+
+                stations.append({
+                    'station': station_name,
+                    'date': f"Day {day}-{month}",
+                    'time': f"{hour}:{minute}",
+                    'status': 'Right Time'
+                })
+            else:
+                stations.append({
+                    'station': station_name,
+                    'date': '',
+                    'time': '',
+                    'status': 'Right Time'
+                })
+
+    return stations